@@ -0,0 +1,161 @@
+"""
+列式分配存储模块
+将一个方案的分配表示为 task_idx / gpu_idx / memory_usage 三列 NumPy 数组，
+用于按GPU汇总、按任务汇总和超分配检查等向量化计算
+"""
+from typing import List
+import numpy as np
+from records import AllocationRecord, GPURecord, TaskRecord
+
+
+class AllocationColumns:
+    """方案分配的列式表示（分配修改时由DataManager原地更新，GPU或任务修改后重新构建）"""
+    
+    def __init__(self, gpus: List[GPURecord], tasks: List[TaskRecord],
+                 allocations: List[AllocationRecord]):
+        """
+        构建列式表示
+        
+        Args:
+            gpus: GPU列表，顺序即 gpu_idx
+            tasks: 任务列表，顺序即 task_idx
+            allocations: 分配列表；GPU不存在的分配被忽略，任务不存在的分配 task_idx 为 -1
+        """
+        self.gpu_ids = np.fromiter((gpu.id for gpu in gpus), dtype=np.int64, count=len(gpus))
+        self.task_ids = np.fromiter((task.id for task in tasks), dtype=np.int64, count=len(tasks))
+        self.gpu_pos = {int(gpu_id): idx for idx, gpu_id in enumerate(self.gpu_ids)}
+        self.task_pos = {int(task_id): idx for idx, task_id in enumerate(self.task_ids)}
+        self.total_memory = np.fromiter((gpu.total_memory for gpu in gpus),
+                                        dtype=np.float64, count=len(gpus))
+        
+        gpu_pos = self.gpu_pos
+        task_pos = self.task_pos
+        rows = [alloc for alloc in allocations if alloc.gpu_id in gpu_pos]
+        # 三列数组预留容量，有效部分为前 _size 行；行的顺序与分配列表无关
+        self._size = len(rows)
+        self._gpu_idx = np.fromiter((gpu_pos[alloc.gpu_id] for alloc in rows),
+                                    dtype=np.int64, count=len(rows))
+        self._task_idx = np.fromiter((task_pos.get(alloc.task_id, -1) for alloc in rows),
+                                     dtype=np.int64, count=len(rows))
+        self._memory_usage = np.fromiter((alloc.memory_usage for alloc in rows),
+                                         dtype=np.float64, count=len(rows))
+        # 每行对应的 (task_id, gpu_id)，以及反向的行号索引
+        self._keys = [(alloc.task_id, alloc.gpu_id) for alloc in rows]
+        self._row_of = {key: row for row, key in enumerate(self._keys)}
+    
+    @property
+    def gpu_idx(self) -> np.ndarray:
+        return self._gpu_idx[:self._size]
+    
+    @property
+    def task_idx(self) -> np.ndarray:
+        return self._task_idx[:self._size]
+    
+    @property
+    def memory_usage(self) -> np.ndarray:
+        return self._memory_usage[:self._size]
+    
+    def put(self, alloc: AllocationRecord):
+        """
+        插入或更新一条分配（GPU不存在时忽略）：新分配追加到末尾，容量不足时按倍数扩容
+        
+        Args:
+            alloc: 分配记录
+        """
+        gpu_idx = self.gpu_pos.get(alloc.gpu_id)
+        if gpu_idx is None:
+            return
+        key = (alloc.task_id, alloc.gpu_id)
+        row = self._row_of.get(key)
+        if row is None:
+            row = self._size
+            if row == len(self._memory_usage):
+                self._grow(max(16, 2 * row))
+            self._gpu_idx[row] = gpu_idx
+            self._task_idx[row] = self.task_pos.get(alloc.task_id, -1)
+            self._keys.append(key)
+            self._row_of[key] = row
+            self._size += 1
+        self._memory_usage[row] = alloc.memory_usage
+    
+    def remove(self, task_id: int, gpu_id: int):
+        """
+        删除一条分配：最后一行移到被删除的行，不移动其余行
+        
+        Args:
+            task_id: 任务ID
+            gpu_id: GPU ID
+        """
+        row = self._row_of.pop((task_id, gpu_id), None)
+        if row is None:
+            return
+        last = self._size - 1
+        if row != last:
+            key = self._keys[last]
+            self._keys[row] = key
+            self._row_of[key] = row
+            self._gpu_idx[row] = self._gpu_idx[last]
+            self._task_idx[row] = self._task_idx[last]
+            self._memory_usage[row] = self._memory_usage[last]
+        self._keys.pop()
+        self._size = last
+    
+    def _grow(self, capacity: int):
+        """把三列数组扩容到 capacity 行"""
+        for name in ("_gpu_idx", "_task_idx", "_memory_usage"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+    
+    @property
+    def gpu_count(self) -> int:
+        return len(self.gpu_ids)
+    
+    @property
+    def task_count(self) -> int:
+        return len(self.task_ids)
+    
+    def used_memory(self) -> np.ndarray:
+        """每个GPU的已用显存（按 gpu_idx）"""
+        return np.bincount(self.gpu_idx, weights=self.memory_usage, minlength=self.gpu_count)
+    
+    def free_memory(self) -> np.ndarray:
+        """每个GPU的剩余显存（按 gpu_idx）"""
+        return self.total_memory - self.used_memory()
+    
+    def task_footprint(self) -> np.ndarray:
+        """每个任务在所有GPU上的显存总占用（按 task_idx）"""
+        valid = self.task_idx >= 0
+        return np.bincount(self.task_idx[valid], weights=self.memory_usage[valid],
+                           minlength=self.task_count)
+    
+    def overcommitted_gpus(self) -> np.ndarray:
+        """已用显存超过总显存的GPU ID"""
+        return self.gpu_ids[self.used_memory() > self.total_memory]
+    
+    def task_memory_on(self, task_id: int) -> np.ndarray:
+        """指定任务在每个GPU上的显存占用（按 gpu_idx）"""
+        task_idx = self.task_pos.get(task_id, -2)
+        mask = self.task_idx == task_idx
+        return np.bincount(self.gpu_idx[mask], weights=self.memory_usage[mask],
+                           minlength=self.gpu_count)
+    
+    def available_memory(self, task_id: int) -> np.ndarray:
+        """每个GPU上可分配给指定任务的显存（剩余显存 + 该任务已占用的显存，按 gpu_idx）"""
+        return self.free_memory() + self.task_memory_on(task_id)
+    
+    def task_breakdown(self):
+        """
+        每个(GPU, 任务)的显存占用
+        
+        Returns:
+            (gpu_idx, task_idx, memory) 三个数组，按 gpu_idx、task_idx 排序，不含任务不存在的分配
+        """
+        valid = self.task_idx >= 0
+        keys = self.gpu_idx[valid] * max(self.task_count, 1) + self.task_idx[valid]
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        memory = np.bincount(inverse, weights=self.memory_usage[valid],
+                             minlength=len(unique_keys))
+        task_count = max(self.task_count, 1)
+        return unique_keys // task_count, unique_keys % task_count, memory
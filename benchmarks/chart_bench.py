@@ -0,0 +1,163 @@
+"""
+图表绘制基准
+在 offscreen Qt 平台上把 ChartWidget 的可见区域反复绘制到 QImage（每帧向下滚动一屏，
+模拟在滚动区域中浏览），测量每帧绘制耗时，并按阶段拆分：渲染行位图的背景柱、任务分段、
+文字标签三个阶段（只在行位图缓存未命中时执行）以及贴图；另外测量热力图概览整体重绘的耗时。
+结果输出为JSON，可与基线比较。
+
+用法:
+    python -m benchmarks.chart_bench --output chart.json
+    python -m benchmarks.chart_bench --gpus 100,500 --tasks-per-gpu 1,8 --baseline chart.json
+"""
+import argparse
+import os
+import platform
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+from benchmarks import report
+from benchmarks.cluster import generate_cluster
+from data_manager import DataManager
+from storage.serializer import Serializer
+from ui.chart_data import ChartDataset, build_chart_dataset
+
+
+DEFAULT_GPUS = [10, 100, 500, 1000]
+DEFAULT_TASKS_PER_GPU = [1, 4, 16]
+
+
+class PhaseRecorder:
+    """记录每帧各阶段的绘制耗时（ChartWidget.paint_profiler）"""
+    
+    def __init__(self):
+        self.samples = {}  # {phase: [秒]}
+    
+    def record(self, phase: str, seconds: float):
+        self.samples.setdefault(phase, []).append(seconds)
+
+
+def chart_dataset(gpu_count: int, tasks_per_gpu: int, seed: int = 0) -> ChartDataset:
+    """生成 ChartWidget.set_data 的输入（经 DataManager 加载合成数据后构建）"""
+    data = generate_cluster(gpu_count * tasks_per_gpu, gpus=gpu_count,
+                            tasks=max(1, gpu_count * tasks_per_gpu // 4), seed=seed)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "gpu_data.json")
+        Serializer().dump(data, data_file)
+        data_manager = DataManager(data_file)
+        dataset = build_chart_dataset(data_manager)
+        data_manager.close()
+    return dataset
+
+
+def bench_chart(gpu_count: int, tasks_per_gpu: int, frames: int, width: int,
+                height: int) -> List[Dict]:
+    """
+    反复绘制一个规模的图表
+    
+    Args:
+        gpu_count: GPU数量
+        tasks_per_gpu: 每个GPU上的任务数量
+        frames: 绘制帧数
+        width: 图表宽度
+        height: 可见区域高度
+    
+    Returns:
+        结果列表 [{"case", "gpus", "tasks_per_gpu", "ms"}]，ms 为每帧耗时中位数
+    """
+    from PyQt5.QtCore import QPoint
+    from PyQt5.QtGui import QImage, QRegion
+    from ui.chart_widget import ChartWidget
+    from ui.heatmap_widget import HeatmapWidget
+    
+    dataset = chart_dataset(gpu_count, tasks_per_gpu)
+    widget = ChartWidget()
+    widget.set_data(dataset)
+    widget.resize(width, widget.minimumHeight())
+    recorder = PhaseRecorder()
+    widget.paint_profiler = recorder
+    image = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+    scroll_range = max(1, widget.height() - height)
+    totals = []
+    for frame in range(frames):
+        image.fill(0xFFFFFFFF)
+        scroll_y = frame * height % scroll_range
+        start = time.perf_counter()
+        widget.render(image, QPoint(), QRegion(0, scroll_y, width, height))
+        totals.append(time.perf_counter() - start)
+    widget.deleteLater()
+    
+    # 热力图概览：每帧重新生成全部格子的图像并整体绘制
+    heatmap = HeatmapWidget()
+    heatmap.resize(width, height)
+    heatmap.set_data(dataset)
+    heatmap.resize(width, heatmap.minimumHeight())
+    heatmap_image = QImage(heatmap.size(), QImage.Format_ARGB32_Premultiplied)
+    heatmap_totals = []
+    for _ in range(frames):
+        heatmap_image.fill(0xFFFFFFFF)
+        heatmap.image = None
+        start = time.perf_counter()
+        heatmap.render(heatmap_image)
+        heatmap_totals.append(time.perf_counter() - start)
+    heatmap.deleteLater()
+    
+    results = [("paint_total", totals)] + [
+        ("paint_" + phase, samples) for phase, samples in recorder.samples.items()
+    ] + [("heatmap_total", heatmap_totals)]
+    return [{"case": case, "gpus": gpu_count, "tasks_per_gpu": tasks_per_gpu,
+             "ms": round(statistics.median(samples) * 1000, 4)}
+            for case, samples in results]
+
+
+def run(gpus: List[int] = DEFAULT_GPUS, tasks_per_gpu: List[int] = DEFAULT_TASKS_PER_GPU,
+        frames: int = 20, width: int = 1200, height: int = 800) -> Dict:
+    """
+    运行全部规模的绘制基准
+    
+    Returns:
+        {"meta": 运行环境, "results": 结果列表}
+    """
+    # 没有显示器时使用offscreen平台，需在创建QApplication之前设置
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import QT_VERSION_STR
+    from PyQt5.QtWidgets import QApplication
+    
+    app = QApplication.instance() or QApplication([])
+    results = []
+    for gpu_count in gpus:
+        for density in tasks_per_gpu:
+            results.extend(bench_chart(gpu_count, density, frames, width, height))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "qt": QT_VERSION_STR,
+            "qpa_platform": app.platformName(),
+            "frames": frames,
+            "size": [width, height],
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ChartWidget 绘制基准")
+    parser.add_argument("--gpus", default=",".join(str(n) for n in DEFAULT_GPUS),
+                        help="GPU数量列表，逗号分隔")
+    parser.add_argument("--tasks-per-gpu", default=",".join(str(n) for n in DEFAULT_TASKS_PER_GPU),
+                        help="每个GPU上的任务数量列表，逗号分隔")
+    parser.add_argument("--frames", type=int, default=20, help="每个规模绘制的帧数（取中位数）")
+    parser.add_argument("--width", type=int, default=1200, help="图表宽度")
+    parser.add_argument("--height", type=int, default=800, help="可见区域高度")
+    report.add_arguments(parser)
+    args = parser.parse_args()
+    
+    report.finish(run([int(n) for n in args.gpus.split(",")],
+                      [int(n) for n in args.tasks_per_gpu.split(",")],
+                      args.frames, args.width, args.height), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+合成集群数据生成模块
+按 方案 × GPU × 任务 × 分配 的规模生成确定性的数据（相同参数和种子总是生成相同的数据）
+"""
+import random
+import migrations
+
+
+def generate_cluster(allocations: int, gpus: int = 0, tasks: int = 0, schemes: int = 1,
+                     seed: int = 0) -> dict:
+    """
+    生成合成集群数据
+    
+    Args:
+        allocations: 每个方案的分配数量
+        gpus: 每个方案的GPU数量，为0时按分配数量推算（每张GPU约25个分配）
+        tasks: 每个方案的任务数量，为0时按分配数量推算（每个任务约5个分配）
+        schemes: 方案数量
+        seed: 随机种子
+    
+    Returns:
+        与JSON数据文件结构相同的数据（当前格式版本）
+    """
+    rng = random.Random(seed)
+    gpus = gpus or max(2, allocations // 25)
+    tasks = tasks or max(1, allocations // 5)
+    # 每个(任务, GPU)最多一个分配
+    allocations = min(allocations, gpus * tasks)
+    data = {"schema_version": migrations.SCHEMA_VERSION, "schemes": [], "next_scheme_id": schemes + 1}
+    for scheme_id in range(1, schemes + 1):
+        gpu_list = [
+            {"id": i, "name": f"A100-{i:05d}", "total_memory": rng.choice((24, 40, 80))}
+            for i in range(1, gpus + 1)
+        ]
+        task_list = [
+            {"id": i, "name": f"任务-{i % 500}", "description": ""}
+            for i in range(1, tasks + 1)
+        ]
+        # 每个任务依次分配到连续的若干张GPU上，起点随机
+        alloc_list = []
+        per_task, extra = divmod(allocations, tasks)
+        for task_id in range(1, tasks + 1):
+            count = per_task + (1 if task_id <= extra else 0)
+            start = rng.randrange(gpus)
+            for k in range(count):
+                alloc_list.append({
+                    "task_id": task_id,
+                    "gpu_id": (start + k) % gpus + 1,
+                    "memory_usage": rng.choice((0.5, 1, 2, 4, 8)),
+                })
+        data["schemes"].append({
+            "id": scheme_id,
+            "name": f"方案{scheme_id}",
+            "gpus": gpu_list,
+            "tasks": task_list,
+            "allocations": alloc_list,
+            "next_gpu_id": gpus + 1,
+            "next_task_id": tasks + 1,
+        })
+    return data
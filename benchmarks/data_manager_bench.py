@@ -0,0 +1,179 @@
+"""
+DataManager 集群规模基准
+在不同规模（10 ~ 100k 条分配）的合成数据上测量加载、保存、增删分配、事务提交和回滚、
+后台写盘模式下的单次编辑、全部GPU的 get_gpu_usage 以及图表数据准备
+（GPU修改后和分配修改后）的耗时。
+不需要图形界面，结果输出为JSON，可与保存的基线比较，超过回归阈值时以非零状态退出。
+
+用法:
+    python -m benchmarks.data_manager_bench --output result.json
+    python -m benchmarks.data_manager_bench --baseline result.json --threshold 0.25 --min-ms 0.5
+"""
+import argparse
+import itertools
+import os
+import platform
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+from benchmarks import report
+from benchmarks.cluster import generate_cluster
+from data_manager import DataManager
+from storage.serializer import Serializer, orjson
+from ui.chart_data import build_chart_dataset
+
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+# 事务基准中每个事务包含的修改数
+TRANSACTION_OPS = 10
+
+
+class _Rollback(Exception):
+    """事务回滚基准中主动抛出的异常"""
+
+
+def _time(func: Callable, repeat: int, setup: Optional[Callable] = None) -> float:
+    """多次运行取中位数耗时（毫秒），setup 在每次计时前执行且不计入耗时"""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _free_pairs(data_manager: DataManager, count: int) -> List[tuple]:
+    """找出 count 个尚未分配的 (task_id, gpu_id)"""
+    gpu_ids = [gpu["id"] for gpu in data_manager.get_all_gpus()]
+    pairs = []
+    for task in data_manager.get_all_tasks():
+        allocated = {alloc["gpu_id"] for alloc in data_manager.get_allocations_by_task(task["id"])}
+        for gpu_id in gpu_ids:
+            if gpu_id not in allocated:
+                pairs.append((task["id"], gpu_id))
+                if len(pairs) >= count:
+                    return pairs
+    # GPU全部分配满时新建一个任务
+    while len(pairs) < count:
+        task_id = data_manager.add_task("基准任务")
+        pairs.extend((task_id, gpu_id) for gpu_id in gpu_ids[:count - len(pairs)])
+    return pairs
+
+
+def bench_size(allocations: int, schemes: int, repeat: int) -> List[Dict]:
+    """
+    测量一个规模下的各项耗时
+    
+    Args:
+        allocations: 每个方案的分配数量
+        schemes: 方案数量
+        repeat: 每项重复次数
+    
+    Returns:
+        结果列表 [{"case", "allocations", "ms"}]
+    """
+    data = generate_cluster(allocations, schemes=schemes)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "gpu_data.json")
+        Serializer().dump(data, data_file)
+        holder = {}
+        results = {"load": _time(lambda: holder.update(dm=DataManager(data_file)), repeat)}
+        data_manager = holder["dm"]
+        results["save"] = _time(data_manager.save_data, repeat)
+        
+        # 增删分配（含同步写盘）
+        pairs = _free_pairs(data_manager, repeat)
+        pending = list(pairs)
+        results["add_allocation"] = _time(
+            lambda: data_manager.add_allocation(*pending.pop(), 1.0), len(pairs))
+        pending = list(pairs)
+        results["delete_allocation"] = _time(
+            lambda: data_manager.delete_allocation(*pending.pop()), len(pairs))
+        
+        # 事务：提交时写盘一次；回滚时按撤销日志恢复
+        pairs = _free_pairs(data_manager, TRANSACTION_OPS)
+        
+        def transaction(fail: bool):
+            try:
+                with data_manager.transaction():
+                    for task_id, gpu_id in pairs:
+                        data_manager.add_allocation(task_id, gpu_id, 1.0)
+                    if fail:
+                        raise _Rollback()
+            except _Rollback:
+                pass
+        
+        results["transaction_rollback"] = _time(lambda: transaction(True), repeat)
+        results["transaction_commit"] = _time(
+            lambda: transaction(False), repeat,
+            setup=lambda: [data_manager.delete_allocation(*pair) for pair in pairs])
+        
+        gpu_ids = [gpu["id"] for gpu in data_manager.get_all_gpus()]
+        results["gpu_usage_all"] = _time(
+            lambda: [data_manager.get_gpu_usage(gpu_id) for gpu_id in gpu_ids], repeat)
+        
+        # 图表数据准备：每次计时前修改一次GPU，模拟编辑后的整体刷新（列式缓存失效）
+        gpu = data_manager.get_all_gpus()[0]
+        results["chart_data"] = _time(
+            lambda: build_chart_dataset(data_manager), repeat,
+            setup=lambda: data_manager.update_gpu(gpu["id"], gpu["name"], gpu["total_memory"]))
+        # 编辑分配后的整体刷新：列式表示原地更新，不重新构建
+        alloc = data_manager.get_all_allocations()[0]
+        memory = itertools.count(2)
+        results["chart_data_after_edit"] = _time(
+            lambda: build_chart_dataset(data_manager), repeat,
+            setup=lambda: data_manager.add_allocation(alloc["task_id"], alloc["gpu_id"],
+                                                      float(next(memory))))
+        data_manager.close()
+        
+        # 后台写盘模式：编辑在界面线程上的耗时（含准备写盘快照）
+        async_manager = DataManager(data_file, async_save=True, save_debounce=60.0)
+        alloc = async_manager.get_all_allocations()[0]
+        results["async_edit"] = _time(
+            lambda: async_manager.add_allocation(alloc["task_id"], alloc["gpu_id"], 2.0), repeat)
+        async_manager.close()
+    return [{"case": case, "allocations": allocations, "ms": round(ms, 4)}
+            for case, ms in results.items()]
+
+
+def run(sizes: List[int] = DEFAULT_SIZES, schemes: int = 3, repeat: int = 5) -> Dict:
+    """
+    运行全部规模的基准
+    
+    Returns:
+        {"meta": 运行环境, "results": 结果列表}
+    """
+    results = []
+    for size in sizes:
+        results.extend(bench_size(size, schemes, repeat))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "orjson": orjson is not None,
+            "schemes": schemes,
+            "repeat": repeat,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DataManager 集群规模基准")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="分配数量列表，逗号分隔")
+    parser.add_argument("--schemes", type=int, default=3, help="方案数量")
+    parser.add_argument("--repeat", type=int, default=5, help="每项重复次数（取中位数）")
+    report.add_arguments(parser)
+    args = parser.parse_args()
+    
+    report.finish(run([int(size) for size in args.sizes.split(",")], args.schemes, args.repeat),
+                  args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+基准结果输出与基线比较
+结果为 {"meta": {...}, "results": [{..., "ms": 耗时}]}，除 ms 外的字段共同确定一项测量
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List
+
+
+# 与基线的绝对差值低于该值（毫秒）时视为测量噪声（compare 和命令行 --min-ms 的默认值）
+DEFAULT_MIN_MS = 0.5
+
+
+def _key(result: Dict) -> tuple:
+    return tuple(sorted((name, value) for name, value in result.items() if name != "ms"))
+
+
+def compare(current: Dict, baseline: Dict, threshold: float,
+            min_ms: float = DEFAULT_MIN_MS) -> List[Dict]:
+    """
+    与基线比较
+    
+    Args:
+        current: 本次结果
+        baseline: 基线结果
+        threshold: 回归阈值（0.25 表示比基线慢25%以上算回归）
+        min_ms: 绝对差值低于该值（毫秒）时视为测量噪声
+    
+    Returns:
+        回归列表，每项为测量字段加上 baseline_ms、ratio
+    """
+    base = {_key(result): result["ms"] for result in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        base_ms = base.get(_key(result))
+        if base_ms is None:
+            continue
+        if result["ms"] > base_ms * (1 + threshold) and result["ms"] - base_ms > min_ms:
+            regressions.append({
+                **result,
+                "baseline_ms": base_ms,
+                "ratio": round(result["ms"] / base_ms, 3) if base_ms else None,
+            })
+    return regressions
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """添加结果输出和基线比较的命令行参数"""
+    parser.add_argument("--output", help="结果JSON文件，默认输出到标准输出")
+    parser.add_argument("--baseline", help="基线结果JSON文件")
+    parser.add_argument("--threshold", type=float, default=0.25, help="回归阈值（相对基线）")
+    parser.add_argument("--min-ms", type=float, default=DEFAULT_MIN_MS,
+                        help="与基线相差不足该值（毫秒）时视为测量噪声")
+
+
+def finish(report: Dict, args: argparse.Namespace):
+    """输出结果；指定基线时比较，有回归时以非零状态退出"""
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        report["regressions"] = compare(report, baseline, args.threshold, args.min_ms)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    for regression in report.get("regressions", []):
+        fields = ", ".join(f"{name}={value}" for name, value in regression.items()
+                           if name not in ("ms", "baseline_ms", "ratio"))
+        print(f"回归: {fields} {regression['baseline_ms']:.3f}ms -> {regression['ms']:.3f}ms",
+              file=sys.stderr)
+    sys.exit(1 if report.get("regressions") else 0)
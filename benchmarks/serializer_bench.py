@@ -0,0 +1,86 @@
+"""
+序列化微基准
+在合成的5万条分配数据上比较各序列化方式的编码/解码耗时和文件大小
+
+用法: python -m benchmarks.serializer_bench [分配数量]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from benchmarks.cluster import generate_cluster
+from storage.serializer import Serializer, orjson
+
+
+class _IndentedStdlib(Serializer):
+    """旧的写盘方式：标准库json，缩进2"""
+    
+    def __init__(self):
+        super().__init__(use_orjson=False)
+    
+    def dumps(self, data):
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _best_of(func, repeat: int) -> float:
+    """多次运行取最短耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(allocation_count: int = 50000, repeat: int = 3) -> list:
+    """
+    运行基准
+    
+    Args:
+        allocation_count: 分配数量
+        repeat: 每项重复次数（取最短耗时）
+    
+    Returns:
+        结果列表 [{"name", "encode_ms", "decode_ms", "size_bytes"}]
+    """
+    data = generate_cluster(allocation_count)
+    candidates = [
+        ("stdlib indent=2（旧）", _IndentedStdlib(), ".json"),
+        ("stdlib 紧凑", Serializer(use_orjson=False), ".json"),
+    ]
+    if orjson is not None:
+        candidates.append(("orjson 紧凑", Serializer(), ".json"))
+    candidates += [
+        ("紧凑 + gzip", Serializer(compression="gzip"), ".json.gz"),
+        ("紧凑 + lzma", Serializer(compression="lzma"), ".json.xz"),
+    ]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, serializer, extension in candidates:
+            path = os.path.join(tmp_dir, "bench" + extension)
+            encode = _best_of(lambda: serializer.dump(data, path), repeat)
+            decode = _best_of(lambda: serializer.load(path), repeat)
+            assert serializer.load(path) == data
+            results.append({
+                "name": name,
+                "encode_ms": encode * 1000,
+                "decode_ms": decode * 1000,
+                "size_bytes": os.path.getsize(path),
+            })
+    return results
+
+
+def main():
+    allocation_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    results = run(allocation_count)
+    baseline = results[0]["size_bytes"]
+    print(f"合成数据: {allocation_count} 条分配（orjson {'可用' if orjson else '不可用'}）")
+    print(f"{'方式':<20}{'编码(ms)':>10}{'解码(ms)':>10}{'大小(KB)':>12}{'相对大小':>10}")
+    for result in results:
+        print(f"{result['name']:<20}{result['encode_ms']:>10.1f}{result['decode_ms']:>10.1f}"
+              f"{result['size_bytes'] / 1024:>12.1f}{result['size_bytes'] / baseline:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -61,8 +61,24 @@ def build_exe():
         "--hidden-import=PyQt5.QtGui",
         "--hidden-import=PyQt5.QtWidgets",
         "--hidden-import=data_manager",
+        "--hidden-import=allocation_store",
+        "--hidden-import=records",
+        "--hidden-import=events",
+        "--hidden-import=settings",
+        "--hidden-import=migrations",
+        "--hidden-import=instrumentation",
+        "--hidden-import=storage.async_writer",
+        "--hidden-import=storage.journal",
+        "--hidden-import=storage.backend",
+        "--hidden-import=storage.sqlite_backend",
+        "--hidden-import=storage.sharded",
+        "--hidden-import=storage.serializer",
         "--hidden-import=ui.main_window",
         "--hidden-import=ui.chart_widget",
+        "--hidden-import=ui.chart_data",
+        "--hidden-import=ui.heatmap_widget",
+        "--hidden-import=ui.gl_chart_view",
+        "--hidden-import=ui.profile_overlay",
         "--hidden-import=ui.dialogs.scheme_manager_dialog",
         "--hidden-import=ui.dialogs.gpu_manager_dialog",
         "--hidden-import=ui.dialogs.task_manager_dialog",
@@ -2,110 +2,689 @@
 数据管理模块
 负责GPU、任务和关联关系的数据存储和读取
 """
-import json
+import atexit
 import os
-from typing import List, Dict, Optional
+from contextlib import contextmanager
+from typing import Callable, List, Dict, Optional
+import events
+import instrumentation
+import migrations
+from allocation_store import AllocationColumns
+from events import ChangeEvent
+from records import AllocationRecord, AllocationView, GPURecord, TaskRecord, json_default
+from storage.async_writer import AsyncWriter
+from storage.backend import StorageBackend
+from storage.journal import Journal
+from storage.serializer import serializer_for
+from storage.sharded import ShardedStorage
+from storage.sqlite_backend import SQLiteStorage
+
+
+class _SchemeIndex:
+    """单个方案的内存索引：id→记录，以及按GPU/任务分组的分配索引"""
+    
+    def __init__(self, scheme: Dict):
+        self.gpus = {gpu.id: gpu for gpu in scheme.get("gpus", [])}
+        self.tasks = {task.id: task for task in scheme.get("tasks", [])}
+        self.allocs_by_gpu = {}  # {gpu_id: {task_id: alloc}}
+        self.allocs_by_task = {}  # {task_id: {gpu_id: alloc}}
+        self.used_memory = {}  # {gpu_id: 已用显存}，随分配变化增量维护
+        self.columns = None  # 列式分配表示（AllocationColumns），按需构建，随分配修改原地更新，GPU或任务修改后失效
+        for alloc in scheme.get("allocations", []):
+            self.add_allocation(alloc, refresh=False)
+        for gpu_id in self.allocs_by_gpu:
+            self._refresh_used(gpu_id)
+    
+    def _refresh_used(self, gpu_id: int):
+        """重新汇总单个GPU的已用显存（只遍历该GPU上的分配）"""
+        by_gpu = self.allocs_by_gpu.get(gpu_id)
+        if by_gpu:
+            self.used_memory[gpu_id] = sum(alloc.memory_usage for alloc in by_gpu.values())
+        else:
+            self.used_memory.pop(gpu_id, None)
+    
+    def get_allocation(self, task_id: int, gpu_id: int) -> Optional[Dict]:
+        """获取指定任务-GPU的分配"""
+        return self.allocs_by_gpu.get(gpu_id, {}).get(task_id)
+    
+    def add_allocation(self, alloc: Dict, refresh: bool = True):
+        """将分配加入索引"""
+        self.allocs_by_gpu.setdefault(alloc.gpu_id, {})[alloc.task_id] = alloc
+        self.allocs_by_task.setdefault(alloc.task_id, {})[alloc.gpu_id] = alloc
+        if self.columns is not None:
+            self.columns.put(alloc)
+        if refresh:
+            self._refresh_used(alloc.gpu_id)
+    
+    def set_allocation_memory(self, alloc: Dict, memory_usage: float):
+        """修改已有分配的显存占用"""
+        alloc.memory_usage = memory_usage
+        if self.columns is not None:
+            self.columns.put(alloc)
+        self._refresh_used(alloc.gpu_id)
+    
+    def remove_allocation(self, task_id: int, gpu_id: int) -> Optional[Dict]:
+        """从索引中移除分配，返回被移除的分配"""
+        by_gpu = self.allocs_by_gpu.get(gpu_id)
+        alloc = by_gpu.pop(task_id, None) if by_gpu is not None else None
+        if by_gpu is not None and not by_gpu:
+            del self.allocs_by_gpu[gpu_id]
+        by_task = self.allocs_by_task.get(task_id)
+        if by_task is not None:
+            by_task.pop(gpu_id, None)
+            if not by_task:
+                del self.allocs_by_task[task_id]
+        if alloc is not None:
+            if self.columns is not None:
+                self.columns.remove(task_id, gpu_id)
+            self._refresh_used(gpu_id)
+        return alloc
+    
+    def remove_gpu(self, gpu_id: int) -> List[Dict]:
+        """移除GPU及其全部分配，返回被移除的分配"""
+        self.gpus.pop(gpu_id, None)
+        self.columns = None
+        removed = list(self.allocs_by_gpu.get(gpu_id, {}).values())
+        for alloc in removed:
+            self.remove_allocation(alloc.task_id, gpu_id)
+        return removed
+    
+    def remove_task(self, task_id: int) -> List[Dict]:
+        """移除任务及其全部分配，返回被移除的分配"""
+        self.tasks.pop(task_id, None)
+        self.columns = None
+        removed = list(self.allocs_by_task.get(task_id, {}).values())
+        for alloc in removed:
+            self.remove_allocation(task_id, alloc.gpu_id)
+        return removed
+
+
+# 按扩展名自动选用SQLite存储后端
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+# 每类变更会修改的方案记录列表，用于使后台写盘的快照缓存失效
+_SNAPSHOT_LISTS = {
+    "del_scheme": ("gpus", "tasks", "allocations"),
+    "put_gpu": ("gpus",),
+    "del_gpu": ("gpus", "allocations"),
+    "put_task": ("tasks",),
+    "del_task": ("tasks", "allocations"),
+    "put_alloc": ("allocations",),
+    "del_alloc": ("allocations",),
+}
 
 
 class DataManager:
-    """数据管理器，使用JSON文件存储数据"""
+    """数据管理器，默认使用JSON文件存储数据，也可使用可插拔的存储后端"""
     
-    def __init__(self, data_file: str = "gpu_data.json"):
+    def __init__(self, data_file: str = "gpu_data.json", async_save: bool = False,
+                 save_debounce: float = 0.5, journal: bool = False,
+                 journal_compact_bytes: int = 1024 * 1024,
+                 storage: Optional[StorageBackend] = None, max_loaded_schemes: int = 4):
         """
         初始化数据管理器
         
         Args:
             data_file: 数据文件路径
+            async_save: 是否在后台线程中写盘（编辑立即返回，连续编辑合并写入）
+            save_debounce: 后台写盘的去抖窗口（秒）
+            journal: 是否启用变更日志模式（每次修改只追加一行到 data_file + ".journal"，
+                     数据文件作为检查点快照）
+            journal_compact_bytes: 变更日志超过该大小时合并进检查点快照
+            storage: 存储后端，为None时data_file以.db/.sqlite/.sqlite3结尾则使用SQLite，
+                     data_file为目录则使用分片存储（按方案懒加载），否则使用JSON文件
+                     （以.gz/.xz/.lzma结尾时压缩存储）
+            max_loaded_schemes: 懒加载后端最多同时加载的方案数，超过时释放最久未使用的方案
         """
         self.data_file = data_file
+        self._serializer = serializer_for(data_file, default=json_default)
         self.data = {
-            "schemes": [],  # 分配方案列表（每个方案包含自己的gpus、tasks、allocations）
-            "current_scheme_id": None  # 当前选中的方案ID
+            "schema_version": migrations.SCHEMA_VERSION,  # 数据格式版本，见migrations
+            "schemes": []  # 分配方案列表（每个方案包含自己的gpus、tasks、allocations）
         }
+        # 当前选中的方案ID属于界面会话状态，不写入数据文件（由界面设置保存）
+        self._current_scheme_id = None
+        # 内存索引（不写入数据文件）
+        self._scheme_by_id = {}  # {scheme_id: scheme}
+        self._indexes = {}  # {scheme_id: _SchemeIndex}
+        # 事务状态：事务内的save_data只标记脏，提交时统一写盘；
+        # 撤销日志记录事务内每条变更的撤销函数，回滚时按相反顺序执行
+        self._transaction_depth = 0
+        self._transaction_dirty = False
+        self._undo_log = []
+        # 变更日志模式：待写入的变更，在save_data时追加到日志
+        self._journal = Journal(data_file + ".journal") if journal else None
+        self.journal_compact_bytes = journal_compact_bytes
+        self._pending_ops = []
+        # 追加日志失败后需要写检查点快照；写入成功前保留待写变更，不再追加日志
+        self._checkpoint_needed = False
+        # 变更事件订阅者；事件在修改完成后（事务内则在提交后）统一发送
+        self._listeners = []
+        self._pending_events = []
+        # 存储后端：变更按行持久化
+        if storage is None and data_file.lower().endswith(SQLITE_EXTENSIONS):
+            storage = SQLiteStorage(data_file)
+        elif storage is None and os.path.isdir(data_file):
+            storage = ShardedStorage(data_file)
+        self._storage = storage
+        # 存储后端写入失败时保留待写变更；没有对应变更的全量写入失败时标记，下次保存时重试
+        self._storage_dirty = False
+        # 懒加载后端：已加载方案的使用顺序（最近切换到的在最后）
+        self.max_loaded_schemes = max_loaded_schemes
+        self._scheme_lru = {}
+        # 后台写盘线程（可选，变更日志和存储后端模式下每次只写变更，不使用后台线程），程序退出时自动落盘
+        self._writer = None
+        # 后台写盘的快照缓存 {(scheme_id, 列表名): 字典列表}，只有被修改的列表在下次快照时重新转换
+        self._snapshot_cache = {}
+        if async_save and not journal and storage is None:
+            self._writer = AsyncWriter(self._write_file, debounce=save_debounce)
+            atexit.register(self._writer.close)
         self.load_data()
         # 如果没有方案，创建默认方案
         if not self.data.get("schemes") or len(self.data.get("schemes", [])) == 0:
             self.create_default_scheme()
         # 如果没有当前方案，设置第一个方案为当前方案
-        if self.data.get("current_scheme_id") is None and self.data.get("schemes"):
-            self.data["current_scheme_id"] = self.data["schemes"][0]["id"]
-            self.save_data()
+        if self._current_scheme_id not in self._scheme_by_id and self.data.get("schemes"):
+            self._mutate("set_current", scheme_id=self.data["schemes"][0]["id"])
     
     def load_data(self):
-        """从JSON文件加载数据"""
-        if os.path.exists(self.data_file):
+        """
+        从JSON文件或存储后端加载数据（变更日志模式下再重放日志）
+        
+        当前格式版本的数据直接建立索引；旧版本数据按迁移链迁移一次并写回
+        """
+        self.data = None
+        if self._storage:
+            try:
+                self.data = self._storage.load()
+            except Exception as e:
+                print(f"加载数据失败: {e}")
+        elif os.path.exists(self.data_file):
             try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    loaded_data = json.load(f)
-                    # 兼容旧数据格式
-                    if "schemes" not in loaded_data:
-                        # 迁移旧数据到默认方案
-                        self.data = {
-                            "schemes": [],
-                            "current_scheme_id": None
-                        }
-                        # 创建默认方案并迁移数据
-                        scheme_id = self.create_default_scheme()
-                        scheme = self.get_scheme(scheme_id)
-                        if scheme:
-                            # 迁移GPU列表
-                            scheme["gpus"] = loaded_data.get("gpus", [])
-                            # 迁移任务和分配
-                            scheme["tasks"] = loaded_data.get("tasks", [])
-                            scheme["allocations"] = loaded_data.get("allocations", [])
-                            self.save_data()
-                    else:
-                        # 新格式数据，但需要检查是否有全局gpus需要迁移
-                        self.data = loaded_data
-                        # 如果有全局gpus，迁移到所有方案
-                        if "gpus" in loaded_data and loaded_data["gpus"]:
-                            global_gpus = loaded_data["gpus"]
-                            for scheme in self.data.get("schemes", []):
-                                if "gpus" not in scheme or not scheme.get("gpus"):
-                                    scheme["gpus"] = global_gpus.copy()
-                            # 删除全局gpus
-                            if "gpus" in self.data:
-                                del self.data["gpus"]
-                            self.save_data()
-                        # 确保每个方案都有gpus字段
-                        for scheme in self.data.get("schemes", []):
-                            if "gpus" not in scheme:
-                                scheme["gpus"] = []
+                self.data = self._serializer.load(self.data_file)
+                if instrumentation.is_enabled():
+                    instrumentation.record("load_data.bytes", os.path.getsize(self.data_file))
             except Exception as e:
                 print(f"加载数据失败: {e}")
-                self.data = {"schemes": [], "current_scheme_id": None}
+        migrated = False
+        if self.data is None:
+            self.data = {"schema_version": migrations.SCHEMA_VERSION, "schemes": []}
         else:
-            self.data = {"schemes": [], "current_scheme_id": None}
+            migrated = migrations.migrate(self.data)
+        # 旧版本把当前方案保存在数据文件中，仅作为初始选择读取，之后不再写回
+        legacy_current = self.data.pop("current_scheme_id", None)
+        if self._current_scheme_id is None:
+            self._current_scheme_id = legacy_current
+        self._rebuild_indexes()
+        if self._journal:
+            self._replay_journal()
+        if migrated:
+            self.save_data()
     
-    def create_default_scheme(self):
-        """创建默认方案"""
-        scheme_id = max([s.get("id", 0) for s in self.data.get("schemes", [])], default=0) + 1
+    def _replay_journal(self):
+        """重放变更日志；日志残缺或超过阈值时立即合并进检查点快照"""
+        ops, complete = self._journal.read()
+        for op in ops:
+            try:
+                self._apply(op)
+            except Exception as e:
+                print(f"重放变更失败: {e}")
+        if not complete or self._journal.size() >= self.journal_compact_bytes:
+            self._checkpoint()
+    
+    def _rebuild_indexes(self):
+        """根据self.data重建全部内存索引（未加载的方案只记录id）"""
+        self._scheme_by_id = {}
+        self._indexes = {}
+        self._snapshot_cache = {}
+        for scheme in self.data.get("schemes", []):
+            if "gpus" in scheme:
+                self._index_scheme(scheme)
+            else:
+                self._scheme_by_id[scheme["id"]] = scheme
+    
+    def _index_scheme(self, scheme: Dict):
+        """为单个方案建立索引（JSON字典转换为记录对象）"""
+        scheme["gpus"] = [gpu if isinstance(gpu, GPURecord) else GPURecord.from_json(gpu)
+                          for gpu in scheme.get("gpus", [])]
+        scheme["tasks"] = [task if isinstance(task, TaskRecord) else TaskRecord.from_json(task)
+                           for task in scheme.get("tasks", [])]
+        scheme["allocations"] = [
+            alloc if isinstance(alloc, AllocationRecord) else AllocationRecord.from_json(alloc)
+            for alloc in scheme.get("allocations", [])
+        ]
+        self._scheme_by_id[scheme["id"]] = scheme
+        self._indexes[scheme["id"]] = _SchemeIndex(scheme)
+    
+    def _ensure_loaded(self, scheme_id: int) -> Optional[Dict]:
+        """懒加载后端下第一次访问方案时读取方案内容并建立索引"""
+        scheme = self._scheme_by_id.get(scheme_id)
+        if scheme is not None and scheme_id not in self._indexes:
+            scheme.pop("task_count", None)
+            scheme.update(self._storage.load_scheme(scheme_id))
+            scheme.setdefault("gpus", [])
+            if "next_gpu_id" not in scheme or "next_task_id" not in scheme:
+                migrations.init_id_counters(scheme)
+            self._index_scheme(scheme)
+        return scheme
+    
+    def evict_schemes(self, keep: int = 1) -> int:
+        """
+        按最久未使用的顺序释放已加载方案的内存，直到只剩 keep 个（仅懒加载后端）
+        
+        当前方案和有未写盘修改的方案不释放
+        
+        Args:
+            keep: 保留的已加载方案数量
+        
+        Returns:
+            释放的方案数量
+        """
+        if not (self._storage and self._storage.lazy) or self._transaction_depth > 0 \
+                or self._storage_dirty:
+            return 0
+        dirty = {op["scheme_id"] if "scheme_id" in op else op["record"]["id"]
+                 for op in self._pending_ops}
+        # 从未切换到的方案排在最前
+        order = [scheme_id for scheme_id in self._indexes if scheme_id not in self._scheme_lru]
+        order += [scheme_id for scheme_id in self._scheme_lru if scheme_id in self._indexes]
+        count = 0
+        for scheme_id in order:
+            if len(self._indexes) <= keep:
+                break
+            if scheme_id == self._current_scheme_id or scheme_id in dirty:
+                continue
+            scheme = self._scheme_by_id[scheme_id]
+            task_count = len(scheme["tasks"])
+            for key in [key for key in scheme if key not in ("id", "name")]:
+                del scheme[key]
+            scheme["task_count"] = task_count
+            del self._indexes[scheme_id]
+            self._scheme_lru.pop(scheme_id, None)
+            count += 1
+        return count
+    
+    def _current_index(self) -> Optional[_SchemeIndex]:
+        """获取当前方案的索引"""
+        if self._current_scheme_id:
+            self._ensure_loaded(self._current_scheme_id)
+            return self._indexes.get(self._current_scheme_id)
+        return None
+    
+    # ========== 变更应用 ==========
+    # 所有修改都表示为一条变更 {"op": 类型, ...参数}，由 _apply_<类型> 应用到内存数据和索引。
+    # 变更是幂等的（put为插入或更新，del为删除），可在检查点快照上安全重放。
+    
+    def _mutate(self, op: str, **args):
+        """应用一条变更，变更日志和存储后端模式下同时记录，等待save_data写入（切换当前方案不记录）"""
+        change = {"op": op, **args}
+        if self._transaction_depth > 0:
+            undo = self._undo_entry(change)
+            self._apply(change)
+            self._undo_log.append(undo)
+        else:
+            self._apply(change)
+        if (self._journal or self._storage) and op != "set_current":
+            self._pending_ops.append(change)
+        self._dispatch_events()
+    
+    def _apply(self, change: Dict):
+        """将一条变更应用到内存数据"""
+        args = dict(change)
+        op = args.pop("op")
+        if op not in ("set_current", "del_scheme") and "scheme_id" in args:
+            self._ensure_loaded(args["scheme_id"])
+        getattr(self, "_apply_" + op)(**args)
+        # 分配的增删改已由索引原地更新列式表示，其余修改使其失效
+        index = self._indexes.get(args.get("scheme_id"))
+        if index and op not in ("put_alloc", "del_alloc"):
+            index.columns = None
+        if self._snapshot_cache:
+            # 事务回滚不经过这里，但回滚前应用变更时已使对应列表失效
+            for key in _SNAPSHOT_LISTS.get(op, ()):
+                self._snapshot_cache.pop((args["scheme_id"], key), None)
+    
+    def _apply_set_current(self, scheme_id: Optional[int]):
+        self._current_scheme_id = scheme_id
+        self._scheme_lru.pop(scheme_id, None)
+        self._scheme_lru[scheme_id] = None
+        self._emit(events.SCHEME_SWITCHED, scheme_id)
+    
+    def _apply_put_scheme(self, record: Dict):
+        scheme = self.get_scheme(record["id"])
+        if scheme:
+            scheme["name"] = record["name"]
+            self._emit(events.SCHEME_UPDATED, record["id"])
+            return
         scheme = {
-            "id": scheme_id,
-            "name": "默认方案",
+            "id": record["id"],
+            "name": record["name"],
             "gpus": [],  # 该方案的GPU列表
             "tasks": [],
-            "allocations": []
+            "allocations": [],
+            "next_gpu_id": 1,  # ID计数器只增不减，删除后ID不会被复用
+            "next_task_id": 1
         }
         self.data.setdefault("schemes", []).append(scheme)
-        if self.data.get("current_scheme_id") is None:
-            self.data["current_scheme_id"] = scheme_id
+        self.data["next_scheme_id"] = max(self.data.get("next_scheme_id", 1), record["id"] + 1)
+        self._index_scheme(scheme)
+        self._emit(events.SCHEME_ADDED, record["id"])
+    
+    def _apply_del_scheme(self, scheme_id: int):
+        self.data["schemes"] = [s for s in self.data.get("schemes", []) if s["id"] != scheme_id]
+        self._scheme_by_id.pop(scheme_id, None)
+        self._indexes.pop(scheme_id, None)
+        self._scheme_lru.pop(scheme_id, None)
+        self._emit(events.SCHEME_DELETED, scheme_id)
+    
+    def _apply_put_gpu(self, scheme_id: int, record: Dict):
+        scheme = self._scheme_by_id[scheme_id]
+        index = self._indexes[scheme_id]
+        gpu = index.gpus.get(record["id"])
+        if gpu:
+            gpu.update(record)
+            self._emit(events.GPU_UPDATED, scheme_id, gpu_id=gpu.id)
+            return
+        gpu = GPURecord.from_json(record)
+        scheme.setdefault("gpus", []).append(gpu)
+        scheme["next_gpu_id"] = max(scheme.get("next_gpu_id", 1), gpu.id + 1)
+        index.gpus[gpu.id] = gpu
+        self._emit(events.GPU_ADDED, scheme_id, gpu_id=gpu.id)
+    
+    def _apply_del_gpu(self, scheme_id: int, gpu_id: int):
+        scheme = self._scheme_by_id[scheme_id]
+        gpus = scheme.get("gpus", [])
+        scheme["gpus"] = [gpu for gpu in gpus if gpu.id != gpu_id]
+        # 删除相关分配
+        removed = self._indexes[scheme_id].remove_gpu(gpu_id)
+        if removed:
+            allocations = scheme.get("allocations", [])
+            scheme["allocations"] = [
+                alloc for alloc in allocations
+                if alloc.gpu_id != gpu_id
+            ]
+        self._emit(events.GPU_DELETED, scheme_id, gpu_id=gpu_id)
+    
+    def _apply_put_task(self, scheme_id: int, record: Dict):
+        scheme = self._scheme_by_id[scheme_id]
+        index = self._indexes[scheme_id]
+        task = index.tasks.get(record["id"])
+        if task:
+            task.update(record)
+            self._emit(events.TASK_UPDATED, scheme_id, task_id=task.id)
+            return
+        task = TaskRecord.from_json(record)
+        scheme.setdefault("tasks", []).append(task)
+        scheme["next_task_id"] = max(scheme.get("next_task_id", 1), task.id + 1)
+        index.tasks[task.id] = task
+        self._emit(events.TASK_ADDED, scheme_id, task_id=task.id)
+    
+    def _apply_del_task(self, scheme_id: int, task_id: int):
+        scheme = self._scheme_by_id[scheme_id]
+        tasks = scheme.get("tasks", [])
+        scheme["tasks"] = [task for task in tasks if task.id != task_id]
+        # 删除相关分配
+        removed = self._indexes[scheme_id].remove_task(task_id)
+        if removed:
+            allocations = scheme.get("allocations", [])
+            scheme["allocations"] = [
+                alloc for alloc in allocations
+                if alloc.task_id != task_id
+            ]
+        for alloc in removed:
+            self._emit(events.ALLOCATION_CHANGED, scheme_id, gpu_id=alloc.gpu_id, task_id=task_id)
+        self._emit(events.TASK_DELETED, scheme_id, task_id=task_id)
+    
+    def _apply_put_alloc(self, scheme_id: int, record: Dict):
+        scheme = self._scheme_by_id[scheme_id]
+        index = self._indexes[scheme_id]
+        alloc = index.get_allocation(record["task_id"], record["gpu_id"])
+        if alloc:
+            index.set_allocation_memory(alloc, record["memory_usage"])
+        else:
+            alloc = AllocationRecord.from_json(record)
+            scheme.setdefault("allocations", []).append(alloc)
+            index.add_allocation(alloc)
+        self._emit(events.ALLOCATION_CHANGED, scheme_id, gpu_id=alloc.gpu_id, task_id=alloc.task_id)
+    
+    def _apply_del_alloc(self, scheme_id: int, task_id: int, gpu_id: int):
+        scheme = self._scheme_by_id[scheme_id]
+        alloc = self._indexes[scheme_id].remove_allocation(task_id, gpu_id)
+        if alloc:
+            allocations = scheme.get("allocations", [])
+            scheme["allocations"] = [a for a in allocations if a is not alloc]
+            self._emit(events.ALLOCATION_CHANGED, scheme_id, gpu_id=gpu_id, task_id=task_id)
+    
+    # ========== 事务撤销 ==========
+    # _undo_<类型> 在变更应用前记录恢复所需的原状态，返回撤销函数。撤销函数按相反顺序执行，
+    # 执行时内存数据与该变更刚应用后相同。删除类变更会用过滤后的新列表替换方案中的列表，
+    # 原列表不再被修改，撤销时直接换回原列表即可恢复顺序。
+    
+    def _undo_entry(self, change: Dict) -> Callable[[], None]:
+        """记录撤销一条变更所需的原状态，返回撤销函数"""
+        args = dict(change)
+        op = args.pop("op")
+        if op not in ("set_current", "del_scheme") and "scheme_id" in args:
+            self._ensure_loaded(args["scheme_id"])
+        return getattr(self, "_undo_" + op)(**args)
+    
+    def _rollback(self):
+        """按相反顺序执行撤销日志，恢复事务开始前的内存数据"""
+        undo_log = self._undo_log
+        self._undo_log = []
+        for undo in reversed(undo_log):
+            undo()
+        for index in self._indexes.values():
+            index.columns = None
+    
+    @staticmethod
+    def _restore_key(target: Dict, key: str, value):
+        """恢复字典中的一项（原来不存在时删除）"""
+        if value is None:
+            target.pop(key, None)
+        else:
+            target[key] = value
+    
+    def _undo_set_current(self, scheme_id: Optional[int]):
+        current_scheme_id = self._current_scheme_id
+        
+        def undo():
+            self._current_scheme_id = current_scheme_id
+        return undo
+    
+    def _undo_put_scheme(self, record: Dict):
+        scheme = self.get_scheme(record["id"])
+        if scheme:
+            name = scheme["name"]
+            
+            def undo():
+                scheme["name"] = name
+            return undo
+        next_scheme_id = self.data.get("next_scheme_id")
+        
+        def undo():
+            # 新方案在列表末尾
+            self.data["schemes"].pop()
+            self._scheme_by_id.pop(record["id"], None)
+            self._indexes.pop(record["id"], None)
+            self._restore_key(self.data, "next_scheme_id", next_scheme_id)
+        return undo
+    
+    def _undo_del_scheme(self, scheme_id: int):
+        schemes = self.data.get("schemes", [])
+        scheme = self._scheme_by_id.get(scheme_id)
+        index = self._indexes.get(scheme_id)
+        
+        def undo():
+            self.data["schemes"] = schemes
+            if scheme is not None:
+                self._scheme_by_id[scheme_id] = scheme
+            if index is not None:
+                self._indexes[scheme_id] = index
+        return undo
+    
+    def _undo_put_gpu(self, scheme_id: int, record: Dict):
+        scheme = self._scheme_by_id[scheme_id]
+        index = self._indexes[scheme_id]
+        gpu = index.gpus.get(record["id"])
+        if gpu:
+            old = gpu.to_json()
+            
+            def undo():
+                gpu.update(old)
+            return undo
+        next_gpu_id = scheme.get("next_gpu_id")
+        
+        def undo():
+            # 新GPU在列表末尾
+            scheme["gpus"].pop()
+            del index.gpus[record["id"]]
+            self._restore_key(scheme, "next_gpu_id", next_gpu_id)
+        return undo
+    
+    def _undo_del_gpu(self, scheme_id: int, gpu_id: int):
+        scheme = self._scheme_by_id[scheme_id]
+        index = self._indexes[scheme_id]
+        gpus = scheme.get("gpus", [])
+        allocations = scheme.get("allocations", [])
+        gpu = index.gpus.get(gpu_id)
+        removed = list(index.allocs_by_gpu.get(gpu_id, {}).values())
+        
+        def undo():
+            scheme["gpus"] = gpus
+            scheme["allocations"] = allocations
+            if gpu is not None:
+                index.gpus = {item.id: item for item in gpus}
+            for alloc in removed:
+                index.add_allocation(alloc)
+        return undo
+    
+    def _undo_put_task(self, scheme_id: int, record: Dict):
+        scheme = self._scheme_by_id[scheme_id]
+        index = self._indexes[scheme_id]
+        task = index.tasks.get(record["id"])
+        if task:
+            old = task.to_json()
+            
+            def undo():
+                task.update(old)
+            return undo
+        next_task_id = scheme.get("next_task_id")
+        
+        def undo():
+            # 新任务在列表末尾
+            scheme["tasks"].pop()
+            del index.tasks[record["id"]]
+            self._restore_key(scheme, "next_task_id", next_task_id)
+        return undo
+    
+    def _undo_del_task(self, scheme_id: int, task_id: int):
+        scheme = self._scheme_by_id[scheme_id]
+        index = self._indexes[scheme_id]
+        tasks = scheme.get("tasks", [])
+        allocations = scheme.get("allocations", [])
+        task = index.tasks.get(task_id)
+        removed = list(index.allocs_by_task.get(task_id, {}).values())
+        
+        def undo():
+            scheme["tasks"] = tasks
+            scheme["allocations"] = allocations
+            if task is not None:
+                index.tasks = {item.id: item for item in tasks}
+            for alloc in removed:
+                index.add_allocation(alloc)
+        return undo
+    
+    def _undo_put_alloc(self, scheme_id: int, record: Dict):
+        scheme = self._scheme_by_id[scheme_id]
+        index = self._indexes[scheme_id]
+        alloc = index.get_allocation(record["task_id"], record["gpu_id"])
+        if alloc:
+            memory_usage = alloc.memory_usage
+            
+            def undo():
+                index.set_allocation_memory(alloc, memory_usage)
+            return undo
+        
+        def undo():
+            # 新分配在列表末尾
+            scheme["allocations"].pop()
+            index.remove_allocation(record["task_id"], record["gpu_id"])
+        return undo
+    
+    def _undo_del_alloc(self, scheme_id: int, task_id: int, gpu_id: int):
+        scheme = self._scheme_by_id[scheme_id]
+        index = self._indexes[scheme_id]
+        allocations = scheme.get("allocations", [])
+        alloc = index.get_allocation(task_id, gpu_id)
+        
+        def undo():
+            if alloc is not None:
+                scheme["allocations"] = allocations
+                index.add_allocation(alloc)
+        return undo
+    
+    # ========== 变更事件 ==========
+    
+    def subscribe(self, callback: Callable[[ChangeEvent], None]):
+        """
+        订阅数据变更事件
+        
+        Args:
+            callback: 回调函数，参数为 ChangeEvent（事件类型见 events 模块）
+        """
+        self._listeners.append(callback)
+    
+    def unsubscribe(self, callback: Callable[[ChangeEvent], None]):
+        """取消订阅数据变更事件"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def _emit(self, kind: str, scheme_id: Optional[int] = None, gpu_id: Optional[int] = None,
+              task_id: Optional[int] = None):
+        """记录一个待发送的变更事件（没有订阅者时忽略）"""
+        if self._listeners:
+            self._pending_events.append(ChangeEvent(kind, scheme_id, gpu_id, task_id))
+    
+    def _dispatch_events(self):
+        """发送待发送的变更事件（事务内推迟到提交后，重复事件只发送一次）"""
+        if self._transaction_depth > 0 or not self._pending_events:
+            return
+        pending = list(dict.fromkeys(self._pending_events))
+        self._pending_events = []
+        for event in pending:
+            for callback in list(self._listeners):
+                callback(event)
+    
+    # ========== 方案管理 ==========
+    
+    def create_default_scheme(self):
+        """创建默认方案"""
+        scheme_id = self.data.get("next_scheme_id", 1)
+        self._mutate("put_scheme", record={"id": scheme_id, "name": "默认方案"})
+        if self._current_scheme_id is None:
+            self._mutate("set_current", scheme_id=scheme_id)
         self.save_data()
         return scheme_id
     
     def get_current_scheme(self):
         """获取当前方案"""
-        scheme_id = self.data.get("current_scheme_id")
-        if scheme_id:
-            return self.get_scheme(scheme_id)
+        if self._current_scheme_id:
+            return self._ensure_loaded(self._current_scheme_id)
         return None
     
     def get_scheme(self, scheme_id):
-        """获取指定方案"""
-        for scheme in self.data.get("schemes", []):
-            if scheme["id"] == scheme_id:
-                return scheme
-        return None
+        """获取指定方案（懒加载后端下未加载的方案只包含id和name）"""
+        return self._scheme_by_id.get(scheme_id)
+    
+    def get_scheme_task_count(self, scheme_id: int) -> int:
+        """获取方案的任务数量（不加载方案）"""
+        scheme = self._scheme_by_id.get(scheme_id)
+        if not scheme:
+            return 0
+        if "tasks" in scheme:
+            return len(scheme["tasks"])
+        return scheme.get("task_count", 0)
     
     def add_scheme(self, name: str) -> int:
         """
@@ -117,15 +696,8 @@ class DataManager:
         Returns:
             新方案的ID
         """
-        scheme_id = max([s.get("id", 0) for s in self.data.get("schemes", [])], default=0) + 1
-        scheme = {
-            "id": scheme_id,
-            "name": name,
-            "gpus": [],  # 该方案的GPU列表
-            "tasks": [],
-            "allocations": []
-        }
-        self.data.setdefault("schemes", []).append(scheme)
+        scheme_id = self.data.get("next_scheme_id", 1)
+        self._mutate("put_scheme", record={"id": scheme_id, "name": name})
         self.save_data()
         return scheme_id
     
@@ -140,9 +712,8 @@ class DataManager:
         Returns:
             是否成功
         """
-        scheme = self.get_scheme(scheme_id)
-        if scheme:
-            scheme["name"] = name
+        if self.get_scheme(scheme_id):
+            self._mutate("put_scheme", record={"id": scheme_id, "name": name})
             self.save_data()
             return True
         return False
@@ -157,19 +728,19 @@ class DataManager:
         Returns:
             是否成功
         """
-        self.data["schemes"] = [s for s in self.data.get("schemes", []) if s["id"] != scheme_id]
+        self._mutate("del_scheme", scheme_id=scheme_id)
         # 如果删除的是当前方案，切换到第一个方案
-        if self.data.get("current_scheme_id") == scheme_id:
+        if self._current_scheme_id == scheme_id:
             if self.data.get("schemes"):
-                self.data["current_scheme_id"] = self.data["schemes"][0]["id"]
+                self._mutate("set_current", scheme_id=self.data["schemes"][0]["id"])
             else:
-                self.data["current_scheme_id"] = None
+                self._mutate("set_current", scheme_id=None)
         self.save_data()
         return True
     
     def set_current_scheme(self, scheme_id: int) -> bool:
         """
-        设置当前方案
+        设置当前方案（只修改内存中的选择，不写数据文件）
         
         Args:
             scheme_id: 方案ID
@@ -178,8 +749,11 @@ class DataManager:
             是否成功
         """
         if self.get_scheme(scheme_id):
-            self.data["current_scheme_id"] = scheme_id
-            self.save_data()
+            self._mutate("set_current", scheme_id=scheme_id)
+            # 当前方案在第一次访问时才加载，为它预留位置
+            keep = self.max_loaded_schemes - (scheme_id not in self._indexes)
+            if len(self._indexes) > keep:
+                self.evict_schemes(keep)
             return True
         return False
     
@@ -187,16 +761,181 @@ class DataManager:
         """获取所有方案"""
         return self.data.get("schemes", [])
     
+    # ========== 持久化 ==========
+    
+    @contextmanager
+    def transaction(self):
+        """
+        批量修改事务，事务内的所有修改在提交时只写盘一次
+        
+        用法:
+            with data_manager.transaction():
+                data_manager.add_allocation(...)
+                data_manager.add_allocation(...)
+        
+        事务内抛出异常时按撤销日志回滚内存中的全部修改（耗时与事务内的变更数量成正比，
+        不复制整个数据），不写盘，异常继续向上抛出。支持嵌套，嵌套的事务并入最外层事务。
+        """
+        if self._transaction_depth > 0:
+            self._transaction_depth += 1
+            try:
+                yield self
+            finally:
+                self._transaction_depth -= 1
+            return
+        
+        ops_mark = len(self._pending_ops)
+        self._transaction_depth = 1
+        self._transaction_dirty = False
+        self._undo_log = []
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth = 0
+            self._transaction_dirty = False
+            self._rollback()
+            del self._pending_ops[ops_mark:]
+            self._pending_events = []
+            raise
+        self._transaction_depth = 0
+        self._undo_log = []
+        if self._transaction_dirty:
+            self._transaction_dirty = False
+            self.save_data()
+        self._dispatch_events()
+    
     def save_data(self):
-        """保存数据到JSON文件"""
+        """
+        保存数据（事务内推迟到提交时）
+        
+        - 存储后端模式：按行写入待写变更，没有对应变更时全量写入
+        - 变更日志模式：追加待写变更，日志超过阈值时合并进检查点快照；
+          没有对应变更的修改（如加载时的格式迁移）直接写检查点快照；
+          追加失败时改写检查点快照，写入成功前保留待写变更
+        - 后台写盘模式：只提交快照，由后台线程写入
+        - 默认：同步写入JSON文件
+        """
+        if self._transaction_depth > 0:
+            self._transaction_dirty = True
+            return True
+        if self._storage:
+            return self._save_to_storage()
+        if self._journal:
+            if self._pending_ops and not self._checkpoint_needed:
+                try:
+                    written = self._journal.append(self._pending_ops)
+                    if instrumentation.is_enabled():
+                        instrumentation.record("save_data.journal.bytes", written)
+                except Exception as e:
+                    print(f"写入变更日志失败，改为写入检查点快照: {e}")
+                    return self._checkpoint()
+                self._pending_ops = []
+                if self._journal.size() < self.journal_compact_bytes:
+                    return True
+            return self._checkpoint()
+        if self._writer:
+            self._writer.submit(self._snapshot())
+            return True
+        return self._write_file(self.data)
+    
+    def _save_to_storage(self) -> bool:
+        """
+        将待写变更写入存储后端，失败时改为全量写入（按方案写入的后端只重写修改过的方案）
+        
+        写入失败时保留待写变更（全量写入失败时标记需要全量写入），下次保存时一起重试
+        """
+        ops = self._pending_ops
+        self._pending_ops = []
+        full = self._storage_dirty or not ops
+        self._storage_dirty = False
+        if self._storage.scheme_writes:
+            scheme_ids = {op["scheme_id"] if "scheme_id" in op else op["record"]["id"] for op in ops}
+            try:
+                self._storage.save_schemes(self.data, None if full else scheme_ids)
+                return True
+            except Exception as e:
+                print(f"保存数据失败: {e}")
+                self._pending_ops = ops + self._pending_ops
+                self._storage_dirty = full
+                return False
+        if not full:
+            try:
+                self._storage.write_ops(ops)
+                return True
+            except Exception as e:
+                print(f"写入变更失败，改为全量保存: {e}")
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            self._storage.save(self.data)
             return True
         except Exception as e:
             print(f"保存数据失败: {e}")
+            self._pending_ops = ops + self._pending_ops
+            self._storage_dirty = True
             return False
     
+    def _checkpoint(self) -> bool:
+        """写入完整快照并清空变更日志（失败时保留待写变更，下次保存时重试检查点）"""
+        if not self._write_file(self.data):
+            self._checkpoint_needed = True
+            return False
+        self._pending_ops = []
+        self._checkpoint_needed = False
+        self._journal.reset()
+        return True
+    
+    def _write_file(self, data: Dict) -> bool:
+        """将数据写入JSON文件（先写临时文件再替换，写入中途崩溃不会破坏原文件）"""
+        tmp_file = self.data_file + ".tmp"
+        try:
+            self._serializer.dump(data, tmp_file)
+            if instrumentation.is_enabled():
+                instrumentation.record("save_data.bytes", os.path.getsize(tmp_file))
+            os.replace(tmp_file, self.data_file)
+            return True
+        except Exception as e:
+            print(f"保存数据失败: {e}")
+            return False
+    
+    def _snapshot(self) -> Dict:
+        """
+        复制当前数据（记录转换为字典），供后台线程写盘
+        
+        转换后的记录列表按方案缓存，只重新转换上次快照后被修改的列表；
+        缓存的字典列表之后不再修改，可与后台线程共享
+        """
+        cache = {}
+        schemes = []
+        for scheme in self.data.get("schemes", []):
+            copied = {}
+            for key, value in scheme.items():
+                if isinstance(value, list):
+                    cache_key = (scheme["id"], key)
+                    cached = self._snapshot_cache.get(cache_key)
+                    if cached is None:
+                        cached = [record.to_json() for record in value]
+                    cache[cache_key] = value = cached
+                copied[key] = value
+            schemes.append(copied)
+        self._snapshot_cache = cache
+        snapshot = dict(self.data)
+        snapshot["schemes"] = schemes
+        return snapshot
+    
+    def flush(self):
+        """等待后台写盘完成"""
+        if self._writer:
+            self._writer.flush()
+    
+    def close(self):
+        """写入剩余数据，停止后台写盘线程并关闭存储后端"""
+        if self._writer:
+            self._writer.close()
+            atexit.unregister(self._writer.close)
+            self._writer = None
+        if self._storage:
+            self._storage.close()
+            self._storage = None
+    
     # ========== GPU管理 ==========
     
     def add_gpu(self, name: str, total_memory: float) -> int:
@@ -215,15 +954,13 @@ class DataManager:
             scheme_id = self.create_default_scheme()
             scheme = self.get_scheme(scheme_id)
         
-        gpus = scheme.get("gpus", [])
-        gpu_id = max([gpu.get("id", 0) for gpu in gpus], default=0) + 1
+        gpu_id = scheme.get("next_gpu_id", 1)
         gpu = {
             "id": gpu_id,
             "name": name,
             "total_memory": total_memory
         }
-        gpus.append(gpu)
-        scheme["gpus"] = gpus
+        self._mutate("put_gpu", scheme_id=scheme["id"], record=gpu)
         self.save_data()
         return gpu_id
     
@@ -239,19 +976,17 @@ class DataManager:
         Returns:
             是否成功
         """
-        scheme = self.get_current_scheme()
-        if not scheme:
+        if not self.get_gpu(gpu_id):
             return False
         
-        gpus = scheme.get("gpus", [])
-        for gpu in gpus:
-            if gpu["id"] == gpu_id:
-                gpu["name"] = name
-                gpu["total_memory"] = total_memory
-                scheme["gpus"] = gpus
-                self.save_data()
-                return True
-        return False
+        gpu = {
+            "id": gpu_id,
+            "name": name,
+            "total_memory": total_memory
+        }
+        self._mutate("put_gpu", scheme_id=self._current_scheme_id, record=gpu)
+        self.save_data()
+        return True
     
     def delete_gpu(self, gpu_id: int) -> bool:
         """
@@ -267,29 +1002,16 @@ class DataManager:
         if not scheme:
             return False
         
-        # 删除GPU
-        gpus = scheme.get("gpus", [])
-        scheme["gpus"] = [gpu for gpu in gpus if gpu["id"] != gpu_id]
-        
-        # 删除相关分配
-        allocations = scheme.get("allocations", [])
-        scheme["allocations"] = [
-            alloc for alloc in allocations
-            if alloc["gpu_id"] != gpu_id
-        ]
+        self._mutate("del_gpu", scheme_id=scheme["id"], gpu_id=gpu_id)
         self.save_data()
         return True
     
     def get_gpu(self, gpu_id: int) -> Optional[Dict]:
         """获取GPU信息（当前方案）"""
-        scheme = self.get_current_scheme()
-        if not scheme:
+        index = self._current_index()
+        if not index:
             return None
-        
-        for gpu in scheme.get("gpus", []):
-            if gpu["id"] == gpu_id:
-                return gpu
-        return None
+        return index.gpus.get(gpu_id)
     
     def get_all_gpus(self) -> List[Dict]:
         """获取所有GPU（当前方案）"""
@@ -316,15 +1038,13 @@ class DataManager:
             scheme_id = self.create_default_scheme()
             scheme = self.get_scheme(scheme_id)
         
-        tasks = scheme.get("tasks", [])
-        task_id = max([task.get("id", 0) for task in tasks], default=0) + 1
+        task_id = scheme.get("next_task_id", 1)
         task = {
             "id": task_id,
             "name": name,
             "description": description
         }
-        tasks.append(task)
-        scheme["tasks"] = tasks
+        self._mutate("put_task", scheme_id=scheme["id"], record=task)
         self.save_data()
         return task_id
     
@@ -340,19 +1060,17 @@ class DataManager:
         Returns:
             是否成功
         """
-        scheme = self.get_current_scheme()
-        if not scheme:
+        if not self.get_task(task_id):
             return False
         
-        tasks = scheme.get("tasks", [])
-        for task in tasks:
-            if task["id"] == task_id:
-                task["name"] = name
-                task["description"] = description
-                scheme["tasks"] = tasks
-                self.save_data()
-                return True
-        return False
+        task = {
+            "id": task_id,
+            "name": name,
+            "description": description
+        }
+        self._mutate("put_task", scheme_id=self._current_scheme_id, record=task)
+        self.save_data()
+        return True
     
     def delete_task(self, task_id: int) -> bool:
         """
@@ -368,29 +1086,16 @@ class DataManager:
         if not scheme:
             return False
         
-        # 删除任务
-        tasks = scheme.get("tasks", [])
-        scheme["tasks"] = [task for task in tasks if task["id"] != task_id]
-        
-        # 删除相关分配
-        allocations = scheme.get("allocations", [])
-        scheme["allocations"] = [
-            alloc for alloc in allocations
-            if alloc["task_id"] != task_id
-        ]
+        self._mutate("del_task", scheme_id=scheme["id"], task_id=task_id)
         self.save_data()
         return True
     
     def get_task(self, task_id: int) -> Optional[Dict]:
         """获取任务信息（当前方案）"""
-        scheme = self.get_current_scheme()
-        if not scheme:
+        index = self._current_index()
+        if not index:
             return None
-        
-        for task in scheme.get("tasks", []):
-            if task["id"] == task_id:
-                return task
-        return None
+        return index.tasks.get(task_id)
     
     def get_all_tasks(self) -> List[Dict]:
         """获取所有任务（当前方案）"""
@@ -403,7 +1108,7 @@ class DataManager:
     
     def add_allocation(self, task_id: int, gpu_id: int, memory_usage: float) -> bool:
         """
-        添加任务-GPU分配（当前方案）
+        添加任务-GPU分配（当前方案，已存在时更新显存占用）
         
         Args:
             task_id: 任务ID
@@ -411,30 +1116,18 @@ class DataManager:
             memory_usage: 显存占用（GB）
         
         Returns:
-            是否成功
+            是否成功（任务或GPU不存在时失败）
         """
-        scheme = self.get_current_scheme()
-        if not scheme:
+        index = self._current_index()
+        if index is None or task_id not in index.tasks or gpu_id not in index.gpus:
             return False
         
-        allocations = scheme.get("allocations", [])
-        # 检查是否已存在
-        for alloc in allocations:
-            if alloc["task_id"] == task_id and alloc["gpu_id"] == gpu_id:
-                # 更新现有分配
-                alloc["memory_usage"] = memory_usage
-                scheme["allocations"] = allocations
-                self.save_data()
-                return True
-        
-        # 添加新分配
         allocation = {
             "task_id": task_id,
             "gpu_id": gpu_id,
             "memory_usage": memory_usage
         }
-        allocations.append(allocation)
-        scheme["allocations"] = allocations
+        self._mutate("put_alloc", scheme_id=self._current_scheme_id, record=allocation)
         self.save_data()
         return True
     
@@ -453,35 +1146,23 @@ class DataManager:
         if not scheme:
             return False
         
-        allocations = scheme.get("allocations", [])
-        scheme["allocations"] = [
-            alloc for alloc in allocations
-            if not (alloc["task_id"] == task_id and alloc["gpu_id"] == gpu_id)
-        ]
+        self._mutate("del_alloc", scheme_id=scheme["id"], task_id=task_id, gpu_id=gpu_id)
         self.save_data()
         return True
     
     def get_allocations_by_gpu(self, gpu_id: int) -> List[Dict]:
         """获取指定GPU的所有分配（当前方案）"""
-        scheme = self.get_current_scheme()
-        if not scheme:
+        index = self._current_index()
+        if not index:
             return []
-        
-        return [
-            alloc for alloc in scheme.get("allocations", [])
-            if alloc["gpu_id"] == gpu_id
-        ]
+        return list(index.allocs_by_gpu.get(gpu_id, {}).values())
     
     def get_allocations_by_task(self, task_id: int) -> List[Dict]:
         """获取指定任务的所有分配（当前方案）"""
-        scheme = self.get_current_scheme()
-        if not scheme:
+        index = self._current_index()
+        if not index:
             return []
-        
-        return [
-            alloc for alloc in scheme.get("allocations", [])
-            if alloc["task_id"] == task_id
-        ]
+        return list(index.allocs_by_task.get(task_id, {}).values())
     
     def get_all_allocations(self) -> List[Dict]:
         """获取所有分配（当前方案）"""
@@ -503,32 +1184,82 @@ class DataManager:
                 "total_memory": 总显存,
                 "used_memory": 已用显存,
                 "free_memory": 剩余显存,
-                "allocations": 分配列表（包含任务信息）
+                "allocations": 分配视图列表（AllocationView，可按 alloc["task_name"] 读取任务名称）
             }
         """
-        gpu = self.get_gpu(gpu_id)
+        index = self._current_index()
+        gpu = index.gpus.get(gpu_id) if index else None
         if not gpu:
             return None
         
-        allocations = self.get_allocations_by_gpu(gpu_id)
-        used_memory = sum(alloc["memory_usage"] for alloc in allocations)
+        allocations = index.allocs_by_gpu.get(gpu_id, {}).values()
+        used_memory = index.used_memory.get(gpu_id, 0)
         
-        # 为每个分配添加任务信息
+        # 为每个分配关联任务信息（视图，不复制分配数据）
         allocations_with_task = []
         for alloc in allocations:
-            task = self.get_task(alloc["task_id"])
+            task = index.tasks.get(alloc.task_id)
             if task:
-                allocations_with_task.append({
-                    **alloc,
-                    "task_name": task["name"]
-                })
+                allocations_with_task.append(AllocationView(alloc, task))
         
         return {
             "gpu": gpu,
-            "total_memory": gpu["total_memory"],
+            "total_memory": gpu.total_memory,
             "used_memory": used_memory,
-            "free_memory": gpu["total_memory"] - used_memory,
+            "free_memory": gpu.total_memory - used_memory,
             "allocations": allocations_with_task
         }
+    
+    def get_used_memory(self, gpu_id: int) -> float:
+        """获取GPU已用显存（当前方案，O(1)）"""
+        index = self._current_index()
+        if not index:
+            return 0
+        return index.used_memory.get(gpu_id, 0)
+    
+    def get_free_memory(self, gpu_id: int) -> Optional[float]:
+        """获取GPU剩余显存（当前方案，O(1)），GPU不存在时返回None"""
+        index = self._current_index()
+        gpu = index.gpus.get(gpu_id) if index else None
+        if not gpu:
+            return None
+        return gpu.total_memory - index.used_memory.get(gpu_id, 0)
+    
+    def get_usage_summary(self) -> Dict[int, Dict]:
+        """
+        获取所有GPU的显存汇总（当前方案）
+        
+        Returns:
+            {gpu_id: {"total_memory": 总显存, "used_memory": 已用显存, "free_memory": 剩余显存}}
+        """
+        index = self._current_index()
+        if not index:
+            return {}
+        summary = {}
+        for gpu_id, gpu in index.gpus.items():
+            used_memory = index.used_memory.get(gpu_id, 0)
+            summary[gpu_id] = {
+                "total_memory": gpu.total_memory,
+                "used_memory": used_memory,
+                "free_memory": gpu.total_memory - used_memory
+            }
+        return summary
+    
+    def get_allocation_columns(self) -> Optional[AllocationColumns]:
+        """
+        获取当前方案分配的列式表示（按需构建并缓存，分配修改时原地更新，GPU或任务修改后重新构建）
+        
+        gpu_idx / task_idx 分别对应 get_all_gpus() / get_all_tasks() 中的位置
+        """
+        scheme = self.get_current_scheme()
+        if not scheme:
+            return None
+        index = self._indexes[scheme["id"]]
+        if index.columns is None:
+            index.columns = AllocationColumns(scheme.get("gpus", []), scheme.get("tasks", []),
+                                              scheme.get("allocations", []))
+        return index.columns
 
 
+# 性能埋点：开启后记录全部公开方法的耗时
+instrumentation.register(DataManager)
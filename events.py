@@ -0,0 +1,28 @@
+"""
+数据变更事件模块
+DataManager 在数据修改后向订阅者发送的事件类型
+"""
+from typing import NamedTuple, Optional
+
+
+# 事件类型
+SCHEME_ADDED = "scheme_added"
+SCHEME_UPDATED = "scheme_updated"
+SCHEME_DELETED = "scheme_deleted"
+SCHEME_SWITCHED = "scheme_switched"
+GPU_ADDED = "gpu_added"
+GPU_UPDATED = "gpu_updated"
+GPU_DELETED = "gpu_deleted"
+TASK_ADDED = "task_added"
+TASK_UPDATED = "task_updated"
+TASK_DELETED = "task_deleted"
+ALLOCATION_CHANGED = "allocation_changed"
+
+
+class ChangeEvent(NamedTuple):
+    """数据变更事件"""
+    
+    kind: str  # 事件类型
+    scheme_id: Optional[int] = None  # 所属方案ID
+    gpu_id: Optional[int] = None  # 相关GPU ID
+    task_id: Optional[int] = None  # 相关任务ID
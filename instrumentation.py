@@ -0,0 +1,281 @@
+"""
+性能埋点模块
+默认关闭。设置环境变量 GPU_MANAGER_PROFILE=1 启动，或在主窗口按 Ctrl+Shift+P 切换。
+开启时给注册的方法套上计时包装，耗时记入对数分桶直方图；关闭时恢复原方法，不留任何额外开销。
+"""
+import atexit
+import functools
+import inspect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+ENV_VAR = "GPU_MANAGER_PROFILE"
+
+
+class Histogram:
+    """对数分桶直方图：相邻桶边界相差约9%（每倍频程8个桶），百分位误差不超过一个桶"""
+    
+    BUCKETS_PER_OCTAVE = 8
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}  # {桶序号: 数量}，值为0的记在None桶
+    
+    def add(self, value: float):
+        """记录一个值"""
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        bucket = math.floor(math.log2(value) * self.BUCKETS_PER_OCTAVE) if value > 0 else None
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+    
+    def percentile(self, p: float) -> float:
+        """
+        估算百分位数（返回所在桶的上边界，不超过最大值）
+        
+        Args:
+            p: 百分位（0~100）
+        
+        Returns:
+            百分位数，没有数据时为0
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = self.buckets.get(None, 0)
+        if seen >= rank:
+            return 0.0
+        for bucket in sorted(key for key in self.buckets if key is not None):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(2 ** ((bucket + 1) / self.BUCKETS_PER_OCTAVE), self.max)
+        return self.max
+
+
+_enabled = False
+_lock = threading.Lock()
+_histograms = {}  # {名称: Histogram}
+_targets = []  # [(类, 方法名, 埋点名称)]
+_originals = {}  # {(类, 方法名): 原方法}，开启期间保存
+
+
+def is_enabled() -> bool:
+    """是否已开启埋点"""
+    return _enabled
+
+
+def record(name: str, value: float):
+    """
+    记录一个值（耗时为秒；名称以 .bytes 结尾的为字节数）
+    
+    Args:
+        name: 埋点名称
+        value: 值
+    """
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(value)
+
+
+@contextmanager
+def span(name: str):
+    """计时代码块（未开启时不计时）"""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+class PhaseRecorder:
+    """把分阶段耗时记为 "<前缀>.<阶段>"（用作 ChartWidget.paint_profiler）"""
+    
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+    
+    def record(self, phase: str, seconds: float):
+        record(f"{self.prefix}.{phase}", seconds)
+
+
+def _function(value):
+    """类属性对应的函数（staticmethod/classmethod 取出其中的函数）"""
+    if isinstance(value, (staticmethod, classmethod)):
+        return value.__func__
+    return value
+
+
+def _is_context_manager(func) -> bool:
+    """是否为 @contextmanager 装饰的生成器函数"""
+    return not inspect.isgeneratorfunction(func) and \
+        inspect.isgeneratorfunction(inspect.unwrap(func))
+
+
+def _timed(func, name: str):
+    """
+    给方法套上计时包装
+    
+    @contextmanager 方法计时从进入到退出 with 块（调用本身只创建上下文管理器）
+    """
+    if _is_context_manager(func):
+        @contextmanager
+        def timed_context(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                with func(*args, **kwargs) as value:
+                    yield value
+            finally:
+                record(name, time.perf_counter() - start)
+        return functools.wraps(func)(timed_context)
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(name, time.perf_counter() - start)
+    return wrapper
+
+
+def _patch(cls, method: str, name: str):
+    original = cls.__dict__[method]
+    _originals[(cls, method)] = original
+    timed = _timed(_function(original), name)
+    if isinstance(original, (staticmethod, classmethod)):
+        timed = type(original)(timed)
+    setattr(cls, method, timed)
+
+
+def register(cls, methods: Optional[List[str]] = None, prefix: Optional[str] = None):
+    """
+    注册需要计时的方法（已开启时立即生效）
+    
+    Args:
+        cls: 类
+        methods: 方法名列表，为None时为类中定义的全部公开方法（不含生成器方法：
+                 调用生成器方法只创建生成器，耗时没有意义）
+        prefix: 埋点名称前缀，默认为类名
+    """
+    if methods is None:
+        methods = [method for method, value in cls.__dict__.items()
+                   if not method.startswith("_") and callable(_function(value))
+                   and not inspect.isgeneratorfunction(_function(value))]
+    prefix = prefix or cls.__name__
+    for method in methods:
+        target = (cls, method, f"{prefix}.{method}")
+        _targets.append(target)
+        if _enabled:
+            _patch(*target)
+
+
+def enable():
+    """开启埋点：给已注册的方法套上计时包装"""
+    global _enabled
+    if _enabled:
+        return
+    _enabled = True
+    for target in _targets:
+        _patch(*target)
+
+
+def disable():
+    """关闭埋点：恢复原方法（已记录的数据保留）"""
+    global _enabled
+    if not _enabled:
+        return
+    _enabled = False
+    for (cls, method), original in _originals.items():
+        setattr(cls, method, original)
+    _originals.clear()
+
+
+def toggle() -> bool:
+    """切换埋点开关，返回切换后的状态"""
+    if _enabled:
+        disable()
+    else:
+        enable()
+    return _enabled
+
+
+def reset():
+    """清空已记录的数据"""
+    with _lock:
+        _histograms.clear()
+
+
+def snapshot() -> Dict[str, Dict]:
+    """
+    获取统计结果
+    
+    Returns:
+        {名称: {"count", "p50", "p99", "max", "total"}}
+    """
+    with _lock:
+        return {
+            name: {
+                "count": histogram.count,
+                "p50": histogram.percentile(50),
+                "p99": histogram.percentile(99),
+                "max": histogram.max,
+                "total": histogram.total,
+            }
+            for name, histogram in _histograms.items()
+        }
+
+
+def _format(name: str, value: float) -> str:
+    if name.endswith(".bytes"):
+        return f"{value / 1024:.1f}KB"
+    return f"{value * 1000:.2f}ms"
+
+
+def report(limit: Optional[int] = None) -> str:
+    """
+    生成文本报告（按总耗时排序，每行一个埋点的次数和 p50/p99/最大值）
+    
+    Args:
+        limit: 最多显示的行数
+    
+    Returns:
+        报告文本
+    """
+    stats = snapshot()
+    names = sorted(stats, key=lambda name: (name.endswith(".bytes"), -stats[name]["total"]))
+    if limit is not None:
+        names = names[:limit]
+    lines = [f"{'埋点':<36}{'次数':>5}{'p50':>11}{'p99':>11}{'最大':>9}"]
+    for name in names:
+        stat = stats[name]
+        lines.append(f"{name:<38}{stat['count']:>7}{_format(name, stat['p50']):>11}"
+                     f"{_format(name, stat['p99']):>11}{_format(name, stat['max']):>11}")
+    return "\n".join(lines)
+
+
+def dump():
+    """输出报告到日志（标准输出）"""
+    if _histograms:
+        print("性能埋点统计:\n" + report())
+
+
+def _dump_at_exit():
+    if _enabled:
+        dump()
+
+
+atexit.register(_dump_at_exit)
+if os.environ.get(ENV_VAR, "") not in ("", "0"):
+    enable()
@@ -0,0 +1,87 @@
+"""
+数据格式迁移模块
+数据中的 schema_version 记录数据格式版本，加载时按顺序执行缺少的迁移，
+迁移完成后写回，之后加载当前版本的数据时不再做任何格式检查。
+"""
+from typing import Callable, Dict, List
+
+
+def _v1_wrap_schemes(data: Dict) -> Dict:
+    """最早的格式没有方案，gpus/tasks/allocations 放在顶层：迁移到默认方案"""
+    if "schemes" in data:
+        return data
+    return {
+        "schemes": [{
+            "id": 1,
+            "name": "默认方案",
+            "gpus": data.get("gpus", []),
+            "tasks": data.get("tasks", []),
+            "allocations": data.get("allocations", [])
+        }],
+        "current_scheme_id": 1
+    }
+
+
+def _v2_scheme_gpus(data: Dict) -> Dict:
+    """GPU列表曾经是全局的：复制到没有GPU的方案中，并确保每个方案都有 gpus/tasks/allocations"""
+    global_gpus = data.pop("gpus", None)
+    for scheme in data.get("schemes", []):
+        if global_gpus and not scheme.get("gpus"):
+            scheme["gpus"] = global_gpus.copy()
+        scheme.setdefault("gpus", [])
+        scheme.setdefault("tasks", [])
+        scheme.setdefault("allocations", [])
+    return data
+
+
+def init_id_counters(scheme: Dict):
+    """根据方案中已有的最大ID初始化GPU/任务ID计数器"""
+    scheme["next_gpu_id"] = max([gpu["id"] for gpu in scheme.get("gpus", [])], default=0) + 1
+    scheme["next_task_id"] = max([task["id"] for task in scheme.get("tasks", [])], default=0) + 1
+
+
+def _v3_id_counters(data: Dict) -> Dict:
+    """补上只增不减的ID计数器（懒加载存储中未加载的方案在加载时补上）"""
+    schemes = data.get("schemes", [])
+    if schemes and "next_scheme_id" not in data:
+        data["next_scheme_id"] = max(scheme["id"] for scheme in schemes) + 1
+    for scheme in schemes:
+        if "gpus" in scheme and ("next_gpu_id" not in scheme or "next_task_id" not in scheme):
+            init_id_counters(scheme)
+    return data
+
+
+# 迁移链：MIGRATIONS[i] 将版本 i 的数据迁移到版本 i+1
+MIGRATIONS: List[Callable[[Dict], Dict]] = [
+    _v1_wrap_schemes,
+    _v2_scheme_gpus,
+    _v3_id_counters,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(data: Dict) -> bool:
+    """
+    将数据迁移到当前格式版本（当前版本的数据直接返回）
+    
+    Args:
+        data: 加载的数据，原地修改
+    
+    Returns:
+        是否执行了迁移（需要写回）
+    """
+    version = data.get("schema_version", 0)
+    if version == SCHEMA_VERSION:
+        return False
+    if version > SCHEMA_VERSION:
+        print(f"数据格式版本 {version} 高于当前支持的版本 {SCHEMA_VERSION}，按当前版本读取")
+        return False
+    migrated = data
+    for step in MIGRATIONS[version:]:
+        migrated = step(migrated)
+    migrated["schema_version"] = SCHEMA_VERSION
+    if migrated is not data:
+        data.clear()
+        data.update(migrated)
+    return True
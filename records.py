@@ -0,0 +1,161 @@
+"""
+记录类型模块
+GPU、任务和分配在内存中以 __slots__ 记录对象保存，比普通字典更省内存；
+同时支持 record["name"] / record.get("name") 形式的读取，与JSON字典的用法保持一致
+"""
+from typing import Dict
+
+
+class Record:
+    """记录基类"""
+    
+    __slots__ = ()
+    
+    def to_json(self) -> Dict:
+        """转换为JSON字典"""
+        return {key: getattr(self, key) for key in self.__slots__}
+    
+    def update(self, data: Dict):
+        """用字典中的字段更新记录"""
+        for key in self.__slots__:
+            if key in data:
+                setattr(self, key, data[key])
+    
+    def keys(self):
+        return self.__slots__
+    
+    def get(self, key: str, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+    
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key: str, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Record):
+            other = other.to_json()
+        return self.to_json() == other
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_json()})"
+
+
+class GPURecord(Record):
+    """GPU记录"""
+    
+    __slots__ = ("id", "name", "total_memory")
+    
+    def __init__(self, id: int, name: str, total_memory: float):
+        self.id = id
+        self.name = name
+        self.total_memory = total_memory
+    
+    @classmethod
+    def from_json(cls, data: Dict) -> "GPURecord":
+        return cls(data["id"], data["name"], data["total_memory"])
+    
+    def to_json(self) -> Dict:
+        return {"id": self.id, "name": self.name, "total_memory": self.total_memory}
+
+
+class TaskRecord(Record):
+    """任务记录"""
+    
+    __slots__ = ("id", "name", "description")
+    
+    def __init__(self, id: int, name: str, description: str = ""):
+        self.id = id
+        self.name = name
+        self.description = description
+    
+    @classmethod
+    def from_json(cls, data: Dict) -> "TaskRecord":
+        return cls(data["id"], data["name"], data.get("description", ""))
+    
+    def to_json(self) -> Dict:
+        return {"id": self.id, "name": self.name, "description": self.description}
+
+
+class AllocationRecord(Record):
+    """任务-GPU分配记录"""
+    
+    __slots__ = ("task_id", "gpu_id", "memory_usage")
+    
+    def __init__(self, task_id: int, gpu_id: int, memory_usage: float):
+        self.task_id = task_id
+        self.gpu_id = gpu_id
+        self.memory_usage = memory_usage
+    
+    @classmethod
+    def from_json(cls, data: Dict) -> "AllocationRecord":
+        return cls(data["task_id"], data["gpu_id"], data["memory_usage"])
+    
+    def to_json(self) -> Dict:
+        return {"task_id": self.task_id, "gpu_id": self.gpu_id,
+                "memory_usage": self.memory_usage}
+
+
+class AllocationView(Record):
+    """分配及其任务的只读视图（不复制分配数据），用于 get_gpu_usage"""
+    
+    __slots__ = ("allocation", "task")
+    
+    def __init__(self, allocation: AllocationRecord, task: TaskRecord):
+        self.allocation = allocation
+        self.task = task
+    
+    def keys(self):
+        return AllocationRecord.__slots__ + ("task_name",)
+    
+    def to_json(self) -> Dict:
+        return {**self.allocation.to_json(), "task_name": self.task.name}
+    
+    def get(self, key: str, default=None):
+        if key == "task_name":
+            return self.task.name
+        return self.allocation.get(key, default)
+    
+    def __getitem__(self, key: str):
+        if key == "task_name":
+            return self.task.name
+        return self.allocation[key]
+    
+    def __setitem__(self, key: str, value):
+        raise TypeError("AllocationView是只读视图")
+    
+    def __contains__(self, key: str) -> bool:
+        return key == "task_name" or key in self.allocation
+    
+    @property
+    def task_id(self) -> int:
+        return self.allocation.task_id
+    
+    @property
+    def gpu_id(self) -> int:
+        return self.allocation.gpu_id
+    
+    @property
+    def memory_usage(self) -> float:
+        return self.allocation.memory_usage
+    
+    @property
+    def task_name(self) -> str:
+        return self.task.name
+
+
+def json_default(obj):
+    """json.dump 的 default 钩子：将记录对象转换为字典"""
+    if isinstance(obj, Record):
+        return obj.to_json()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
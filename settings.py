@@ -0,0 +1,78 @@
+"""
+界面设置模块
+保存当前方案、窗口位置、最后选择的任务等界面/会话状态。
+设置按用户保存在独立的小文件中，与数据文件分开：浏览切换方案不会写数据文件，
+多人共用同一个数据文件时也不会互相覆盖各自的选择。
+"""
+import json
+import os
+from typing import Any, Dict, Optional
+
+
+def default_settings_file() -> str:
+    """获取当前用户的默认设置文件路径"""
+    base_dir = os.environ.get("APPDATA") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base_dir, "gpu-resource-manager", "settings.json")
+
+
+class Settings:
+    """轻量级键值设置存储（JSON文件），值未变化时不写盘"""
+    
+    def __init__(self, settings_file: Optional[str] = None):
+        """
+        初始化设置存储
+        
+        Args:
+            settings_file: 设置文件路径，为None时使用当前用户的默认路径
+        """
+        self.settings_file = settings_file or default_settings_file()
+        self._values = self._load()
+    
+    def _load(self) -> Dict[str, Any]:
+        """读取设置文件，文件不存在或损坏时返回空设置"""
+        if not os.path.exists(self.settings_file):
+            return {}
+        try:
+            with open(self.settings_file, 'r', encoding='utf-8') as f:
+                values = json.load(f)
+            return values if isinstance(values, dict) else {}
+        except Exception as e:
+            print(f"加载设置失败: {e}")
+            return {}
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        读取设置项
+        
+        Args:
+            key: 设置项名称
+            default: 不存在时的默认值
+        
+        Returns:
+            设置值
+        """
+        return self._values.get(key, default)
+    
+    def set(self, key: str, value: Any):
+        """
+        修改设置项并立即保存（值未变化时不写盘）
+        
+        Args:
+            key: 设置项名称
+            value: 设置值（需可JSON序列化）
+        """
+        if key in self._values and self._values[key] == value:
+            return
+        self._values[key] = value
+        self.save()
+    
+    def save(self):
+        """保存设置（先写临时文件再替换，避免写到一半留下损坏的文件）"""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.settings_file)), exist_ok=True)
+            tmp_file = self.settings_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._values, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.settings_file)
+        except Exception as e:
+            print(f"保存设置失败: {e}")
@@ -0,0 +1,3 @@
+"""
+存储模块
+"""
@@ -0,0 +1,101 @@
+"""
+后台写盘模块
+在工作线程中写入数据快照，并对短时间内的连续提交做去抖合并
+"""
+import threading
+import time
+from typing import Callable, Dict
+
+
+class AsyncWriter:
+    """后台去抖写盘线程"""
+    
+    def __init__(self, write_func: Callable[[Dict], bool], debounce: float = 0.5,
+                 max_delay: float = 5.0):
+        """
+        初始化后台写盘线程
+        
+        Args:
+            write_func: 实际写盘函数，参数为数据快照
+            debounce: 去抖窗口（秒），窗口内的连续提交只写最后一次
+            max_delay: 最长延迟（秒），持续提交时也保证在此时间内落盘
+        """
+        self.write_func = write_func
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.write_count = 0  # 实际写盘次数
+        self.submit_count = 0  # 提交次数
+        
+        self._cond = threading.Condition()
+        self._pending = None  # 等待写入的最新快照
+        self._first_submit = 0.0
+        self._last_submit = 0.0
+        self._writing = False
+        self._flush_requested = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="DataManagerWriter", daemon=True)
+        self._thread.start()
+    
+    def submit(self, snapshot: Dict):
+        """提交数据快照，立即返回"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("AsyncWriter已关闭")
+            now = time.monotonic()
+            if self._pending is None:
+                self._first_submit = now
+            self._pending = snapshot
+            self._last_submit = now
+            self.submit_count += 1
+            self._cond.notify_all()
+    
+    def flush(self):
+        """立即写入待写快照，并等待写盘完成"""
+        with self._cond:
+            if self._pending is None and not self._writing:
+                return
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending is not None or self._writing:
+                self._cond.wait()
+            self._flush_requested = False
+    
+    def close(self):
+        """写入剩余快照并停止线程（可重复调用）"""
+        with self._cond:
+            if self._closed:
+                return
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+    
+    def _run(self):
+        """工作线程主循环"""
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                # 去抖：等到窗口内没有新的提交，或达到最长延迟
+                while not self._flush_requested and not self._closed:
+                    deadline = min(self._last_submit + self.debounce,
+                                   self._first_submit + self.max_delay)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                snapshot = self._pending
+                self._pending = None
+                self._writing = True
+            try:
+                self.write_func(snapshot)
+            except Exception as e:
+                print(f"后台保存数据失败: {e}")
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self.write_count += 1
+                    self._cond.notify_all()
@@ -0,0 +1,68 @@
+"""
+存储后端接口
+DataManager 在内存中维护数据（懒加载后端只维护已访问的方案），后端只负责加载和持久化
+"""
+from typing import Dict, Iterable, List, Optional
+
+
+class StorageBackend:
+    """存储后端基类"""
+    
+    # 懒加载后端：load只返回方案清单（方案只包含id、name、task_count），方案内容由load_scheme按需读取，
+    # 全量写入时未加载的方案保持原样
+    lazy = False
+    # 按方案写入的后端：修改由save_schemes按方案整体写入（不使用write_ops）
+    scheme_writes = False
+    
+    def load(self) -> Optional[Dict]:
+        """
+        加载数据
+        
+        Returns:
+            与JSON数据文件结构相同的数据，存储为空时返回None
+        """
+        raise NotImplementedError
+    
+    def write_ops(self, ops: List[Dict]):
+        """
+        持久化一批变更（格式见 DataManager._mutate），失败时抛出异常
+        
+        Args:
+            ops: 变更列表
+        """
+        raise NotImplementedError
+    
+    def save(self, data: Dict):
+        """
+        全量写入数据，失败时抛出异常
+        
+        Args:
+            data: 与JSON数据文件结构相同的数据
+        """
+        raise NotImplementedError
+    
+    def load_scheme(self, scheme_id: int) -> Dict:
+        """
+        读取一个方案的内容（仅懒加载后端）
+        
+        Args:
+            scheme_id: 方案ID
+        
+        Returns:
+            方案的 gpus、tasks、allocations 以及ID计数器
+        """
+        raise NotImplementedError
+    
+    def save_schemes(self, data: Dict, scheme_ids: Optional[Iterable[int]]):
+        """
+        写入方案清单和指定方案（仅按方案写入的后端），失败时抛出异常
+        
+        Args:
+            data: 与JSON数据文件结构相同的数据，未加载的方案只包含 id、name
+            scheme_ids: 修改过的方案ID，为None时写入全部已加载的方案
+        """
+        raise NotImplementedError
+    
+    def close(self):
+        """释放资源"""
+        pass
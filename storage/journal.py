@@ -0,0 +1,94 @@
+"""
+变更日志模块
+以追加写的方式记录每次修改（每行一条紧凑JSON），配合检查点快照使用
+"""
+import json
+import os
+from typing import Dict, List, Tuple
+
+
+class Journal:
+    """追加写变更日志"""
+    
+    def __init__(self, path: str):
+        """
+        初始化变更日志
+        
+        Args:
+            path: 日志文件路径
+        """
+        self.path = path
+    
+    def append(self, ops: List[Dict]) -> int:
+        """
+        追加写入一批变更（日志末尾有写入中途失败留下的残缺行时先截掉）
+        
+        Args:
+            ops: 变更列表
+        
+        Returns:
+            写入的字节数
+        """
+        lines = "".join(
+            json.dumps(op, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for op in ops
+        ).encode("utf-8")
+        with open(self.path, "a+b") as f:
+            self._truncate_partial_line(f)
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        return len(lines)
+    
+    @staticmethod
+    def _truncate_partial_line(f, chunk_size: int = 4096):
+        """截掉文件末尾没有换行结尾的残缺行，否则其后追加的变更在读取时会被一起丢弃"""
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        # 从末尾向前查找最后一个换行
+        position = end
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            position = start
+        f.truncate(0)
+    
+    def read(self) -> Tuple[List[Dict], bool]:
+        """
+        读取全部变更
+        
+        Returns:
+            (变更列表, 是否完整)。写入中途崩溃留下的残缺行及其后的内容会被丢弃，此时返回不完整
+        """
+        if not os.path.exists(self.path):
+            return [], True
+        ops = []
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return ops, False
+                try:
+                    ops.append(json.loads(line))
+                except ValueError:
+                    return ops, False
+        return ops, True
+    
+    def size(self) -> int:
+        """日志文件大小（字节）"""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+    
+    def reset(self):
+        """清空日志（检查点快照写入后调用）"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
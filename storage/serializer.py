@@ -0,0 +1,107 @@
+"""
+数据序列化模块
+默认输出紧凑JSON（无缩进和多余空格），可导入orjson时使用orjson编解码，否则使用标准库json；
+文件名以 .gz / .xz / .lzma 结尾时压缩存储，加载时从压缩流按块解压，不需要先读入整个压缩文件
+"""
+import gzip
+import json
+import lzma
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# 文件扩展名 → 压缩格式
+COMPRESSION_EXTENSIONS = {
+    ".gz": "gzip",
+    ".xz": "lzma",
+    ".lzma": "lzma",
+}
+
+
+class Serializer:
+    """JSON序列化器"""
+    
+    def __init__(self, compression: Optional[str] = None, use_orjson: bool = True,
+                 default: Optional[Callable[[Any], Any]] = None):
+        """
+        初始化序列化器
+        
+        Args:
+            compression: 压缩格式，None / "gzip" / "lzma"
+            use_orjson: orjson可用时是否使用orjson
+            default: 无法直接序列化的对象的转换函数（如记录对象转字典）
+        """
+        if compression not in (None, "gzip", "lzma"):
+            raise ValueError(f"不支持的压缩格式: {compression}")
+        self.compression = compression
+        self.use_orjson = use_orjson and orjson is not None
+        self.default = default
+    
+    def dumps(self, data: Any) -> bytes:
+        """编码为UTF-8 JSON字节串（未压缩）"""
+        if self.use_orjson:
+            return orjson.dumps(data, default=self.default)
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"),
+                          default=self.default).encode("utf-8")
+    
+    def loads(self, raw: bytes) -> Any:
+        """解码JSON字节串（未压缩）"""
+        if self.use_orjson:
+            return orjson.loads(raw)
+        return json.loads(raw)
+    
+    def _open(self, path: str, mode: str):
+        if self.compression == "gzip":
+            # 压缩级别6：比默认的9快数倍，压缩率相差很小
+            return gzip.open(path, mode, compresslevel=6)
+        if self.compression == "lzma":
+            return lzma.open(path, mode)
+        return open(path, mode)
+    
+    def dump(self, data: Any, path: str):
+        """
+        写入文件（按压缩格式压缩）
+        
+        Args:
+            data: 要写入的数据
+            path: 文件路径
+        """
+        with self._open(path, "wb") as f:
+            f.write(self.dumps(data))
+    
+    def load(self, path: str) -> Any:
+        """
+        读取文件（压缩文件从压缩流按块解压）
+        
+        Args:
+            path: 文件路径
+        
+        Returns:
+            解码后的数据
+        """
+        with self._open(path, "rb") as f:
+            if self.use_orjson:
+                return orjson.loads(f.read())
+            return json.load(f)
+
+
+def serializer_for(path: str, default: Optional[Callable[[Any], Any]] = None) -> Serializer:
+    """
+    根据文件扩展名选择序列化器
+    
+    Args:
+        path: 数据文件路径
+        default: 无法直接序列化的对象的转换函数
+    
+    Returns:
+        序列化器（.gz为gzip压缩，.xz/.lzma为lzma压缩，其余为未压缩JSON）
+    """
+    lower = path.lower()
+    for extension, compression in COMPRESSION_EXTENSIONS.items():
+        if lower.endswith(extension):
+            return Serializer(compression=compression, default=default)
+    return Serializer(default=default)
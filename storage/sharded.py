@@ -0,0 +1,139 @@
+"""
+分片存储后端
+目录中包含一个小的清单文件（方案ID和名称）和每个方案一个分片文件。
+启动时只读取清单，方案在第一次访问时才加载，保存时只重写修改过的分片。
+"""
+import os
+import sys
+from typing import Dict, Iterable, Optional
+import migrations
+from records import json_default
+from storage.backend import StorageBackend
+from storage.serializer import Serializer, serializer_for
+
+
+MANIFEST_FILE = "manifest.json"
+# 分片文件中保存的方案字段（方案名称保存在清单中）
+SHARD_KEYS = ("gpus", "tasks", "allocations", "next_gpu_id", "next_task_id")
+
+
+class ShardedStorage(StorageBackend):
+    """分片存储后端（按方案懒加载）"""
+    
+    lazy = True
+    scheme_writes = True
+    
+    def __init__(self, data_dir: str):
+        """
+        初始化分片存储
+        
+        Args:
+            data_dir: 数据目录（不存在时自动创建）
+        """
+        self.data_dir = data_dir
+        self.serializer = Serializer(default=json_default)
+        os.makedirs(data_dir, exist_ok=True)
+    
+    def _manifest_path(self) -> str:
+        return os.path.join(self.data_dir, MANIFEST_FILE)
+    
+    def _shard_path(self, scheme_id: int) -> str:
+        return os.path.join(self.data_dir, f"scheme_{scheme_id}.json")
+    
+    def _write_json(self, path: str, data: Dict):
+        """先写临时文件再替换，写入中途崩溃不会破坏原文件"""
+        tmp_file = path + ".tmp"
+        self.serializer.dump(data, tmp_file)
+        os.replace(tmp_file, path)
+    
+    def load(self) -> Optional[Dict]:
+        """只读取清单，返回的方案只包含 id、name、task_count（未加载）"""
+        if not os.path.exists(self._manifest_path()):
+            return None
+        manifest = self.serializer.load(self._manifest_path())
+        if not manifest.get("schemes"):
+            return None
+        return manifest
+    
+    def load_scheme(self, scheme_id: int) -> Dict:
+        """
+        读取一个方案的分片
+        
+        Args:
+            scheme_id: 方案ID
+        
+        Returns:
+            方案的 gpus、tasks、allocations 以及ID计数器（分片不存在时为空方案）
+        """
+        path = self._shard_path(scheme_id)
+        if not os.path.exists(path):
+            return {"gpus": [], "tasks": [], "allocations": []}
+        return self.serializer.load(path)
+    
+    def save(self, data: Dict):
+        """写入清单和全部已加载的方案，删除已不存在的方案的分片"""
+        self.save_schemes(data, None)
+        scheme_ids = {scheme["id"] for scheme in data.get("schemes", [])}
+        for name in os.listdir(self.data_dir):
+            if name.startswith("scheme_") and name.endswith(".json"):
+                try:
+                    scheme_id = int(name[len("scheme_"):-len(".json")])
+                except ValueError:
+                    continue
+                if scheme_id not in scheme_ids:
+                    os.remove(os.path.join(self.data_dir, name))
+    
+    def save_schemes(self, data: Dict, scheme_ids: Optional[Iterable[int]]):
+        """
+        写入清单和指定方案的分片（未加载的方案跳过，已删除的方案删除分片）
+        
+        Args:
+            data: 与JSON数据文件结构相同的数据，未加载的方案只包含 id、name
+            scheme_ids: 修改过的方案ID，为None时写入全部已加载的方案
+        """
+        schemes = {scheme["id"]: scheme for scheme in data.get("schemes", [])}
+        if scheme_ids is None:
+            scheme_ids = schemes.keys()
+        for scheme_id in scheme_ids:
+            scheme = schemes.get(scheme_id)
+            if scheme is None:
+                if os.path.exists(self._shard_path(scheme_id)):
+                    os.remove(self._shard_path(scheme_id))
+            elif "gpus" in scheme:
+                self._write_json(self._shard_path(scheme_id),
+                                 {key: scheme[key] for key in SHARD_KEYS if key in scheme})
+        manifest = {
+            "schema_version": data.get("schema_version"),
+            "schemes": [
+                {
+                    "id": scheme["id"],
+                    "name": scheme["name"],
+                    "task_count": len(scheme["tasks"]) if "tasks" in scheme
+                    else scheme.get("task_count", 0)
+                }
+                for scheme in data.get("schemes", [])
+            ],
+            "next_scheme_id": data.get("next_scheme_id")
+        }
+        self._write_json(self._manifest_path(), manifest)
+
+
+def split_json(json_file: str, data_dir: str):
+    """
+    将JSON数据文件一次性拆分为分片目录（会覆盖目录中的已有数据）
+    
+    Args:
+        json_file: JSON数据文件路径（只读取，旧格式在内存中迁移后拆分）
+        data_dir: 数据目录
+    """
+    data = serializer_for(json_file).load(json_file)
+    migrations.migrate(data)
+    ShardedStorage(data_dir).save(data)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("用法: python -m storage.sharded <gpu_data.json> <gpu_data目录>")
+        sys.exit(1)
+    split_json(sys.argv[1], sys.argv[2])
+    print(f"✓ 已拆分: {sys.argv[1]} -> {sys.argv[2]}")
@@ -0,0 +1,347 @@
+"""
+SQLite存储后端
+每次修改只更新涉及的行；方案、GPU、任务、分配分表存储并建立外键和索引。
+启动时只读取方案列表，方案内容在第一次访问时才读取。
+"""
+import sqlite3
+import sys
+from typing import Dict, List, Optional
+import migrations
+from storage.backend import StorageBackend
+from storage.serializer import serializer_for
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+CREATE TABLE IF NOT EXISTS schemes (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    next_gpu_id INTEGER,
+    next_task_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS gpus (
+    scheme_id INTEGER NOT NULL REFERENCES schemes(id) ON DELETE CASCADE,
+    id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    total_memory REAL NOT NULL,
+    PRIMARY KEY (scheme_id, id)
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    scheme_id INTEGER NOT NULL REFERENCES schemes(id) ON DELETE CASCADE,
+    id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (scheme_id, id)
+);
+CREATE TABLE IF NOT EXISTS allocations (
+    scheme_id INTEGER NOT NULL,
+    task_id INTEGER NOT NULL,
+    gpu_id INTEGER NOT NULL,
+    memory_usage REAL NOT NULL,
+    PRIMARY KEY (scheme_id, task_id, gpu_id),
+    FOREIGN KEY (scheme_id, task_id) REFERENCES tasks(scheme_id, id) ON DELETE CASCADE,
+    FOREIGN KEY (scheme_id, gpu_id) REFERENCES gpus(scheme_id, id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_allocations_gpu ON allocations(scheme_id, gpu_id);
+CREATE INDEX IF NOT EXISTS idx_allocations_task ON allocations(scheme_id, task_id);
+"""
+
+
+class SQLiteStorage(StorageBackend):
+    """SQLite存储后端（WAL模式，按方案懒加载）"""
+    
+    lazy = True
+    
+    def __init__(self, db_file: str):
+        """
+        初始化SQLite存储
+        
+        Args:
+            db_file: 数据库文件路径
+        """
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        # 旧版本数据库补上ID计数器列
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(schemes)")}
+        for column in ("next_gpu_id", "next_task_id"):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE schemes ADD COLUMN {column} INTEGER")
+        # 新建的数据库记录当前格式版本（之后只按行写入变更，不会经过全量写入）；
+        # 已有数据但没有版本号的旧数据库仍由DataManager迁移
+        with self.conn:
+            if self.conn.execute("SELECT COUNT(*) FROM schemes").fetchone()[0] == 0:
+                self.conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('schema_version', ?) "
+                    "ON CONFLICT(key) DO NOTHING", (migrations.SCHEMA_VERSION,))
+    
+    def load(self) -> Optional[Dict]:
+        """
+        加载方案清单（按插入顺序），方案只包含 id、name、task_count，内容由load_scheme按需读取
+        
+        旧版本数据库（格式版本低于当前版本）全量加载，由DataManager迁移后写回
+        """
+        cur = self.conn.cursor()
+        meta = dict(cur.execute("SELECT key, value FROM meta"))
+        if (meta.get("schema_version") or 0) < migrations.SCHEMA_VERSION:
+            return self._load_all(meta)
+        schemes = [
+            {"id": scheme_id, "name": name, "task_count": task_count}
+            for scheme_id, name, task_count in cur.execute(
+                "SELECT id, name, (SELECT COUNT(*) FROM tasks WHERE scheme_id = schemes.id) "
+                "FROM schemes ORDER BY rowid")
+        ]
+        if not schemes:
+            return None
+        return self._with_meta({"schemes": schemes}, meta)
+    
+    def load_scheme(self, scheme_id: int) -> Dict:
+        """
+        读取一个方案的内容
+        
+        Args:
+            scheme_id: 方案ID
+        
+        Returns:
+            方案的 gpus、tasks、allocations 以及ID计数器（计数器为空时由DataManager补上）
+        """
+        cur = self.conn.cursor()
+        scheme = {
+            "gpus": [
+                {"id": gpu_id, "name": name, "total_memory": total_memory}
+                for gpu_id, name, total_memory in cur.execute(
+                    "SELECT id, name, total_memory FROM gpus WHERE scheme_id = ? ORDER BY rowid",
+                    (scheme_id,))
+            ],
+            "tasks": [
+                {"id": task_id, "name": name, "description": description}
+                for task_id, name, description in cur.execute(
+                    "SELECT id, name, description FROM tasks WHERE scheme_id = ? ORDER BY rowid",
+                    (scheme_id,))
+            ],
+            "allocations": [
+                {"task_id": task_id, "gpu_id": gpu_id, "memory_usage": memory_usage}
+                for task_id, gpu_id, memory_usage in cur.execute(
+                    "SELECT task_id, gpu_id, memory_usage FROM allocations "
+                    "WHERE scheme_id = ? ORDER BY rowid", (scheme_id,))
+            ]
+        }
+        row = cur.execute("SELECT next_gpu_id, next_task_id FROM schemes WHERE id = ?",
+                          (scheme_id,)).fetchone()
+        if row is not None and row[0] is not None and row[1] is not None:
+            scheme["next_gpu_id"], scheme["next_task_id"] = row
+        return scheme
+    
+    def _load_all(self, meta: Dict) -> Optional[Dict]:
+        """全量加载全部方案（旧版本数据库迁移用）"""
+        cur = self.conn.cursor()
+        schemes = []
+        for scheme_id, name, next_gpu_id, next_task_id in cur.execute(
+                "SELECT id, name, next_gpu_id, next_task_id FROM schemes ORDER BY rowid"):
+            scheme = {"id": scheme_id, "name": name, "gpus": [], "tasks": [], "allocations": []}
+            # 计数器为空（旧版本数据库）时由迁移补上
+            if next_gpu_id is not None and next_task_id is not None:
+                scheme["next_gpu_id"] = next_gpu_id
+                scheme["next_task_id"] = next_task_id
+            schemes.append(scheme)
+        if not schemes:
+            return None
+        by_id = {scheme["id"]: scheme for scheme in schemes}
+        for scheme_id, gpu_id, name, total_memory in cur.execute(
+                "SELECT scheme_id, id, name, total_memory FROM gpus ORDER BY rowid"):
+            by_id[scheme_id]["gpus"].append(
+                {"id": gpu_id, "name": name, "total_memory": total_memory})
+        for scheme_id, task_id, name, description in cur.execute(
+                "SELECT scheme_id, id, name, description FROM tasks ORDER BY rowid"):
+            by_id[scheme_id]["tasks"].append(
+                {"id": task_id, "name": name, "description": description})
+        for scheme_id, task_id, gpu_id, memory_usage in cur.execute(
+                "SELECT scheme_id, task_id, gpu_id, memory_usage FROM allocations ORDER BY rowid"):
+            by_id[scheme_id]["allocations"].append(
+                {"task_id": task_id, "gpu_id": gpu_id, "memory_usage": memory_usage})
+        return self._with_meta({"schemes": schemes}, meta)
+    
+    @staticmethod
+    def _with_meta(data: Dict, meta: Dict) -> Dict:
+        """补上meta表中保存的方案ID计数器和格式版本"""
+        if meta.get("next_scheme_id") is not None:
+            data["next_scheme_id"] = meta["next_scheme_id"]
+        if meta.get("schema_version") is not None:
+            data["schema_version"] = meta["schema_version"]
+        # 旧版本数据库中保存的当前方案（现在由界面设置保存）
+        if meta.get("current_scheme_id") is not None:
+            data["current_scheme_id"] = meta["current_scheme_id"]
+        return data
+    
+    def write_ops(self, ops: List[Dict]):
+        """在一个事务中按行执行变更"""
+        with self.conn:
+            for op in ops:
+                getattr(self, "_op_" + op["op"])(op)
+    
+    def save(self, data: Dict):
+        """全量写入：删除已不存在的方案，重写已加载的方案（未加载的方案只更新名称）"""
+        schemes = data.get("schemes", [])
+        scheme_ids = {scheme["id"] for scheme in schemes}
+        with self.conn:
+            removed = [(scheme_id,) for (scheme_id,) in self.conn.execute("SELECT id FROM schemes")
+                       if scheme_id not in scheme_ids]
+            self.conn.executemany("DELETE FROM allocations WHERE scheme_id = ?", removed)
+            self.conn.executemany("DELETE FROM schemes WHERE id = ?", removed)
+            self.conn.execute("DELETE FROM meta")
+            for scheme in schemes:
+                self.conn.execute(
+                    "INSERT INTO schemes (id, name) VALUES (?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET name = excluded.name",
+                    (scheme["id"], scheme["name"]))
+                if "gpus" not in scheme:
+                    continue
+                self.conn.execute(
+                    "UPDATE schemes SET next_gpu_id = ?, next_task_id = ? WHERE id = ?",
+                    (scheme.get("next_gpu_id"), scheme.get("next_task_id"), scheme["id"]))
+                self.conn.execute("DELETE FROM allocations WHERE scheme_id = ?", (scheme["id"],))
+                self.conn.execute("DELETE FROM gpus WHERE scheme_id = ?", (scheme["id"],))
+                self.conn.execute("DELETE FROM tasks WHERE scheme_id = ?", (scheme["id"],))
+                self.conn.executemany(
+                    "INSERT INTO gpus (scheme_id, id, name, total_memory) VALUES (?, ?, ?, ?)",
+                    [(scheme["id"], gpu["id"], gpu["name"], gpu["total_memory"])
+                     for gpu in scheme.get("gpus", [])])
+                self.conn.executemany(
+                    "INSERT INTO tasks (scheme_id, id, name, description) VALUES (?, ?, ?, ?)",
+                    [(scheme["id"], task["id"], task["name"], task.get("description", ""))
+                     for task in scheme.get("tasks", [])])
+                # 跳过指向不存在的GPU或任务的分配（外键约束）
+                gpu_ids = {gpu["id"] for gpu in scheme.get("gpus", [])}
+                task_ids = {task["id"] for task in scheme.get("tasks", [])}
+                self.conn.executemany(
+                    "INSERT INTO allocations (scheme_id, task_id, gpu_id, memory_usage) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(scheme["id"], alloc["task_id"], alloc["gpu_id"], alloc["memory_usage"])
+                     for alloc in scheme.get("allocations", [])
+                     if alloc["gpu_id"] in gpu_ids and alloc["task_id"] in task_ids])
+            self.conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+                ("schema_version", data.get("schema_version")),
+                ("next_scheme_id", data.get("next_scheme_id")),
+            ])
+    
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+    
+    def query_allocations(self, scheme_id: Optional[int] = None, task_id: Optional[int] = None,
+                          gpu_id: Optional[int] = None) -> List[Dict]:
+        """
+        按条件查询分配（可跨方案），走 (scheme_id, gpu_id) / (scheme_id, task_id) 索引
+        
+        Args:
+            scheme_id: 方案ID，为None时查询所有方案
+            task_id: 任务ID
+            gpu_id: GPU ID
+        
+        Returns:
+            分配列表，每项额外包含 scheme_id
+        """
+        conditions = []
+        params = []
+        for column, value in (("scheme_id", scheme_id), ("task_id", task_id), ("gpu_id", gpu_id)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        sql = "SELECT scheme_id, task_id, gpu_id, memory_usage FROM allocations"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return [
+            {"scheme_id": row[0], "task_id": row[1], "gpu_id": row[2], "memory_usage": row[3]}
+            for row in self.conn.execute(sql + " ORDER BY rowid", params)
+        ]
+    
+    # ========== 变更 → SQL ==========
+    
+    def _op_put_scheme(self, op: Dict):
+        record = op["record"]
+        self.conn.execute(
+            "INSERT INTO schemes (id, name, next_gpu_id, next_task_id) VALUES (?, ?, 1, 1) "
+            "ON CONFLICT(id) DO UPDATE SET name = excluded.name", (record["id"], record["name"]))
+        # ID计数器只增不减
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('next_scheme_id', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = MAX(COALESCE(value, 1), excluded.value)",
+            (record["id"] + 1,))
+    
+    def _op_del_scheme(self, op: Dict):
+        self.conn.execute("DELETE FROM allocations WHERE scheme_id = ?", (op["scheme_id"],))
+        self.conn.execute("DELETE FROM schemes WHERE id = ?", (op["scheme_id"],))
+    
+    def _op_put_gpu(self, op: Dict):
+        record = op["record"]
+        self.conn.execute(
+            "INSERT INTO gpus (scheme_id, id, name, total_memory) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(scheme_id, id) DO UPDATE SET "
+            "name = excluded.name, total_memory = excluded.total_memory",
+            (op["scheme_id"], record["id"], record["name"], record["total_memory"]))
+        self.conn.execute(
+            "UPDATE schemes SET next_gpu_id = MAX(COALESCE(next_gpu_id, 1), ?) WHERE id = ?",
+            (record["id"] + 1, op["scheme_id"]))
+    
+    def _op_del_gpu(self, op: Dict):
+        self.conn.execute("DELETE FROM gpus WHERE scheme_id = ? AND id = ?",
+                          (op["scheme_id"], op["gpu_id"]))
+    
+    def _op_put_task(self, op: Dict):
+        record = op["record"]
+        self.conn.execute(
+            "INSERT INTO tasks (scheme_id, id, name, description) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(scheme_id, id) DO UPDATE SET "
+            "name = excluded.name, description = excluded.description",
+            (op["scheme_id"], record["id"], record["name"], record.get("description", "")))
+        self.conn.execute(
+            "UPDATE schemes SET next_task_id = MAX(COALESCE(next_task_id, 1), ?) WHERE id = ?",
+            (record["id"] + 1, op["scheme_id"]))
+    
+    def _op_del_task(self, op: Dict):
+        self.conn.execute("DELETE FROM tasks WHERE scheme_id = ? AND id = ?",
+                          (op["scheme_id"], op["task_id"]))
+    
+    def _op_put_alloc(self, op: Dict):
+        record = op["record"]
+        self.conn.execute(
+            "INSERT INTO allocations (scheme_id, task_id, gpu_id, memory_usage) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(scheme_id, task_id, gpu_id) DO UPDATE SET "
+            "memory_usage = excluded.memory_usage",
+            (op["scheme_id"], record["task_id"], record["gpu_id"], record["memory_usage"]))
+    
+    def _op_del_alloc(self, op: Dict):
+        self.conn.execute(
+            "DELETE FROM allocations WHERE scheme_id = ? AND task_id = ? AND gpu_id = ?",
+            (op["scheme_id"], op["task_id"], op["gpu_id"]))
+
+
+def import_json(json_file: str, db_file: str):
+    """
+    将JSON数据文件一次性导入SQLite数据库（会覆盖数据库中的已有数据）
+    
+    Args:
+        json_file: JSON数据文件路径（只读取，旧格式在内存中迁移后导入）
+        db_file: 数据库文件路径
+    """
+    data = serializer_for(json_file).load(json_file)
+    migrations.migrate(data)
+    storage = SQLiteStorage(db_file)
+    try:
+        storage.save(data)
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("用法: python -m storage.sqlite_backend <gpu_data.json> <gpu_data.db>")
+        sys.exit(1)
+    import_json(sys.argv[1], sys.argv[2])
+    print(f"✓ 已导入: {sys.argv[1]} -> {sys.argv[2]}")
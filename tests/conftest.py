@@ -0,0 +1,40 @@
+"""
+测试公共配置：把项目根目录加入模块搜索路径，并提供常用的测试数据
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_manager import DataManager  # noqa: E402
+
+
+def populate(data_manager: DataManager, gpus: int = 4, tasks: int = 3):
+    """
+    在当前方案中添加GPU、任务，并把每个任务分配到每张GPU上
+    
+    Returns:
+        (gpu_ids, task_ids)
+    """
+    gpu_ids = [data_manager.add_gpu(f"GPU-{i}", 80.0) for i in range(gpus)]
+    task_ids = [data_manager.add_task(f"任务-{i}") for i in range(tasks)]
+    for task_id in task_ids:
+        for gpu_id in gpu_ids:
+            data_manager.add_allocation(task_id, gpu_id, 1.0 + task_id)
+    return gpu_ids, task_ids
+
+
+def scheme_state(data_manager: DataManager):
+    """全部已加载方案的内容（记录转换为字典），用于比较修改前后的数据"""
+    return [
+        {key: [record.to_json() for record in value] if isinstance(value, list) else value
+         for key, value in scheme.items()}
+        for scheme in data_manager.get_all_schemes()
+    ]
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    return str(tmp_path / "gpu_data.json")
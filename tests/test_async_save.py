@@ -0,0 +1,75 @@
+"""
+后台写盘：AsyncWriter 的去抖合并、关闭时落盘，以及 DataManager 的增量快照
+"""
+import threading
+import time
+
+import pytest
+
+from conftest import populate, scheme_state
+from data_manager import DataManager
+from storage.async_writer import AsyncWriter
+
+
+def test_writer_coalesces_submits_within_debounce():
+    written = []
+    done = threading.Event()
+    writer = AsyncWriter(lambda snapshot: written.append(snapshot) or done.set(),
+                         debounce=0.2)
+    for i in range(5):
+        writer.submit({"value": i})
+    assert done.wait(5.0)
+    time.sleep(0.3)
+    assert written == [{"value": 4}]
+    assert writer.submit_count == 5
+    assert writer.write_count == 1
+    writer.close()
+
+
+def test_writer_close_flushes_pending_snapshot():
+    written = []
+    writer = AsyncWriter(written.append, debounce=10.0, max_delay=10.0)
+    writer.submit({"value": 1})
+    writer.submit({"value": 2})
+    assert written == []
+    writer.close()
+    assert written == [{"value": 2}]
+    with pytest.raises(RuntimeError):
+        writer.submit({"value": 3})
+
+
+def test_data_manager_close_writes_debounced_edits(data_file):
+    data_manager = DataManager(data_file, async_save=True, save_debounce=10.0)
+    writer = data_manager._writer
+    gpu_ids, task_ids = populate(data_manager)
+    data_manager.delete_allocation(task_ids[0], gpu_ids[0])
+    expected = scheme_state(data_manager)
+    data_manager.close()
+    assert writer.write_count == 1
+    assert scheme_state(DataManager(data_file)) == expected
+
+
+def test_snapshot_converts_only_modified_lists(data_file):
+    data_manager = DataManager(data_file, async_save=True, save_debounce=10.0)
+    gpu_ids, task_ids = populate(data_manager)
+    other_scheme = data_manager.add_scheme("其他方案")
+    first = data_manager._snapshot()
+    data_manager.add_allocation(task_ids[0], gpu_ids[0], 9.0)
+    second = data_manager._snapshot()
+    assert second["schemes"] == scheme_state(data_manager)
+    # 未修改的列表沿用上次快照，修改过的列表重新转换，旧快照不受影响
+    assert second["schemes"][0]["gpus"] is first["schemes"][0]["gpus"]
+    assert second["schemes"][1]["allocations"] is first["schemes"][1]["allocations"]
+    assert second["schemes"][0]["allocations"] is not first["schemes"][0]["allocations"]
+    assert first["schemes"][0]["allocations"][0]["memory_usage"] == 1.0 + task_ids[0]
+    
+    # 回滚的事务同样使修改过的列表失效
+    with pytest.raises(ZeroDivisionError):
+        with data_manager.transaction():
+            data_manager.delete_gpu(gpu_ids[1])
+            data_manager.delete_scheme(other_scheme)
+            1 / 0
+    assert data_manager._snapshot()["schemes"] == scheme_state(data_manager)
+    data_manager.delete_task(task_ids[1])
+    assert data_manager._snapshot()["schemes"] == scheme_state(data_manager)
+    data_manager.close()
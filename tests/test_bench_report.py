@@ -0,0 +1,21 @@
+"""
+基准结果与基线比较
+"""
+import argparse
+
+from benchmarks import report
+
+
+def results(**cases):
+    return {"results": [{"case": case, "allocations": 10, "ms": ms} for case, ms in cases.items()]}
+
+
+def test_compare_uses_cli_noise_floor_by_default():
+    parser = argparse.ArgumentParser()
+    report.add_arguments(parser)
+    assert parser.parse_args([]).min_ms == report.DEFAULT_MIN_MS
+
+    baseline = results(fast=1.0, slow=10.0)
+    # 慢50%但只差0.4毫秒，视为噪声
+    regressions = report.compare(results(fast=1.4, slow=13.0), baseline, 0.25)
+    assert [(item["case"], item["ratio"]) for item in regressions] == [("slow", 1.3)]
@@ -0,0 +1,84 @@
+"""
+图表数据集：每个GPU的已用显存，以及热力图隐藏期间推迟重新生成
+"""
+import os
+
+import numpy as np
+import pytest
+
+from conftest import populate
+from data_manager import DataManager
+from ui.chart_data import build_chart_dataset, build_chart_row, gpu_memory
+
+
+def segment_sums(dataset):
+    return [sum(segment.memory for segment in row.segments) for row in dataset.rows]
+
+
+def test_used_memory_matches_segments(data_file):
+    data_manager = DataManager(data_file)
+    gpu_ids, task_ids = populate(data_manager)
+    data_manager.add_gpu("空闲", 24.0)
+    dataset = build_chart_dataset(data_manager)
+    used, total = gpu_memory(dataset)
+    assert used.tolist() == segment_sums(dataset)
+    assert used.tolist()[-1] == 0.0
+    assert total.tolist() == [gpu["total_memory"] for gpu in data_manager.get_all_gpus()]
+    
+    # 替换一行时只更新该行，原数据集不变
+    data_manager.add_allocation(task_ids[0], gpu_ids[1], 20.0)
+    updated = dataset.with_row(1, build_chart_row(data_manager, gpu_ids[1], dataset.tasks))
+    assert updated.used.tolist() == segment_sums(updated)
+    assert dataset.used.tolist() == segment_sums(dataset)
+    assert not updated.used.flags.writeable
+    # 没有汇总结果的数据集逐行求和
+    assert gpu_memory(updated._replace(used=None))[0].tolist() == segment_sums(updated)
+
+
+def test_segments_match_single_row_build(data_file):
+    data_manager = DataManager(data_file)
+    gpu_ids, task_ids = populate(data_manager)
+    data_manager.add_gpu("空闲", 24.0)
+    data_manager.add_allocation(task_ids[0], gpu_ids[1], 0.0)
+    data_manager.delete_allocation(task_ids[2], gpu_ids[2])
+    dataset = build_chart_dataset(data_manager)
+    rows = [build_chart_row(data_manager, gpu["id"], dataset.tasks)
+            for gpu in data_manager.get_all_gpus()]
+    assert list(dataset.rows) == rows
+    assert [segment.task_id for segment in dataset.rows[1].segments] == task_ids[1:]
+    assert len(dataset.rows[-1].segments) == 0
+    # 分段与单行构建的结果比较相等，与内容不同的分段不相等
+    assert dataset.rows[0].segments != dataset.rows[1].segments
+    assert dataset.rows[0].segments == build_chart_dataset(data_manager).rows[0].segments
+
+
+def test_empty_scheme_used_is_float(data_file):
+    data_manager = DataManager(data_file)
+    data_manager.add_gpu("GPU", 80.0)
+    used, total = gpu_memory(build_chart_dataset(data_manager))
+    assert used.dtype == np.float64 and used.tolist() == [0.0]
+
+
+def test_hidden_heatmap_rebuilds_when_shown(data_file):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    from ui.heatmap_widget import HeatmapWidget
+    
+    data_manager = DataManager(data_file)
+    populate(data_manager)
+    widget = HeatmapWidget()
+    widget.set_data(build_chart_dataset(data_manager))
+    assert widget.stale and len(widget.used) == 0
+    widget.show()
+    app.processEvents()
+    assert not widget.stale
+    assert widget.used.tolist() == segment_sums(widget.dataset)
+    
+    widget.hide()
+    data_manager.add_gpu("新GPU", 24.0)
+    widget.set_data(build_chart_dataset(data_manager))
+    assert widget.stale and len(widget.used) == 4
+    widget.show()
+    assert len(widget.used) == 5
+    widget.close()
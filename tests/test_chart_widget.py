@@ -0,0 +1,92 @@
+"""
+图表控件（无界面环境下用 offscreen 平台运行）：行位图缓存的大小上限，以及没有OpenGL时使用QPainter绘制
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+
+from conftest import populate  # noqa: E402
+from data_manager import DataManager  # noqa: E402
+from ui.chart_data import build_chart_dataset  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def scroll_chart(app, data_file):
+    """放在滚动区域中、有500个GPU的图表，返回 (滚动区域, 图表)"""
+    from ui.chart_widget import ChartWidget
+    
+    data_manager = DataManager(data_file)
+    populate(data_manager, gpus=500, tasks=2)
+    chart = ChartWidget()
+    chart.set_data(build_chart_dataset(data_manager))
+    scroll = QtWidgets.QScrollArea()
+    scroll.setWidgetResizable(True)
+    scroll.setWidget(chart)
+    scroll.resize(1200, 600)
+    scroll.show()
+    app.processEvents()
+    yield scroll, chart
+    scroll.close()
+
+
+def pixmap_bytes(chart):
+    return sum(pixmap.width() * pixmap.height() * 4 for pixmap in chart.row_pixmaps.values())
+
+
+def test_row_pixmap_cache_is_bounded_by_viewport(app, scroll_chart):
+    scroll, chart = scroll_chart
+    screen_rows = chart.rows_per_screen()
+    assert 0 < len(chart.row_pixmaps) <= screen_rows < 30
+    # 滚动到底部的过程中缓存不超过约3屏
+    bar = scroll.verticalScrollBar()
+    for value in range(0, bar.maximum() + 1, bar.pageStep() // 2):
+        bar.setValue(value)
+        app.processEvents()
+        assert len(chart.row_pixmaps) <= chart.cached_screens * screen_rows
+    assert len(chart.row_pixmaps) > screen_rows
+
+
+def test_row_pixmap_cache_is_bounded_by_bytes(app, scroll_chart):
+    scroll, chart = scroll_chart
+    chart.max_cache_bytes = 1
+    chart.invalidate_layout()
+    bar = scroll.verticalScrollBar()
+    for value in range(0, bar.maximum() + 1, bar.pageStep()):
+        bar.setValue(value)
+        app.processEvents()
+        # 字节上限过小时只保留一屏
+        assert len(chart.row_pixmaps) <= chart.rows_per_screen()
+    
+    # 一次渲染全部行时，超出上限的行不进入缓存
+    chart.max_cache_bytes = 32 * 1024 * 1024
+    chart.invalidate_layout()
+    chart.grab()
+    assert len(chart.row_pixmaps) == chart.max_cached_rows() < 500
+    assert pixmap_bytes(chart) <= chart.max_cache_bytes
+
+
+def test_offscreen_falls_back_to_qpainter(app, scroll_chart, monkeypatch):
+    from ui import gl_chart_view
+    
+    scroll, chart = scroll_chart
+    # 重新检测（不使用之前缓存的结果）：offscreen 平台没有硬件OpenGL
+    monkeypatch.setattr(gl_chart_view, "_available", None)
+    assert not gl_chart_view.opengl_available()
+    assert not gl_chart_view.enable_opengl(chart)
+    assert chart.gl_view is None
+    
+    chart.invalidate_layout()
+    image = scroll.viewport().grab().toImage()
+    assert chart.row_pixmaps
+    # 第一行的柱子区域画出了非白色的分段
+    y_top, y_center, y_bottom = chart.row_geometry(0)
+    colors = {image.pixel(x, int(y_center)) for x in range(chart.left_margin, image.width(), 10)}
+    assert len(colors) > 1
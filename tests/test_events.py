@@ -0,0 +1,88 @@
+"""
+变更事件：每种修改发送的事件类型和ID，事务提交后统一发送，回滚时不发送
+"""
+import pytest
+
+import events
+from conftest import populate
+from data_manager import DataManager
+from events import ChangeEvent
+
+
+class Boom(Exception):
+    pass
+
+
+# 在 populate(gpus=2, tasks=2) 之后（GPU 1、2，任务 1、2，方案 1）执行的修改和预期事件
+MUTATIONS = {
+    "add_gpu": (lambda dm: dm.add_gpu("新GPU", 24.0),
+                [ChangeEvent(events.GPU_ADDED, 1, gpu_id=3)]),
+    "update_gpu": (lambda dm: dm.update_gpu(1, "改名", 40.0),
+                   [ChangeEvent(events.GPU_UPDATED, 1, gpu_id=1)]),
+    "delete_gpu": (lambda dm: dm.delete_gpu(2),
+                   [ChangeEvent(events.GPU_DELETED, 1, gpu_id=2)]),
+    "add_task": (lambda dm: dm.add_task("新任务"),
+                 [ChangeEvent(events.TASK_ADDED, 1, task_id=3)]),
+    "update_task": (lambda dm: dm.update_task(1, "改名", "描述"),
+                    [ChangeEvent(events.TASK_UPDATED, 1, task_id=1)]),
+    "delete_task": (lambda dm: dm.delete_task(2),
+                    [ChangeEvent(events.ALLOCATION_CHANGED, 1, gpu_id=1, task_id=2),
+                     ChangeEvent(events.ALLOCATION_CHANGED, 1, gpu_id=2, task_id=2),
+                     ChangeEvent(events.TASK_DELETED, 1, task_id=2)]),
+    "add_allocation": (lambda dm: dm.add_allocation(1, 2, 7.0),
+                       [ChangeEvent(events.ALLOCATION_CHANGED, 1, gpu_id=2, task_id=1)]),
+    "delete_allocation": (lambda dm: dm.delete_allocation(2, 1),
+                          [ChangeEvent(events.ALLOCATION_CHANGED, 1, gpu_id=1, task_id=2)]),
+    "delete_missing_allocation": (lambda dm: dm.delete_allocation(2, 9), []),
+    "add_scheme": (lambda dm: dm.add_scheme("新方案"),
+                   [ChangeEvent(events.SCHEME_ADDED, 2)]),
+    "update_scheme": (lambda dm: dm.update_scheme(1, "改名"),
+                      [ChangeEvent(events.SCHEME_UPDATED, 1)]),
+    "delete_scheme": (lambda dm: dm.delete_scheme(dm.add_scheme("新方案")),
+                      [ChangeEvent(events.SCHEME_ADDED, 2), ChangeEvent(events.SCHEME_DELETED, 2)]),
+    "set_current_scheme": (lambda dm: dm.set_current_scheme(dm.add_scheme("新方案")),
+                           [ChangeEvent(events.SCHEME_ADDED, 2),
+                            ChangeEvent(events.SCHEME_SWITCHED, 2)]),
+}
+
+
+@pytest.fixture
+def data_manager(data_file):
+    data_manager = DataManager(data_file)
+    populate(data_manager, gpus=2, tasks=2)
+    return data_manager
+
+
+@pytest.mark.parametrize("mutation", MUTATIONS)
+def test_mutator_emits_events(data_manager, mutation):
+    mutate, expected = MUTATIONS[mutation]
+    received = []
+    data_manager.subscribe(received.append)
+    mutate(data_manager)
+    assert received == expected
+
+
+def test_transaction_emits_after_commit_once(data_manager):
+    received = []
+    data_manager.subscribe(received.append)
+    with data_manager.transaction():
+        data_manager.add_allocation(1, 2, 7.0)
+        data_manager.add_allocation(1, 2, 8.0)
+        data_manager.update_gpu(1, "改名", 40.0)
+        assert received == []
+    assert received == [ChangeEvent(events.ALLOCATION_CHANGED, 1, gpu_id=2, task_id=1),
+                        ChangeEvent(events.GPU_UPDATED, 1, gpu_id=1)]
+
+
+def test_rolled_back_transaction_emits_nothing(data_manager):
+    received = []
+    data_manager.subscribe(received.append)
+    with pytest.raises(Boom):
+        with data_manager.transaction():
+            for mutate, _ in MUTATIONS.values():
+                mutate(data_manager)
+            raise Boom()
+    assert received == []
+    # 回滚后的修改照常发送
+    data_manager.add_task("新任务")
+    assert received == [ChangeEvent(events.TASK_ADDED, 1, task_id=3)]
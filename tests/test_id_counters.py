@@ -0,0 +1,88 @@
+"""
+ID计数器：删除ID最大的GPU、任务和方案后，保存并重新加载，新建的ID仍然更大（各存储后端）
+"""
+import json
+import os
+
+import pytest
+
+from conftest import populate
+from data_manager import DataManager
+
+
+def json_file(tmp_path):
+    return str(tmp_path / "gpu_data.json"), {}
+
+
+def journal_file(tmp_path):
+    return str(tmp_path / "gpu_data.json"), {"journal": True}
+
+
+def async_file(tmp_path):
+    return str(tmp_path / "gpu_data.json"), {"async_save": True}
+
+
+def sqlite_file(tmp_path):
+    return str(tmp_path / "gpu_data.db"), {}
+
+
+def sharded_dir(tmp_path):
+    data_dir = tmp_path / "shards"
+    data_dir.mkdir()
+    return str(data_dir), {}
+
+
+BACKENDS = {
+    "json": json_file,
+    "journal": journal_file,
+    "async": async_file,
+    "sqlite": sqlite_file,
+    "sharded": sharded_dir,
+}
+
+
+def delete_highest(data_manager):
+    """删除ID最大的GPU、任务和方案，返回被删除的ID"""
+    gpu_ids, task_ids = populate(data_manager)
+    scheme_id = data_manager.add_scheme("最后的方案")
+    data_manager.delete_gpu(gpu_ids[-1])
+    data_manager.delete_task(task_ids[-1])
+    data_manager.delete_scheme(scheme_id)
+    return gpu_ids[-1], task_ids[-1], scheme_id
+
+
+def assert_new_ids_greater(data_manager, gpu_id, task_id, scheme_id):
+    assert data_manager.add_gpu("新GPU", 24.0) > gpu_id
+    assert data_manager.add_task("新任务") > task_id
+    assert data_manager.add_scheme("新方案") > scheme_id
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_deleted_ids_are_not_reused_after_reload(tmp_path, backend):
+    data_file, options = BACKENDS[backend](tmp_path)
+    data_manager = DataManager(data_file, **options)
+    deleted = delete_highest(data_manager)
+    data_manager.close()
+    
+    reloaded = DataManager(data_file, **options)
+    assert_new_ids_greater(reloaded, *deleted)
+    reloaded.close()
+
+
+def test_migrated_counters_are_not_reused_after_reload(data_file):
+    # 没有版本号和ID计数器的旧格式：计数器在迁移时由已有的最大ID得出，之后随数据保存
+    with open(data_file, "w", encoding="utf-8") as f:
+        json.dump({
+            "schemes": [{"id": 1, "name": "方案", "gpus": [], "tasks": [], "allocations": []}]
+        }, f)
+    data_manager = DataManager(data_file)
+    deleted = delete_highest(data_manager)
+    with open(data_file, "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["next_scheme_id"] == deleted[2] + 1
+    assert saved["schemes"][0]["next_gpu_id"] == deleted[0] + 1
+    assert saved["schemes"][0]["next_task_id"] == deleted[1] + 1
+    
+    reloaded = DataManager(data_file)
+    assert_new_ids_greater(reloaded, *deleted)
+    assert not os.path.exists(data_file + ".tmp")
@@ -0,0 +1,92 @@
+"""
+内存索引与数据一致：每种修改之后的增量索引、已用显存和列式表示与从头重建的结果相同
+"""
+import pytest
+
+from conftest import populate
+from data_manager import DataManager
+
+
+class Boom(Exception):
+    pass
+
+
+def index_state(data_manager):
+    """全部已加载方案的索引内容；同时检查索引中的记录就是方案列表中的记录对象"""
+    state = {}
+    for scheme_id, index in data_manager._indexes.items():
+        scheme = data_manager._scheme_by_id[scheme_id]
+        assert len(index.gpus) == len(scheme["gpus"])
+        assert all(index.gpus[gpu.id] is gpu for gpu in scheme["gpus"])
+        assert len(index.tasks) == len(scheme["tasks"])
+        assert all(index.tasks[task.id] is task for task in scheme["tasks"])
+        assert sum(map(len, index.allocs_by_gpu.values())) == len(scheme["allocations"])
+        assert all(index.get_allocation(alloc.task_id, alloc.gpu_id) is alloc
+                   for alloc in scheme["allocations"])
+        state[scheme_id] = {
+            "gpus": {gpu_id: gpu.to_json() for gpu_id, gpu in index.gpus.items()},
+            "tasks": {task_id: task.to_json() for task_id, task in index.tasks.items()},
+            "by_gpu": {gpu_id: {task_id: alloc.memory_usage for task_id, alloc in allocs.items()}
+                       for gpu_id, allocs in index.allocs_by_gpu.items()},
+            "by_task": {task_id: {gpu_id: alloc.memory_usage for gpu_id, alloc in allocs.items()}
+                        for task_id, allocs in index.allocs_by_task.items()},
+            # 增量维护的已用显存（不含没有分配的GPU）
+            "used": {gpu_id: used for gpu_id, used in index.used_memory.items()},
+        }
+    assert sorted(data_manager._scheme_by_id) == sorted(
+        scheme["id"] for scheme in data_manager.get_all_schemes())
+    return state
+
+
+def rolled_back(data_manager, gpu_ids, task_ids):
+    with pytest.raises(Boom):
+        with data_manager.transaction():
+            data_manager.delete_gpu(gpu_ids[0])
+            data_manager.delete_task(task_ids[1])
+            data_manager.add_allocation(task_ids[0], gpu_ids[1], 30.0)
+            new_task = data_manager.add_task("新任务")
+            data_manager.add_allocation(new_task, gpu_ids[2], 5.0)
+            raise Boom()
+
+
+MUTATIONS = {
+    "add_gpu": lambda dm, gpus, tasks: dm.add_gpu("新GPU", 24.0),
+    "update_gpu": lambda dm, gpus, tasks: dm.update_gpu(gpus[1], "改名", 10.0),
+    "delete_gpu": lambda dm, gpus, tasks: dm.delete_gpu(gpus[1]),
+    "add_task": lambda dm, gpus, tasks: dm.add_task("新任务"),
+    "update_task": lambda dm, gpus, tasks: dm.update_task(tasks[0], "改名", "描述"),
+    "delete_task": lambda dm, gpus, tasks: dm.delete_task(tasks[1]),
+    "add_allocation": lambda dm, gpus, tasks: dm.add_allocation(
+        dm.add_task("新任务"), gpus[0], 7.0),
+    "update_allocation": lambda dm, gpus, tasks: dm.add_allocation(tasks[0], gpus[0], 7.0),
+    "delete_allocation": lambda dm, gpus, tasks: dm.delete_allocation(tasks[2], gpus[3]),
+    "add_scheme": lambda dm, gpus, tasks: dm.add_scheme("新方案"),
+    "delete_scheme": lambda dm, gpus, tasks: dm.delete_scheme(dm.add_scheme("新方案")),
+    "rollback": rolled_back,
+}
+
+
+@pytest.mark.parametrize("mutation", MUTATIONS)
+def test_index_matches_rebuild(data_file, mutation):
+    data_manager = DataManager(data_file)
+    gpu_ids, task_ids = populate(data_manager)
+    data_manager.delete_allocation(task_ids[1], gpu_ids[0])
+    # 先构建列式表示，分配修改时原地更新
+    data_manager.get_allocation_columns()
+    MUTATIONS[mutation](data_manager, gpu_ids, task_ids)
+    incremental = index_state(data_manager)
+    summary = data_manager.get_usage_summary()
+    columns = data_manager.get_allocation_columns()
+    column_used = columns.used_memory().tolist()
+    breakdown = [array.tolist() for array in columns.task_breakdown()]
+    data_manager._rebuild_indexes()
+    assert index_state(data_manager) == incremental
+    assert data_manager.get_usage_summary() == summary
+    # 列式汇总与重建后的列式汇总、逐条求和一致
+    rebuilt = data_manager.get_allocation_columns()
+    assert rebuilt is not columns
+    assert rebuilt.used_memory().tolist() == pytest.approx(column_used)
+    assert [array.tolist() for array in rebuilt.task_breakdown()] == breakdown
+    assert column_used == pytest.approx([
+        sum(alloc["memory_usage"] for alloc in data_manager.get_allocations_by_gpu(gpu["id"]))
+        for gpu in data_manager.get_all_gpus()])
@@ -0,0 +1,87 @@
+"""
+性能埋点：注册方法的计时包装
+"""
+import time
+from contextlib import contextmanager
+
+import pytest
+
+import instrumentation
+from data_manager import DataManager
+
+
+class Sample:
+    def plain(self, value):
+        return value + 1
+    
+    @staticmethod
+    def static(value):
+        return value * 2
+    
+    @classmethod
+    def create(cls):
+        return cls()
+    
+    @contextmanager
+    def context(self, value):
+        yield value
+    
+    def items(self):
+        yield 1
+
+
+instrumentation.register(Sample)
+
+
+@pytest.fixture
+def profiling():
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        yield
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+
+
+def test_wraps_descriptors_and_skips_generators(profiling):
+    sample = Sample.create()
+    assert isinstance(sample, Sample)
+    assert sample.plain(1) == 2
+    assert Sample.static(3) == 6 and sample.static(3) == 6
+    assert list(sample.items()) == [1]
+    stats = instrumentation.snapshot()
+    assert stats["Sample.static"]["count"] == 2
+    assert stats["Sample.create"]["count"] == 1
+    assert stats["Sample.plain"]["count"] == 1
+    assert "Sample.items" not in stats
+
+
+def test_context_manager_timed_across_block(profiling):
+    with Sample().context("值") as value:
+        assert value == "值"
+        time.sleep(0.02)
+    with pytest.raises(KeyError):
+        with Sample().context(None):
+            raise KeyError()
+    stats = instrumentation.snapshot()["Sample.context"]
+    assert stats["count"] == 2
+    assert stats["max"] >= 0.02
+
+
+def test_transaction_timing_includes_commit(profiling, data_file):
+    data_manager = DataManager(data_file)
+    with data_manager.transaction():
+        data_manager.add_gpu("GPU", 80.0)
+        time.sleep(0.02)
+    assert instrumentation.snapshot()["DataManager.transaction"]["max"] >= 0.02
+
+
+def test_disable_restores_original_attributes():
+    originals = {name: Sample.__dict__[name] for name in ("plain", "static", "create", "context")}
+    instrumentation.enable()
+    assert Sample.__dict__["static"] is not originals["static"]
+    assert isinstance(Sample.__dict__["static"], staticmethod)
+    instrumentation.disable()
+    instrumentation.reset()
+    assert {name: Sample.__dict__[name] for name in originals} == originals
@@ -0,0 +1,104 @@
+"""
+变更日志模式：检查点快照 + 日志重放，以及残缺日志的恢复
+"""
+import os
+
+from conftest import populate, scheme_state
+from data_manager import DataManager
+from storage.journal import Journal
+
+
+def test_read_drops_truncated_last_line(tmp_path):
+    journal = Journal(str(tmp_path / "ops.journal"))
+    journal.append([{"op": "del_gpu", "scheme_id": 1, "gpu_id": 1},
+                    {"op": "del_gpu", "scheme_id": 1, "gpu_id": 2}])
+    with open(journal.path, "ab") as f:
+        f.write(b'{"op":"del_gpu","scheme_id":1,"gp')
+    ops, complete = journal.read()
+    assert [op["gpu_id"] for op in ops] == [1, 2]
+    assert not complete
+
+
+def test_checkpoint_and_replay_round_trip(data_file):
+    data_manager = DataManager(data_file, journal=True, journal_compact_bytes=4096)
+    gpu_ids, task_ids = populate(data_manager, gpus=8, tasks=6)
+    # 超过阈值时已合并进检查点快照，之后的修改只追加到日志
+    assert os.path.exists(data_file)
+    data_manager.update_gpu(gpu_ids[0], "改名", 40.0)
+    data_manager.delete_task(task_ids[1])
+    data_manager.add_allocation(task_ids[0], gpu_ids[2], 9.0)
+    journal = Journal(data_file + ".journal")
+    ops, complete = journal.read()
+    assert complete and [op["op"] for op in ops][-3:] == ["put_gpu", "del_task", "put_alloc"]
+    
+    reloaded = DataManager(data_file, journal=True, journal_compact_bytes=4096)
+    assert scheme_state(reloaded) == scheme_state(data_manager)
+    assert reloaded.get_used_memory(gpu_ids[2]) == data_manager.get_used_memory(gpu_ids[2])
+    # 重放后继续追加的修改同样能恢复
+    reloaded.delete_gpu(gpu_ids[3])
+    assert scheme_state(DataManager(data_file, journal=True)) == scheme_state(reloaded)
+
+
+def test_replay_after_truncated_last_line(data_file):
+    data_manager = DataManager(data_file, journal=True)
+    gpu_ids, task_ids = populate(data_manager)
+    data_manager.delete_allocation(task_ids[0], gpu_ids[0])
+    expected = scheme_state(data_manager)
+    journal_file = data_file + ".journal"
+    # 模拟写入最后一条变更时崩溃
+    with open(journal_file, "ab") as f:
+        f.write(b'{"op":"del_gpu","scheme_id":1,"gpu_id":')
+    
+    reloaded = DataManager(data_file, journal=True)
+    assert scheme_state(reloaded) == expected
+    # 残缺的日志已合并进检查点快照，之后的修改追加到新日志
+    assert not os.path.exists(journal_file)
+    reloaded.delete_gpu(gpu_ids[1])
+    assert Journal(journal_file).read() == (
+        [{"op": "del_gpu", "scheme_id": reloaded.get_current_scheme()["id"],
+          "gpu_id": gpu_ids[1]}], True)
+    assert scheme_state(DataManager(data_file, journal=True)) == scheme_state(reloaded)
+
+
+def test_append_truncates_partial_last_line(tmp_path):
+    journal = Journal(str(tmp_path / "ops.journal"))
+    journal.append([{"op": "del_gpu", "scheme_id": 1, "gpu_id": 1}])
+    with open(journal.path, "ab") as f:
+        f.write(b'{"op":"del_gpu","scheme_id":1,"gp')
+    journal.append([{"op": "del_gpu", "scheme_id": 1, "gpu_id": 3}])
+    ops, complete = journal.read()
+    assert complete and [op["gpu_id"] for op in ops] == [1, 3]
+    # 整个日志只有一条残缺行
+    with open(journal.path, "wb") as f:
+        f.write(b'{"op":"del_gpu"' * 1000)
+    journal.append([{"op": "del_gpu", "scheme_id": 1, "gpu_id": 4}])
+    assert journal.read() == ([{"op": "del_gpu", "scheme_id": 1, "gpu_id": 4}], True)
+
+
+def test_failed_append_and_checkpoint_keep_pending_ops(data_file, monkeypatch):
+    data_manager = DataManager(data_file, journal=True)
+    gpu_ids, task_ids = populate(data_manager)
+    journal = data_manager._journal
+    journaled = journal.read()
+    write_file = data_manager._write_file
+    
+    def fail(*args):
+        raise OSError("磁盘已满")
+    
+    monkeypatch.setattr(journal, "append", fail)
+    monkeypatch.setattr(data_manager, "_write_file", lambda data: False)
+    new_task = data_manager.add_task("未写盘")
+    data_manager.add_allocation(new_task, gpu_ids[0], 3.0)
+    assert [op["op"] for op in data_manager._pending_ops] == ["put_task", "put_alloc"]
+    # 日志恢复可写后仍先写检查点快照，不在缺少变更的日志后面继续追加
+    monkeypatch.setattr(journal, "append", Journal.append.__get__(journal))
+    data_manager.delete_allocation(task_ids[0], gpu_ids[1])
+    assert len(data_manager._pending_ops) == 3
+    assert journal.read() == journaled
+    
+    monkeypatch.setattr(data_manager, "_write_file", write_file)
+    data_manager.update_gpu(gpu_ids[2], "写盘成功", 80.0)
+    assert data_manager._pending_ops == []
+    reloaded = DataManager(data_file, journal=True)
+    assert scheme_state(reloaded) == scheme_state(data_manager)
+    assert reloaded.get_task(new_task)["name"] == "未写盘"
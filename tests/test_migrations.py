@@ -0,0 +1,75 @@
+"""
+数据格式迁移：旧版本数据迁移到当前版本并写回
+"""
+import json
+
+import migrations
+from data_manager import DataManager
+
+
+def v1_data():
+    """最早的格式：没有方案和版本号，gpus/tasks/allocations 放在顶层"""
+    return {
+        "gpus": [{"id": 1, "name": "GPU-0", "total_memory": 80.0},
+                 {"id": 4, "name": "GPU-1", "total_memory": 40.0}],
+        "tasks": [{"id": 2, "name": "任务"}],
+        "allocations": [{"task_id": 2, "gpu_id": 4, "memory_usage": 5.0}]
+    }
+
+
+def test_migrate_v1_to_current():
+    data = v1_data()
+    assert migrations.migrate(data)
+    assert data["schema_version"] == migrations.SCHEMA_VERSION == 3
+    assert data["next_scheme_id"] == 2
+    assert data["current_scheme_id"] == 1
+    [scheme] = data["schemes"]
+    assert scheme["name"] == "默认方案"
+    assert [gpu["id"] for gpu in scheme["gpus"]] == [1, 4]
+    assert scheme["allocations"] == v1_data()["allocations"]
+    assert (scheme["next_gpu_id"], scheme["next_task_id"]) == (5, 3)
+    assert not migrations.migrate(data)
+
+
+def test_migrate_copies_global_gpus_into_schemes():
+    data = {
+        "gpus": [{"id": 1, "name": "GPU-0", "total_memory": 80.0}],
+        "schemes": [
+            {"id": 1, "name": "方案1", "tasks": [{"id": 1, "name": "任务"}]},
+            {"id": 3, "name": "方案3", "gpus": [{"id": 7, "name": "自有", "total_memory": 24.0}]}
+        ]
+    }
+    assert migrations.migrate(data)
+    assert "gpus" not in data
+    first, second = data["schemes"]
+    assert [gpu["id"] for gpu in first["gpus"]] == [1]
+    assert first["allocations"] == [] and second["tasks"] == []
+    assert [gpu["id"] for gpu in second["gpus"]] == [7]
+    assert (second["next_gpu_id"], second["next_task_id"]) == (8, 1)
+    assert data["next_scheme_id"] == 4
+
+
+def test_data_manager_writes_back_migrated_file_once(data_file):
+    with open(data_file, "w", encoding="utf-8") as f:
+        json.dump(v1_data(), f)
+    data_manager = DataManager(data_file)
+    assert data_manager.get_used_memory(4) == 5.0
+    assert data_manager.add_gpu("新GPU", 24.0) == 5
+    with open(data_file, "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["schema_version"] == migrations.SCHEMA_VERSION
+    assert "current_scheme_id" not in saved and "gpus" not in saved
+    
+    # 当前版本的数据加载时不再写回
+    with open(data_file, "rb") as f:
+        content = f.read()
+    reloaded = DataManager(data_file)
+    assert [gpu["name"] for gpu in reloaded.get_all_gpus()] == ["GPU-0", "GPU-1", "新GPU"]
+    with open(data_file, "rb") as f:
+        assert f.read() == content
+
+
+def test_newer_version_is_read_as_is():
+    data = {"schema_version": migrations.SCHEMA_VERSION + 1, "schemes": []}
+    assert not migrations.migrate(data)
+    assert data["schema_version"] == migrations.SCHEMA_VERSION + 1
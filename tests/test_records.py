@@ -0,0 +1,38 @@
+"""
+记录对象的JSON转换和字典形式的读写
+"""
+import json
+
+import pytest
+
+from records import AllocationRecord, AllocationView, GPURecord, TaskRecord, json_default
+
+
+def test_json_round_trip():
+    records = [GPURecord(1, "GPU-0", 80.0), TaskRecord(2, "任务", "描述"),
+               AllocationRecord(2, 1, 5.0)]
+    for record in records:
+        assert type(record).from_json(record.to_json()) == record
+    assert TaskRecord.from_json({"id": 3, "name": "无描述"}).description == ""
+    assert json.loads(json.dumps(records, default=json_default)) == \
+        [record.to_json() for record in records]
+
+
+def test_dict_style_access():
+    gpu = GPURecord(1, "GPU-0", 80.0)
+    assert gpu["name"] == gpu.get("name") == "GPU-0"
+    assert "total_memory" in gpu and "memory_usage" not in gpu
+    assert gpu.get("memory_usage", 0) == 0
+    gpu["name"] = "改名"
+    assert gpu.to_json() == {"id": 1, "name": "改名", "total_memory": 80.0}
+    with pytest.raises(KeyError):
+        gpu["memory_usage"] = 1.0
+
+
+def test_allocation_view_reads_through():
+    alloc = AllocationRecord(2, 1, 5.0)
+    view = AllocationView(alloc, TaskRecord(2, "任务"))
+    alloc.memory_usage = 9.0
+    assert view.to_json() == {"task_id": 2, "gpu_id": 1, "memory_usage": 9.0, "task_name": "任务"}
+    with pytest.raises(TypeError):
+        view["memory_usage"] = 1.0
@@ -0,0 +1,96 @@
+"""
+分片存储后端：按方案懒加载、释放已加载方案，以及写入失败后的重试
+"""
+import os
+
+import pytest
+
+from conftest import populate, scheme_state
+from data_manager import DataManager
+from storage.sharded import split_json
+
+
+def loaded_state(data_manager, scheme_id):
+    """切换到方案并返回其内容"""
+    data_manager.set_current_scheme(scheme_id)
+    data_manager.get_all_gpus()
+    return [state for state in scheme_state(data_manager) if state["id"] == scheme_id][0]
+
+
+@pytest.fixture
+def data_dir(tmp_path, data_file):
+    """由4个方案的JSON数据文件拆分出的分片目录，返回 (目录, 各方案内容)"""
+    source = DataManager(data_file)
+    for i in range(4):
+        scheme_id = source.add_scheme(f"方案-{i}") if i else source.get_current_scheme()["id"]
+        source.set_current_scheme(scheme_id)
+        populate(source, gpus=3 + i, tasks=2)
+    expected = {state["id"]: state for state in scheme_state(source)}
+    with open(data_file, "rb") as f:
+        content = f.read()
+    data_dir = str(tmp_path / "shards")
+    split_json(data_file, data_dir)
+    with open(data_file, "rb") as f:
+        assert f.read() == content
+    return data_dir, expected
+
+
+def test_lazy_load(data_dir):
+    data_dir, expected = data_dir
+    data_manager = DataManager(data_dir)
+    assert data_manager._indexes == {}
+    assert [scheme["name"] for scheme in data_manager.get_all_schemes()][1:] == \
+        ["方案-1", "方案-2", "方案-3"]
+    scheme_ids = list(expected)
+    assert data_manager.get_scheme_task_count(scheme_ids[2]) == 2
+    assert loaded_state(data_manager, scheme_ids[2]) == expected[scheme_ids[2]]
+    assert list(data_manager._indexes) == [scheme_ids[2]]
+
+
+def test_evicts_least_recently_used_above_threshold(data_dir):
+    data_dir, expected = data_dir
+    scheme_ids = list(expected)
+    data_manager = DataManager(data_dir, max_loaded_schemes=2)
+    for scheme_id in scheme_ids[:2]:
+        loaded_state(data_manager, scheme_id)
+    assert sorted(data_manager._indexes) == sorted(scheme_ids[:2])
+    # 切回第一个方案后，最久未使用的是第二个方案
+    loaded_state(data_manager, scheme_ids[0])
+    loaded_state(data_manager, scheme_ids[2])
+    assert sorted(data_manager._indexes) == sorted([scheme_ids[0], scheme_ids[2]])
+    evicted = data_manager.get_scheme(scheme_ids[1])
+    assert set(evicted) == {"id", "name", "task_count"}
+    # 释放的方案再次切换到时重新加载
+    assert loaded_state(data_manager, scheme_ids[1]) == expected[scheme_ids[1]]
+    assert data_manager.evict_schemes() == 1
+    assert list(data_manager._indexes) == [scheme_ids[1]]
+
+
+def test_failed_write_keeps_changes_and_dirty_scheme(data_dir, monkeypatch):
+    data_dir, expected = data_dir
+    scheme_ids = list(expected)
+    data_manager = DataManager(data_dir, max_loaded_schemes=1)
+    storage = data_manager._storage
+    save_schemes = storage.save_schemes
+    
+    def fail(*args):
+        raise OSError("磁盘已满")
+    
+    data_manager.set_current_scheme(scheme_ids[0])
+    monkeypatch.setattr(storage, "save_schemes", fail)
+    gpu_id = data_manager.add_gpu("未写盘", 24.0)
+    assert len(data_manager._pending_ops) == 1
+    # 有未写盘修改的方案不会被释放
+    loaded_state(data_manager, scheme_ids[1])
+    loaded_state(data_manager, scheme_ids[2])
+    assert scheme_ids[0] in data_manager._indexes
+    assert scheme_ids[1] not in data_manager._indexes
+    
+    monkeypatch.setattr(storage, "save_schemes", save_schemes)
+    data_manager.add_task("写盘成功")
+    assert data_manager._pending_ops == []
+    reloaded = DataManager(data_dir)
+    assert loaded_state(reloaded, scheme_ids[0]) == loaded_state(data_manager, scheme_ids[0])
+    assert reloaded.get_gpu(gpu_id)["name"] == "未写盘"
+    assert loaded_state(reloaded, scheme_ids[2])["tasks"][-1]["name"] == "写盘成功"
+    assert not os.path.exists(os.path.join(data_dir, "manifest.json.tmp"))
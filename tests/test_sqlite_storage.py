@@ -0,0 +1,195 @@
+"""
+SQLite存储后端：按行写入变更、全量保存，以及JSON导入
+"""
+import json
+import os
+
+import pytest
+
+import migrations
+
+from conftest import populate, scheme_state
+from data_manager import DataManager
+from storage.sqlite_backend import SQLiteStorage, import_json
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return str(tmp_path / "gpu_data.db")
+
+
+def loaded_state(data_manager):
+    """加载全部方案后返回其内容"""
+    for scheme in data_manager.get_all_schemes():
+        data_manager._ensure_loaded(scheme["id"])
+    return scheme_state(data_manager)
+
+
+def test_write_ops_round_trip(db_file):
+    data_manager = DataManager(db_file)
+    gpu_ids, task_ids = populate(data_manager)
+    other_scheme = data_manager.add_scheme("其他方案")
+    data_manager.update_gpu(gpu_ids[0], "改名", 40.0)
+    data_manager.delete_gpu(gpu_ids[1])
+    data_manager.update_task(task_ids[0], "改名任务", "描述")
+    data_manager.delete_task(task_ids[1])
+    data_manager.add_allocation(task_ids[0], gpu_ids[2], 9.0)
+    data_manager.delete_allocation(task_ids[2], gpu_ids[3])
+    data_manager.update_scheme(other_scheme, "改名方案")
+    assert data_manager._pending_ops == []
+    expected = scheme_state(data_manager)
+    data_manager.close()
+    
+    reloaded = DataManager(db_file)
+    assert loaded_state(reloaded) == expected
+    assert reloaded.data["next_scheme_id"] == other_scheme + 1
+    # ID计数器随变更写入，删除的GPU的ID不会被复用
+    assert reloaded.add_gpu("新GPU", 24.0) == gpu_ids[-1] + 1
+    reloaded.close()
+
+
+def test_save_round_trip(tmp_path, db_file):
+    data_manager = DataManager(str(tmp_path / "source.db"))
+    populate(data_manager)
+    data_manager.add_scheme("其他方案")
+    storage = SQLiteStorage(db_file)
+    storage.save(data_manager.data)
+    storage.close()
+    
+    reloaded = DataManager(db_file)
+    assert loaded_state(reloaded) == scheme_state(data_manager)
+    reloaded.close()
+    data_manager.close()
+
+
+def test_import_json_does_not_touch_source(tmp_path, db_file):
+    # 最早的格式：没有方案和ID计数器
+    json_file = str(tmp_path / "legacy.json")
+    with open(json_file, "w", encoding="utf-8") as f:
+        json.dump({
+            "gpus": [{"id": 1, "name": "GPU-0", "total_memory": 80.0},
+                     {"id": 3, "name": "GPU-1", "total_memory": 80.0}],
+            "tasks": [{"id": 2, "name": "任务"}],
+            "allocations": [{"task_id": 2, "gpu_id": 3, "memory_usage": 5.0}]
+        }, f)
+    with open(json_file, "rb") as f:
+        content = f.read()
+    
+    import_json(json_file, db_file)
+    with open(json_file, "rb") as f:
+        assert f.read() == content
+    assert not os.path.exists(json_file + ".tmp")
+    
+    data_manager = DataManager(db_file)
+    assert [gpu["name"] for gpu in data_manager.get_all_gpus()] == ["GPU-0", "GPU-1"]
+    assert data_manager.get_used_memory(3) == 5.0
+    assert data_manager.add_gpu("新GPU", 24.0) == 4
+    data_manager.close()
+    
+    missing = str(tmp_path / "missing.json")
+    with pytest.raises(OSError):
+        import_json(missing, str(tmp_path / "other.db"))
+    assert not os.path.exists(missing)
+
+
+def test_failed_write_keeps_pending_ops(db_file, monkeypatch):
+    data_manager = DataManager(db_file)
+    gpu_ids, task_ids = populate(data_manager)
+    storage = data_manager._storage
+    
+    def fail(*args):
+        raise OSError("磁盘已满")
+    
+    monkeypatch.setattr(storage, "write_ops", fail)
+    monkeypatch.setattr(storage, "save", fail)
+    data_manager.delete_gpu(gpu_ids[0])
+    data_manager.add_allocation(task_ids[0], gpu_ids[1], 9.0)
+    assert [op["op"] for op in data_manager._pending_ops] == ["del_gpu", "put_alloc"]
+    
+    monkeypatch.undo()
+    data_manager.update_task(task_ids[1], "写盘成功", "")
+    assert data_manager._pending_ops == []
+    expected = scheme_state(data_manager)
+    data_manager.close()
+    assert loaded_state(DataManager(db_file)) == expected
+
+
+def test_allocation_to_missing_gpu_or_task_is_rejected(db_file):
+    data_manager = DataManager(db_file)
+    gpu_ids, task_ids = populate(data_manager)
+    data_manager.delete_gpu(gpu_ids[0])
+    expected = scheme_state(data_manager)
+    assert not data_manager.add_allocation(task_ids[0], gpu_ids[0], 9.0)
+    assert not data_manager.add_allocation(task_ids[-1] + 1, gpu_ids[1], 9.0)
+    assert data_manager._pending_ops == []
+    assert scheme_state(data_manager) == expected
+    data_manager.close()
+    assert loaded_state(DataManager(db_file)) == expected
+
+
+def test_new_database_records_schema_version(db_file, monkeypatch):
+    data_manager = DataManager(db_file)
+    populate(data_manager)
+    data_manager.close()
+    storage = SQLiteStorage(db_file)
+    assert dict(storage.conn.execute("SELECT key, value FROM meta"))["schema_version"] == \
+        migrations.SCHEMA_VERSION
+    storage.close()
+    
+    # 重新加载时不需要迁移，也不会全量写入
+    def fail(*args):
+        raise AssertionError("不应全量写入")
+    
+    monkeypatch.setattr(SQLiteStorage, "save", fail)
+    reloaded = DataManager(db_file)
+    reloaded.add_task("新任务")
+    assert reloaded._pending_ops == []
+    reloaded.close()
+
+
+def test_lazy_load_and_full_save_keep_unloaded_schemes(db_file):
+    data_manager = DataManager(db_file)
+    scheme_ids = [data_manager.get_current_scheme()["id"]]
+    populate(data_manager)
+    for i in range(2):
+        scheme_ids.append(data_manager.add_scheme(f"方案-{i}"))
+        data_manager.set_current_scheme(scheme_ids[-1])
+        populate(data_manager, gpus=2 + i, tasks=1 + i)
+    expected = scheme_state(data_manager)
+    data_manager.close()
+    
+    reloaded = DataManager(db_file)
+    assert reloaded._indexes == {}
+    assert [reloaded.get_scheme_task_count(scheme_id) for scheme_id in scheme_ids] == [3, 1, 2]
+    reloaded.set_current_scheme(scheme_ids[1])
+    gpu_id = reloaded.add_gpu("新GPU", 24.0)
+    assert list(reloaded._indexes) == [scheme_ids[1]]
+    # 全量写入只重写已加载的方案，未加载的方案保持原样
+    reloaded._storage.save(reloaded.data)
+    reloaded.close()
+    
+    final = DataManager(db_file)
+    state = loaded_state(final)
+    assert [state[i] for i in (0, 2)] == [expected[i] for i in (0, 2)]
+    final.set_current_scheme(scheme_ids[1])
+    assert final.get_gpu(gpu_id)["name"] == "新GPU"
+    final.close()
+
+
+def test_old_database_is_loaded_and_migrated(db_file):
+    data_manager = DataManager(db_file)
+    populate(data_manager)
+    expected = scheme_state(data_manager)
+    data_manager.close()
+    storage = SQLiteStorage(db_file)
+    with storage.conn:
+        storage.conn.execute("DELETE FROM meta")
+        storage.conn.execute("UPDATE schemes SET next_gpu_id = NULL, next_task_id = NULL")
+    storage.close()
+    
+    reloaded = DataManager(db_file)
+    assert scheme_state(reloaded) == expected
+    reloaded.close()
+    storage = SQLiteStorage(db_file)
+    assert storage.load()["schema_version"] == migrations.SCHEMA_VERSION
+    storage.close()
@@ -0,0 +1,103 @@
+"""
+DataManager.transaction() 的提交和回滚
+"""
+import pytest
+
+from conftest import populate, scheme_state
+from data_manager import DataManager
+
+
+class Boom(Exception):
+    pass
+
+
+def index_state(data_manager):
+    """当前方案的索引内容（每张GPU的已用显存和分配）"""
+    return {
+        gpu["id"]: (data_manager.get_used_memory(gpu["id"]),
+                    sorted((alloc["task_id"], alloc["memory_usage"])
+                           for alloc in data_manager.get_allocations_by_gpu(gpu["id"])))
+        for gpu in data_manager.get_all_gpus()
+    }
+
+
+def test_commit_writes_once(data_file):
+    data_manager = DataManager(data_file)
+    gpu_ids, task_ids = populate(data_manager)
+    writes = []
+    original = data_manager._write_file
+    data_manager._write_file = lambda data: writes.append(1) or original(data)
+    with data_manager.transaction():
+        for gpu_id in gpu_ids:
+            data_manager.add_allocation(task_ids[0], gpu_id, 5.0)
+    assert len(writes) == 1
+    reloaded = DataManager(data_file)
+    assert all(reloaded.get_used_memory(gpu_id) == data_manager.get_used_memory(gpu_id)
+               for gpu_id in gpu_ids)
+
+
+def test_failed_multi_op_transaction_rolls_back(data_file):
+    data_manager = DataManager(data_file)
+    gpu_ids, task_ids = populate(data_manager)
+    other_scheme = data_manager.add_scheme("其他方案")
+    before = scheme_state(data_manager)
+    before_index = index_state(data_manager)
+    before_data = {key: value for key, value in data_manager.data.items() if key != "schemes"}
+    current_scheme_id = data_manager.get_current_scheme()["id"]
+    with open(data_file, "rb") as f:
+        file_content = f.read()
+    received = []
+    data_manager.subscribe(received.append)
+    
+    with pytest.raises(Boom):
+        with data_manager.transaction():
+            new_gpu = data_manager.add_gpu("新GPU", 24.0)
+            data_manager.update_gpu(gpu_ids[0], "改名", 40.0)
+            data_manager.delete_gpu(gpu_ids[1])
+            new_task = data_manager.add_task("新任务")
+            data_manager.add_allocation(new_task, new_gpu, 3.0)
+            data_manager.add_allocation(new_task, gpu_ids[2], 4.0)
+            data_manager.update_task(task_ids[0], "改名任务", "描述")
+            data_manager.add_allocation(task_ids[0], gpu_ids[2], 9.0)
+            data_manager.delete_allocation(task_ids[1], gpu_ids[3])
+            data_manager.delete_task(task_ids[2])
+            with data_manager.transaction():
+                data_manager.add_scheme("新方案")
+                data_manager.update_scheme(other_scheme, "改名方案")
+                data_manager.delete_scheme(other_scheme)
+                data_manager.set_current_scheme(data_manager.get_all_schemes()[-1]["id"])
+            raise Boom()
+    
+    assert data_manager.get_current_scheme()["id"] == current_scheme_id
+    assert scheme_state(data_manager) == before
+    assert index_state(data_manager) == before_index
+    assert {key: value for key, value in data_manager.data.items()
+            if key != "schemes"} == before_data
+    assert data_manager.get_gpu(gpu_ids[1]) is not None
+    assert data_manager.get_task(task_ids[2]) is not None
+    assert data_manager.get_gpu(new_gpu) is None
+    assert data_manager.get_task(new_task) is None
+    # 列式缓存与恢复后的数据一致
+    columns = data_manager.get_allocation_columns()
+    assert columns.used_memory().tolist() == [data_manager.get_used_memory(gpu_id)
+                                              for gpu_id in gpu_ids]
+    # 不写盘、不发送事件
+    with open(data_file, "rb") as f:
+        assert f.read() == file_content
+    assert received == []
+    # 回滚后ID计数器恢复，新建的GPU沿用原来的ID
+    assert data_manager.add_gpu("再次新建", 24.0) == new_gpu
+
+
+def test_rollback_discards_pending_journal_ops(data_file):
+    data_manager = DataManager(data_file, journal=True)
+    gpu_ids, task_ids = populate(data_manager)
+    with pytest.raises(Boom):
+        with data_manager.transaction():
+            data_manager.delete_gpu(gpu_ids[0])
+            data_manager.add_allocation(task_ids[0], gpu_ids[1], 7.0)
+            raise Boom()
+    assert data_manager._pending_ops == []
+    before = scheme_state(data_manager)
+    reloaded = DataManager(data_file, journal=True)
+    assert scheme_state(reloaded) == before
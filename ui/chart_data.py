@@ -0,0 +1,199 @@
+"""
+图表数据准备模块（不依赖Qt，可在无界面环境中使用）
+由列式数据按 (GPU, 任务ID) 汇总显存，生成供 ChartWidget 直接绘制的只读数据集；
+同名的不同任务各自成段，任务名称和颜色在绘制时通过任务索引解析
+"""
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+
+class ChartTask(NamedTuple):
+    """图表中的任务信息"""
+    
+    name: str  # 任务名称
+    order: int  # 在任务列表中的位置，决定分段顺序和颜色
+
+
+class ChartSegment(NamedTuple):
+    """GPU柱子上的一个任务分段"""
+    
+    task_id: int  # 任务ID
+    memory: float  # 显存占用
+
+
+class ChartSegments(Sequence):
+    """
+    一个GPU的任务分段（只读），由汇总结果数组的切片构成，遍历时才生成 ChartSegment
+    
+    与元素相同的 ChartSegment 元组比较相等
+    """
+    
+    __slots__ = ("task_ids", "memory")
+    
+    def __init__(self, task_ids: np.ndarray, memory: np.ndarray):
+        self.task_ids = task_ids
+        self.memory = memory
+    
+    def __len__(self) -> int:
+        return len(self.memory)
+    
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return tuple(self)[idx]
+        return ChartSegment(int(self.task_ids[idx]), float(self.memory[idx]))
+    
+    def __iter__(self) -> Iterator[ChartSegment]:
+        return map(ChartSegment, self.task_ids.tolist(), self.memory.tolist())
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ChartSegments):
+            return (np.array_equal(self.task_ids, other.task_ids)
+                    and np.array_equal(self.memory, other.memory))
+        if isinstance(other, (tuple, list)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return f"ChartSegments({tuple(self)!r})"
+
+
+class ChartRow(NamedTuple):
+    """一个GPU的柱子"""
+    
+    gpu_id: int  # GPU ID
+    name: str  # GPU名称
+    total_memory: float  # 总显存
+    segments: Sequence[ChartSegment]  # 任务分段，按任务顺序排列
+
+
+class ChartDataset(NamedTuple):
+    """图表数据集（只读，修改通过 with_row / with_tasks 生成新的数据集）"""
+    
+    rows: Tuple[ChartRow, ...]  # 每个GPU一行，顺序与GPU列表一致
+    tasks: Mapping[int, ChartTask]  # {任务ID: 任务信息}
+    max_memory: float = 0  # 最大总显存，决定x轴比例
+    used: Optional[np.ndarray] = None  # 每个GPU的已用显存（按行号，只读），由列式数据汇总
+    
+    def with_row(self, row_idx: int, row: ChartRow) -> "ChartDataset":
+        """替换一行，返回新的数据集"""
+        rows = self.rows[:row_idx] + (row,) + self.rows[row_idx + 1:]
+        used = self.used
+        if used is not None:
+            used = used.copy()
+            used[row_idx] = sum(segment.memory for segment in row.segments)
+            used.flags.writeable = False
+        return self._replace(rows=rows, max_memory=_max_memory(rows), used=used)
+    
+    def with_tasks(self, tasks: Mapping[int, ChartTask]) -> "ChartDataset":
+        """替换任务索引，返回新的数据集"""
+        return self._replace(tasks=tasks)
+
+
+EMPTY_DATASET = ChartDataset((), MappingProxyType({}))
+
+
+def _max_memory(rows: Tuple[ChartRow, ...]) -> float:
+    return max((row.total_memory for row in rows), default=0)
+
+
+def build_task_index(all_tasks: List[Dict]) -> Mapping[int, ChartTask]:
+    """
+    构建任务索引
+    
+    Args:
+        all_tasks: 任务列表（get_all_tasks() 的结果）
+    
+    Returns:
+        只读的 {任务ID: ChartTask}
+    """
+    return MappingProxyType({task["id"]: ChartTask(task["name"], order)
+                             for order, task in enumerate(all_tasks)})
+
+
+def build_chart_dataset(data_manager) -> ChartDataset:
+    """
+    构建当前方案的图表数据集（汇总和分段均为向量化计算，只按GPU数量逐行构建）
+    
+    Args:
+        data_manager: 数据管理器
+    
+    Returns:
+        图表数据集，没有当前方案时为空数据集
+    """
+    gpus = data_manager.get_all_gpus()
+    if not gpus:
+        return EMPTY_DATASET
+    all_tasks = data_manager.get_all_tasks()
+    tasks = build_task_index(all_tasks)
+    
+    # 按(GPU, 任务)汇总显存（列式向量化计算），结果已按 gpu_idx、task_idx 排序，只保留显存大于0的分段
+    columns = data_manager.get_allocation_columns()
+    gpu_idx, task_idx, memory = columns.task_breakdown()
+    positive = memory > 0
+    gpu_idx = gpu_idx[positive]
+    memory = memory[positive]
+    task_ids = columns.task_ids[task_idx[positive]]
+    memory.flags.writeable = False
+    task_ids.flags.writeable = False
+    # 每个GPU的已用显存：与分段相同
+    used = np.bincount(gpu_idx, weights=memory,
+                       minlength=len(gpus)).astype(np.float64, copy=False)  # 没有分配时为整数
+    used.flags.writeable = False
+    
+    # 每个GPU的分段是排序结果中连续的一段
+    bounds = np.searchsorted(gpu_idx, np.arange(len(gpus) + 1)).tolist()
+    rows = tuple(ChartRow(gpu["id"], gpu["name"], gpu["total_memory"],
+                          ChartSegments(task_ids[bounds[i]:bounds[i + 1]],
+                                        memory[bounds[i]:bounds[i + 1]]))
+                 for i, gpu in enumerate(gpus))
+    return ChartDataset(rows, tasks, _max_memory(rows), used)
+
+
+def build_chart_row(data_manager, gpu_id: int, tasks: Mapping[int, ChartTask]) -> ChartRow:
+    """
+    构建单个GPU的行（只遍历该GPU上的分配）
+    
+    Args:
+        data_manager: 数据管理器
+        gpu_id: GPU ID
+        tasks: 任务索引，决定分段顺序；不在索引中的任务被忽略
+    
+    Returns:
+        GPU所在行，GPU不存在时为None
+    """
+    gpu = data_manager.get_gpu(gpu_id)
+    if not gpu:
+        return None
+    memory_by_task = {}
+    for alloc in data_manager.get_allocations_by_gpu(gpu_id):
+        if alloc["task_id"] in tasks:
+            memory_by_task[alloc["task_id"]] = (memory_by_task.get(alloc["task_id"], 0)
+                                                + alloc["memory_usage"])
+    segments = tuple(ChartSegment(task_id, value)
+                     for task_id, value in sorted(memory_by_task.items(),
+                                                  key=lambda item: tasks[item[0]].order)
+                     if value > 0)
+    return ChartRow(gpu["id"], gpu["name"], gpu["total_memory"], segments)
+
+
+def gpu_memory(dataset: ChartDataset) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    每个GPU的已用显存和总显存（按行号）
+    
+    Args:
+        dataset: 图表数据集
+    
+    Returns:
+        (used, total) 两个数组
+    """
+    count = len(dataset.rows)
+    used = dataset.used
+    if used is None:
+        # 不是由列式数据构建的数据集，逐行汇总分段
+        used = np.fromiter((sum(segment.memory for segment in row.segments)
+                            for row in dataset.rows), dtype=np.float64, count=count)
+    total = np.fromiter((row.total_memory for row in dataset.rows), dtype=np.float64, count=count)
+    return used, total
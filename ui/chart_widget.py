@@ -1,9 +1,49 @@
 """
 图表组件 - 使用QPainter绘制GPU显存使用情况
 """
-from PyQt5.QtWidgets import QWidget
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import (QPainter, QColor, QFont, QPen, QBrush, QFontMetrics, QLinearGradient)
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+from PyQt5.QtWidgets import QWidget, QAbstractScrollArea
+from PyQt5.QtCore import Qt, QRect, QPoint, QEvent
+from PyQt5.QtGui import (QPainter, QColor, QFont, QPen, QBrush, QFontMetrics, QLinearGradient,
+                         QGradient, QPixmap, QGuiApplication)
+import instrumentation
+from ui.chart_data import EMPTY_DATASET
+
+
+# 任务颜色 - 明亮柔和配色（提高亮度，保持柔和），按任务在任务列表中的位置循环使用
+TASK_COLORS = [
+    QColor("#8FA5D4"),  # 明亮蓝 - 优雅专业
+    QColor("#E0A8C0"),  # 明亮粉 - 温暖舒适
+    QColor("#8FC5A3"),  # 明亮绿 - 自然清新
+    QColor("#E0B38A"),  # 明亮橙 - 温暖明亮
+    QColor("#7BB8D4"),  # 明亮青 - 清新透明
+    QColor("#D4A89A"),  # 明亮棕 - 复古优雅
+    QColor("#9BB8D4"),  # 明亮蓝灰 - 清新淡雅
+    QColor("#B89BC8"),  # 明亮紫灰 - 优雅神秘
+    QColor("#8FC5B0"),  # 明亮绿蓝 - 自然宁静
+    QColor("#D4B38A"),  # 明亮米橙 - 温暖柔和
+    QColor("#8BB8D4"),  # 明亮蓝青 - 冷静专业
+    QColor("#B8D4A8"),  # 明亮绿灰 - 清新自然
+    QColor("#D4A8C0"),  # 明亮粉紫 - 温柔优雅
+    QColor("#9BB8D4")   # 明亮蓝灰 - 清新淡雅
+]
+UNKNOWN_TASK_COLOR = QColor("#cccccc")
+OTHER_TASKS_COLOR = QColor("#B0BEC5")  # 缩小后合并的细小分段
+TITLE_TEXT = "GPU显存使用情况"
+
+
+class RowLayout(NamedTuple):
+    """一行的绘制图元（数据或宽度变化后重新计算，绘制时直接使用）"""
+    
+    bar_rect: Optional[QRect]  # 总显存背景柱，平移到可见范围外时为None
+    segments: Tuple[Tuple[QRect, QBrush], ...]  # 可见的任务分段 (矩形, 渐变画刷)
+    segment_labels: Tuple[Tuple[QPoint, str], ...]  # 任务分段文字 (位置, 文字)，放不下的分段没有文字
+    name_pos: QPoint  # GPU名称位置
+    name: str  # GPU名称（过长时省略，行高太小时为空）
+    total_pos: QPoint  # 总显存文字位置
+    total_text: str  # 总显存文字（行高太小时为空）
 
 
 class ChartWidget(QWidget):
@@ -11,139 +51,623 @@ class ChartWidget(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setMinimumSize(800, 600)
         self.setStyleSheet("background-color: #FFFFFF;")
         
-        # 数据
-        self.gpu_names = []
-        self.total_memories = []
-        self.task_breakdown = []  # 每个GPU的任务分解
-        self.task_color_map = {}
+        # 数据（只读数据集，见 ui.chart_data）
+        self.dataset = EMPTY_DATASET
         
-        # 固定参数
-        self.bar_height_px = 42  # 增加柱子高度
-        self.spacing_px = 12
+        # 固定参数（柱子高度和间距随纵向缩放变化）
+        self.base_bar_height_px = 42  # 增加柱子高度
+        self.base_spacing_px = 12
+        self.bar_height_px = self.base_bar_height_px
+        self.spacing_px = self.base_spacing_px
         self.left_margin = 100
         self.top_margin = 40
         self.right_margin = 120
         self.bottom_margin = 30
+        self.min_segment_px = 4  # 窄于此宽度的相邻分段合并为"其他任务"
+        self.min_label_bar_px = 18  # 柱子低于此高度时不显示分段文字
+        self.min_label_row_px = 16  # 行高低于此高度时不显示GPU名称和总显存
+        
+        # 缩放和平移：Ctrl+滚轮缩放显存轴，Ctrl+Shift+滚轮缩放行高，拖动平移，双击复原
+        self.zoom_x = 1.0
+        self.zoom_y = 1.0
+        self.max_zoom_x = 64.0
+        self.min_zoom_y = 0.25
+        self.max_zoom_y = 3.0
+        self.pan_x = 0.0  # 显存轴放大后向右平移的像素
+        self.drag_pos = None  # 拖动中上一次的鼠标位置（屏幕坐标）
+        
+        # 绘制资源（创建一次，绘制时复用）
+        self.title_font = QFont("Segoe UI", 16, QFont.Bold)
+        self.label_font = QFont("Segoe UI", 10)  # GPU名称和总显存
+        self.segment_font = QFont("Segoe UI", 9, QFont.Bold)  # 任务分段文字
+        self.label_metrics = QFontMetrics(self.label_font)
+        self.segment_metrics = QFontMetrics(self.segment_font)
+        self.title_pen = QPen(QColor("#263238"))
+        self.empty_pen = QPen(QColor("#90A4AE"))
+        self.name_pen = QPen(QColor("#2C3E50"))
+        self.segment_label_pen = QPen(QColor("#000000"))
+        self.total_pen = QPen(QColor("#5A6C7D"))
+        self.background_pen = QPen(QColor("#DEE2E6"), 1.5)
+        self.segment_pen = QPen(QColor("#FFFFFF"), 2)
+        self.background_brush = self.gradient_brush(QColor("#F8F9FA"), QColor("#F0F2F5"))
+        self.other_tasks_brush = self.gradient_brush(OTHER_TASKS_COLOR.lighter(110),
+                                                     OTHER_TASKS_COLOR.darker(110))
+        self.segment_brushes = {}  # {颜色: 渐变画刷}
+        
+        # 布局缓存
+        self.x_scale = None  # x轴比例，None表示需要重新计算
+        self.title_pos = None
+        self.plot_clip = None  # 放大后柱子的裁剪区域（不遮挡GPU名称）
+        self.row_layouts = {}  # {行号: RowLayout}，绘制到时计算
+        # 行位图缓存：每行渲染一次，之后的重绘（滚动、窗口遮挡等）直接贴图；
+        # 超过 max_cached_rows() 时释放最久未使用的行
+        self.row_pixmaps = OrderedDict()  # {行号: QPixmap}，按最近使用排序
+        self.cached_screens = 3  # 最多缓存约几屏可见行
+        self.max_cache_bytes = 32 * 1024 * 1024  # 位图缓存总大小上限（至少保留一屏）
+        
+        # 绘制耗时统计（可选），需提供 record(phase, seconds)
+        self.paint_profiler = None
+        # OpenGL绘制视图（见 ui.gl_chart_view），为None时使用QPainter绘制
+        self.gl_view = None
+        
+        self.update_content_size()
+    
+    def content_height(self):
+        """全部GPU行所需的高度"""
+        return (self.top_margin + len(self.dataset.rows) * (self.bar_height_px + self.spacing_px)
+                + self.bottom_margin)
+    
+    def update_content_size(self):
+        """按行数设置最小高度，使滚动区域能滚动到最后一行"""
+        self.setMinimumSize(800, max(600, self.content_height()))
+    
+    def invalidate_layout(self):
+        """清空布局和行位图缓存（数据、任务索引、宽度或缩放变化后调用）"""
+        self.x_scale = None
+        self.title_pos = None
+        self.row_layouts.clear()
+        self.row_pixmaps.clear()
+    
+    def invalidate_row(self, gpu_idx):
+        """清空一行的布局和位图缓存并重绘该行"""
+        self.row_layouts.pop(gpu_idx, None)
+        self.row_pixmaps.pop(gpu_idx, None)
+        self.update(self.row_rect(gpu_idx))
+    
+    def set_data(self, dataset):
+        """
+        设置图表数据集（ChartDataset）
+        
+        行数和最大显存（x轴比例）不变时与原数据集逐行比较，只重绘GPU信息、分段
+        或所用任务的名称/颜色有变化的行；否则重新计算全部布局并整体重绘
+        """
+        old = self.dataset
+        self.dataset = dataset
+        if len(dataset.rows) != len(old.rows) or dataset.max_memory != old.max_memory:
+            if len(dataset.rows) != len(old.rows):
+                self.update_content_size()
+            self.invalidate_layout()
+            self.update()
+            return
+        
+        # 名称或顺序（颜色）变化的任务
+        changed_tasks = set()
+        if dataset.tasks is not old.tasks:
+            changed_tasks = {task_id for task_id in dataset.tasks.keys() | old.tasks.keys()
+                             if dataset.tasks.get(task_id) != old.tasks.get(task_id)}
+        for gpu_idx, (old_row, row) in enumerate(zip(old.rows, dataset.rows)):
+            if row != old_row or (changed_tasks and any(
+                    segment.task_id in changed_tasks for segment in row.segments)):
+                self.invalidate_row(gpu_idx)
+    
+    def update_row(self, gpu_idx, row):
+        """更新单个GPU的行（ChartRow），只重绘该行（最大显存变化导致x轴比例变化时重绘全部）"""
+        old_max = self.dataset.max_memory
+        self.dataset = self.dataset.with_row(gpu_idx, row)
+        if self.dataset.max_memory != old_max:
+            self.invalidate_layout()
+            self.update()
+        else:
+            self.invalidate_row(gpu_idx)
+    
+    def set_tasks(self, tasks):
+        """更新任务索引，只重绘用到名称或颜色有变化的任务的行"""
+        self.set_data(self.dataset.with_tasks(tasks))
+    
+    def resizeEvent(self, event):
+        """宽度变化后x轴比例和文字位置随之变化"""
+        if event.size().width() != event.oldSize().width():
+            self.pan_x = self.clamp_pan(self.pan_x)
+            self.invalidate_layout()
+        if self.gl_view is not None:
+            self.sync_gl_view()
+        super().resizeEvent(event)
+    
+    def moveEvent(self, event):
+        """滚动区域通过移动图表来滚动，OpenGL视图随之移到新的可见部分"""
+        if self.gl_view is not None:
+            self.sync_gl_view()
+        super().moveEvent(event)
+    
+    def eventFilter(self, watched, event):
+        """滚动区域的视口大小变化时，OpenGL视图随之调整"""
+        if self.gl_view is not None and event.type() == QEvent.Resize:
+            self.sync_gl_view()
+        return super().eventFilter(watched, event)
+    
+    # ========== OpenGL绘制 ==========
+    
+    def set_gl_view(self, gl_view):
+        """
+        设置OpenGL绘制视图（见 ui.gl_chart_view.enable_opengl）
+        
+        Args:
+            gl_view: 以本图表为父组件的 GLChartView，为None时改回QPainter绘制
+        """
+        if self.gl_view is not None:
+            self.gl_view.hide()
+            self.gl_view.deleteLater()
+        self.gl_view = gl_view
+        area = self.scroll_area()
+        if area is not None:
+            if gl_view is None:
+                area.viewport().removeEventFilter(self)
+            else:
+                area.viewport().installEventFilter(self)
+        if gl_view is not None:
+            self.sync_gl_view()
+            gl_view.show()
+        self.update()
+    
+    def sync_gl_view(self):
+        """让OpenGL视图覆盖图表在滚动区域视口中的可见部分，并重绘"""
+        visible = self.rect()
+        area = self.scroll_area()
+        if area is not None:
+            viewport = area.viewport()
+            visible &= QRect(self.mapFrom(viewport, QPoint(0, 0)), viewport.size())
+        self.gl_view.setGeometry(visible)
+        self.gl_view.update()
+    
+    def update(self, *args):
+        """请求重绘（使用OpenGL绘制时重绘OpenGL视图）"""
+        if self.gl_view is not None:
+            self.gl_view.update()
+        else:
+            super().update(*args)
+    
+    # ========== 缩放和平移 ==========
+    
+    def scroll_area(self):
+        """图表所在的滚动区域（没有时为None）"""
+        widget = self.parentWidget()
+        while widget is not None and not isinstance(widget, QAbstractScrollArea):
+            widget = widget.parentWidget()
+        return widget
+    
+    def clamp_pan(self, pan_x):
+        """把横向平移限制在放大后的范围内"""
+        plot_width = self.width() - self.left_margin - self.right_margin
+        return min(max(pan_x, 0.0), max(0.0, plot_width * (self.zoom_x - 1)))
+    
+    def zoom_x_at(self, factor, x):
+        """
+        缩放显存轴，保持光标处的内容不动
+        
+        Args:
+            factor: 缩放倍数（大于1为放大）
+            x: 光标的x坐标
+        """
+        zoom_x = min(max(self.zoom_x * factor, 1.0), self.max_zoom_x)
+        if zoom_x == self.zoom_x:
+            return
+        anchor = x - self.left_margin
+        content_x = (anchor + self.pan_x) / self.zoom_x
+        self.zoom_x = zoom_x
+        self.pan_x = self.clamp_pan(content_x * zoom_x - anchor)
+        self.invalidate_layout()
+        self.update()
+    
+    def zoom_y_at(self, factor, y):
+        """
+        缩放行高，保持光标处的行不动
         
-    def set_data(self, gpu_names, total_memories, task_breakdown, task_color_map):
-        """设置图表数据"""
-        self.gpu_names = gpu_names
-        self.total_memories = total_memories
-        self.task_breakdown = task_breakdown
-        self.task_color_map = task_color_map
+        Args:
+            factor: 缩放倍数（大于1为放大）
+            y: 光标的y坐标
+        """
+        old_pitch = self.bar_height_px + self.spacing_px
+        row_pos = (y - self.top_margin) / old_pitch
+        area = self.scroll_area()
+        scroll_value = area.verticalScrollBar().value() if area is not None else 0
+        self.set_zoom_y(self.zoom_y * factor)
+        # 调整滚动位置，使光标下的行保持在原位（先按新高度调整大小，滚动范围随之更新）
+        if area is not None:
+            self.resize(self.width(), max(area.viewport().height(), self.minimumHeight()))
+            new_y = self.top_margin + row_pos * (self.bar_height_px + self.spacing_px)
+            area.verticalScrollBar().setValue(scroll_value + round(new_y - y))
+    
+    def set_zoom_y(self, zoom_y):
+        """设置行高缩放比例（柱子高度和间距按比例变化）"""
+        zoom_y = min(max(zoom_y, self.min_zoom_y), self.max_zoom_y)
+        bar_height_px = max(4, round(self.base_bar_height_px * zoom_y))
+        spacing_px = max(1, round(self.base_spacing_px * zoom_y))
+        self.zoom_y = zoom_y
+        if (bar_height_px, spacing_px) != (self.bar_height_px, self.spacing_px):
+            self.bar_height_px = bar_height_px
+            self.spacing_px = spacing_px
+            self.invalidate_layout()
+            self.update_content_size()
+            self.update()
+    
+    def pan_by(self, dx, dy):
+        """拖动平移：横向移动显存轴，纵向滚动滚动区域"""
+        pan_x = self.clamp_pan(self.pan_x - dx)
+        if pan_x != self.pan_x:
+            self.pan_x = pan_x
+            self.invalidate_layout()
+            self.update()
+        area = self.scroll_area()
+        if area is not None and dy:
+            scroll_bar = area.verticalScrollBar()
+            scroll_bar.setValue(scroll_bar.value() - dy)
+    
+    def reset_zoom(self):
+        """复原缩放和平移"""
+        self.zoom_x = 1.0
+        self.pan_x = 0.0
+        self.invalidate_layout()
+        self.set_zoom_y(1.0)
         self.update()
     
+    def wheelEvent(self, event):
+        """Ctrl+滚轮缩放显存轴，Ctrl+Shift+滚轮缩放行高（以光标为中心）；不按Ctrl时照常滚动"""
+        if not event.modifiers() & Qt.ControlModifier:
+            super().wheelEvent(event)
+            return
+        # 部分平台按住Shift时滚轮变为横向
+        delta = event.angleDelta().y() or event.angleDelta().x()
+        factor = 1.25 ** (delta / 120)
+        if event.modifiers() & Qt.ShiftModifier:
+            self.zoom_y_at(factor, event.pos().y())
+        else:
+            self.zoom_x_at(factor, event.pos().x())
+        event.accept()
+    
+    def mousePressEvent(self, event):
+        """按下左键开始拖动平移"""
+        if event.button() == Qt.LeftButton:
+            self.drag_pos = event.globalPos()
+            self.setCursor(Qt.ClosedHandCursor)
+            event.accept()
+        else:
+            super().mousePressEvent(event)
+    
+    def mouseMoveEvent(self, event):
+        if self.drag_pos is not None:
+            # 使用屏幕坐标：滚动后组件相对鼠标的位置会变化
+            delta = event.globalPos() - self.drag_pos
+            self.drag_pos = event.globalPos()
+            self.pan_by(delta.x(), delta.y())
+            event.accept()
+        else:
+            super().mouseMoveEvent(event)
+    
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.LeftButton and self.drag_pos is not None:
+            self.drag_pos = None
+            self.unsetCursor()
+            event.accept()
+        else:
+            super().mouseReleaseEvent(event)
+    
+    def mouseDoubleClickEvent(self, event):
+        """双击复原缩放"""
+        self.reset_zoom()
+        super().mouseDoubleClickEvent(event)
+    
+    def task_color(self, task_id):
+        """任务分段的颜色"""
+        task = self.dataset.tasks.get(task_id)
+        if task is None:
+            return UNKNOWN_TASK_COLOR
+        return TASK_COLORS[task.order % len(TASK_COLORS)]
+    
+    @staticmethod
+    def gradient_brush(top_color, bottom_color):
+        """从上到下的渐变画刷（按所绘制图形的外接矩形定位，同一画刷可用于任意位置）"""
+        gradient = QLinearGradient(0, 0, 0, 1)
+        gradient.setCoordinateMode(QGradient.ObjectBoundingMode)
+        gradient.setColorAt(0, top_color)
+        gradient.setColorAt(1, bottom_color)
+        return QBrush(gradient)
+    
+    def segment_brush(self, task_id):
+        """任务分段的渐变画刷（按颜色缓存）"""
+        color = self.task_color(task_id)
+        brush = self.segment_brushes.get(color.rgba())
+        if brush is None:
+            brush = self.gradient_brush(color.lighter(110), color.darker(110))
+            self.segment_brushes[color.rgba()] = brush
+        return brush
+    
+    def row_rect(self, gpu_idx):
+        """指定GPU所在行的绘制区域"""
+        y_top = self.top_margin + gpu_idx * (self.bar_height_px + self.spacing_px)
+        return QRect(0, int(y_top) - 2, self.width(), self.bar_height_px + 4)
+    
     def paintEvent(self, event):
-        """绘制图表"""
-        if not self.gpu_names:
+        """
+        绘制图表（只绘制需要重绘区域内的行）
+        
+        缓存中没有的行先渲染到各自的位图（依次绘制背景柱、任务分段、文字标签三个阶段），
+        再把各行位图贴到窗口
+        """
+        if self.gl_view is not None:
+            # 可见部分由OpenGL视图覆盖
+            return
+        if not self.dataset.rows:
             # 绘制空状态提示
             painter = QPainter(self)
             painter.setRenderHint(QPainter.Antialiasing)
-            painter.setFont(QFont("Segoe UI", 16, QFont.Bold))
-            painter.setPen(QColor("#90A4AE"))
+            painter.setFont(self.title_font)
+            painter.setPen(self.empty_pen)
             painter.drawText(self.rect(), Qt.AlignCenter, "暂无GPU数据")
             return
         
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        self.ensure_layout()
+        rows = self.visible_rows(event.rect())
+        pixmaps = {}
+        missing = []
+        for gpu_idx in rows:
+            pixmap = self.row_pixmaps.get(gpu_idx)
+            if pixmap is None:
+                missing.append(gpu_idx)
+            else:
+                self.row_pixmaps.move_to_end(gpu_idx)
+                pixmaps[gpu_idx] = pixmap
         
+        # 渲染缓存中没有的行
+        targets = []  # [(painter, (layout,))]
+        for gpu_idx in missing:
+            pixmap = pixmaps[gpu_idx] = self.new_row_pixmap()
+            row_painter = QPainter(pixmap)
+            row_painter.setRenderHint(QPainter.Antialiasing)
+            row_painter.translate(0, -self.row_rect(gpu_idx).top())
+            targets.append((row_painter, (self.row_layout(gpu_idx),)))
+        for phase, paint_phase in (("background", self.paint_backgrounds),
+                                   ("segments", self.paint_segments),
+                                   ("labels", self.paint_labels)):
+            self.run_phase(phase, self.paint_rows, paint_phase, targets)
+        for row_painter, layouts in targets:
+            row_painter.end()
+        for gpu_idx in missing:
+            self.row_pixmaps[gpu_idx] = pixmaps[gpu_idx]
+        # 一次绘制的行数超过上限时（如整体渲染），超出的行只用于本次贴图
+        max_rows = self.max_cached_rows()
+        while len(self.row_pixmaps) > max_rows:
+            self.row_pixmaps.popitem(last=False)
+        
+        self.run_phase("blit", self.blit_rows, rows, pixmaps)
+    
+    def run_phase(self, phase, paint_phase, *args):
+        """执行一个绘制阶段并返回其结果（设置了 paint_profiler 时记录耗时）"""
+        if self.paint_profiler is None:
+            return paint_phase(*args)
+        start = time.perf_counter()
+        result = paint_phase(*args)
+        self.paint_profiler.record(phase, time.perf_counter() - start)
+        return result
+    
+    def rows_per_screen(self):
+        """一屏可见的行数（可见区域为空时按屏幕高度计算）"""
+        height = self.visibleRegion().boundingRect().height()
+        if height <= 0:
+            screen = QGuiApplication.primaryScreen()
+            height = screen.size().height() if screen is not None else self.height()
+        return height // (self.bar_height_px + self.spacing_px) + 2
+    
+    def max_cached_rows(self):
+        """
+        行位图缓存的行数上限：约 cached_screens 屏可见行，
+        且总大小不超过 max_cache_bytes（位图宽度随窗口宽度和设备像素比变化），但至少保留一屏
+        """
+        screen_rows = self.rows_per_screen()
+        ratio = self.devicePixelRatioF()
+        row_bytes = max(1, int(self.width() * ratio) * int((self.bar_height_px + 4) * ratio) * 4)
+        return max(screen_rows, min(self.cached_screens * screen_rows,
+                                    self.max_cache_bytes // row_bytes))
+    
+    def new_row_pixmap(self):
+        """创建一行大小的位图（按设备像素比创建，高分屏下不模糊）"""
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int(self.width() * ratio), int((self.bar_height_px + 4) * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.white)
+        return pixmap
+    
+    @staticmethod
+    def paint_rows(paint_phase, targets):
+        """在各行的位图上执行一个绘制阶段"""
+        for row_painter, layouts in targets:
+            paint_phase(row_painter, layouts)
+    
+    def blit_rows(self, rows, pixmaps):
+        """绘制标题并把各行位图贴到窗口"""
+        painter = QPainter(self)
+        if rows.start == 0:
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setFont(self.title_font)
+            painter.setPen(self.title_pen)
+            painter.drawText(self.title_pos, TITLE_TEXT)
+        for gpu_idx in rows:
+            painter.drawPixmap(0, self.row_rect(gpu_idx).top(), pixmaps[gpu_idx])
+    
+    def visible_rows(self, rect):
+        """与指定区域相交的行号范围（包含柱子边框和文字超出柱子的部分）"""
+        pitch = self.bar_height_px + self.spacing_px
+        first = (rect.top() - self.top_margin - 2) // pitch
+        last = (rect.bottom() - self.top_margin + 2) // pitch + 1
+        return range(max(0, first), min(len(self.dataset.rows), max(0, last)))
+    
+    def row_geometry(self, gpu_idx):
+        """指定GPU柱子的 (y_top, y_center, y_bottom)"""
+        y_top = self.top_margin + gpu_idx * (self.bar_height_px + self.spacing_px)
+        return y_top, y_top + self.bar_height_px / 2, y_top + self.bar_height_px
+    
+    def ensure_layout(self):
+        """计算x轴比例和标题位置（已计算时不重复计算）"""
+        if self.x_scale is not None:
+            return
         width = self.width()
-        height = self.height()
-        
-        # 计算x轴比例
-        max_memory = max(self.total_memories) if self.total_memories else 100
-        x_scale = (width - self.left_margin - self.right_margin) / (max_memory * 1.1)
-        
-        # 计算总高度
-        total_height = (self.top_margin + 
-                       len(self.gpu_names) * (self.bar_height_px + self.spacing_px) - 
-                       self.spacing_px + self.bottom_margin)
-        
-        # 设置最小高度
-        if total_height < height:
-            total_height = height
-        
-        # 绘制标题 - 更优雅的样式
-        title_font = QFont("Segoe UI", 16, QFont.Bold)
-        painter.setFont(title_font)
-        painter.setPen(QColor("#263238"))
-        title_text = "GPU显存使用情况"
-        title_rect = painter.fontMetrics().boundingRect(title_text)
-        painter.drawText(int(width // 2 - title_rect.width() // 2), 25, title_text)
-        
-        # 定义标签字体（用于GPU名称和总显存）
-        label_font = QFont("Segoe UI", 10)
-        
-        # 绘制每个GPU的柱子
-        for gpu_idx in range(len(self.gpu_names)):
-            y_center = (self.top_margin + 
-                       gpu_idx * (self.bar_height_px + self.spacing_px) + 
-                       self.bar_height_px / 2)
-            y_top = y_center - self.bar_height_px / 2
-            y_bottom = y_center + self.bar_height_px / 2
-            
-            # 绘制GPU名称
-            painter.setFont(label_font)
-            painter.setPen(QColor("#2C3E50"))
-            metrics = QFontMetrics(label_font)
-            text_width = metrics.width(self.gpu_names[gpu_idx])
-            painter.drawText(int(self.left_margin - 10 - text_width), int(y_center + 5), 
-                           self.gpu_names[gpu_idx])
-            
-            # 绘制总显存背景柱 - 更优雅的样式
-            total_width_px = self.total_memories[gpu_idx] * x_scale
-            # 使用渐变背景
-            bg_gradient = QLinearGradient(self.left_margin, int(y_top), 
-                                        self.left_margin, int(y_bottom))
-            bg_gradient.setColorAt(0, QColor("#F8F9FA"))
-            bg_gradient.setColorAt(1, QColor("#F0F2F5"))
-            painter.setBrush(QBrush(bg_gradient))
-            painter.setPen(QPen(QColor("#DEE2E6"), 1.5))
-            painter.drawRoundedRect(self.left_margin, int(y_top), 
-                                  int(total_width_px), self.bar_height_px, 4, 4)
-            
-            # 绘制任务分段
-            current_x = self.left_margin
-            for task_name, value in self.task_breakdown[gpu_idx].items():
-                if value > 0:
-                    segment_width_px = value * x_scale
-                    start_x_px = current_x
-                    end_x_px = current_x + segment_width_px
-                    
-                    # 绘制任务段 - 使用圆角和渐变
-                    color = self.task_color_map.get(task_name, QColor("#cccccc"))
-                    # 创建渐变效果
-                    segment_gradient = QLinearGradient(int(start_x_px), int(y_top), 
-                                                     int(start_x_px), int(y_bottom))
-                    segment_gradient.setColorAt(0, color.lighter(110))
-                    segment_gradient.setColorAt(1, color.darker(110))
-                    painter.setBrush(QBrush(segment_gradient))
-                    painter.setPen(QPen(QColor("#FFFFFF"), 2))
-                    painter.drawRoundedRect(int(start_x_px), int(y_top), 
-                                          int(segment_width_px), self.bar_height_px, 4, 4)
-                    
-                    # 显示任务名称和显存 - 黑色文字，简洁清晰
-                    if segment_width_px > 60:
-                        mid_x_px = (start_x_px + end_x_px) / 2
-                        display_text = f'{task_name}：{value:.1f}GB'
-                        painter.setFont(QFont("Segoe UI", 9, QFont.Bold))
-                        metrics = QFontMetrics(painter.font())
-                        text_width = metrics.width(display_text)
-                        text_x = int(mid_x_px - text_width / 2)
-                        
-                        # 绘制文字 - 黑色，简洁清晰
-                        painter.setPen(QColor("#000000"))
-                        painter.drawText(text_x, int(y_center + 3), display_text)
-                    
-                    current_x = end_x_px
-            
-            # 显示总显存
-            total_x_px = self.left_margin + total_width_px
-            painter.setFont(label_font)
-            painter.setPen(QColor("#5A6C7D"))
-            total_text = f'{self.total_memories[gpu_idx]:.1f}GB'
-            painter.drawText(int(total_x_px + 10), int(y_center + 5), total_text)
+        self.x_scale = ((width - self.left_margin - self.right_margin)
+                        / (self.dataset.max_memory * 1.1) * self.zoom_x)
+        # 放大后柱子可能伸到GPU名称下面，裁剪到绘图区域
+        self.plot_clip = (None if self.zoom_x == 1 else
+                          QRect(self.left_margin - 2, 0, width, self.height()))
+        title_width = QFontMetrics(self.title_font).boundingRect(TITLE_TEXT).width()
+        self.title_pos = QPoint(int(width // 2 - title_width // 2), 25)
+    
+    def row_layout(self, gpu_idx):
+        """指定行的绘制图元（按需计算并缓存）"""
+        layout = self.row_layouts.get(gpu_idx)
+        if layout is None:
+            layout = self.row_layouts[gpu_idx] = self.build_row_layout(gpu_idx)
+        return layout
+    
+    def lod_segments(self, row):
+        """
+        按当前缩放级别划分分段：宽度不足 min_segment_px 的相邻分段合并为一段
+        
+        Returns:
+            [(task_ids, value)]，task_ids 有多个时为合并的"其他任务"分段
+        """
+        result = []
+        merged_ids = []
+        merged_value = 0
+        for task_id, value in row.segments:
+            if value * self.x_scale < self.min_segment_px:
+                merged_ids.append(task_id)
+                merged_value += value
+                continue
+            if merged_ids:
+                result.append((tuple(merged_ids), merged_value))
+                merged_ids = []
+                merged_value = 0
+            result.append(((task_id,), value))
+        if merged_ids:
+            result.append((tuple(merged_ids), merged_value))
+        return result
+    
+    def build_row_layout(self, gpu_idx):
+        """计算一行的背景柱、任务分段和文字位置（只保留横向可见范围内的部分）"""
+        row = self.dataset.rows[gpu_idx]
+        x_scale = self.x_scale
+        y_top, y_center, y_bottom = self.row_geometry(gpu_idx)
+        x_origin = self.left_margin - self.pan_x
+        # 可见范围左侧多留出圆角的宽度，被截断的一端的圆角在裁剪区域外
+        visible_left = self.left_margin - 8
+        visible_right = self.width() + 8
+        show_labels = self.bar_height_px >= self.min_label_bar_px
+        
+        segments = []
+        segment_labels = []
+        current_x = x_origin
+        for task_ids, value in self.lod_segments(row):
+            end_x = current_x + value * x_scale
+            left = max(current_x, visible_left)
+            right = min(end_x, visible_right)
+            current_x = end_x
+            if right <= left:
+                continue
+            if len(task_ids) == 1:
+                brush = self.segment_brush(task_ids[0])
+                task_name = self.dataset.tasks[task_ids[0]].name
+            else:
+                brush = self.other_tasks_brush
+                task_name = f"其他{len(task_ids)}个任务"
+            segments.append((QRect(int(left), int(y_top), int(right - left), self.bar_height_px),
+                             brush))
+            # 分段足够宽时显示任务名称和显存，放不下时省略末尾
+            if show_labels and right - left > 60:
+                display_text = self.segment_metrics.elidedText(
+                    f'{task_name}：{value:.1f}GB', Qt.ElideRight, int(right - left) - 8)
+                text_width = self.segment_metrics.width(display_text)
+                mid_x_px = left + (right - left) / 2
+                segment_labels.append((QPoint(int(mid_x_px - text_width / 2), int(y_center + 3)),
+                                       display_text))
+        
+        bar_left = max(x_origin, visible_left)
+        bar_right = min(x_origin + row.total_memory * x_scale, visible_right)
+        bar_rect = None
+        if bar_right > bar_left:
+            bar_rect = QRect(int(bar_left), int(y_top), int(bar_right - bar_left),
+                             self.bar_height_px)
+        
+        # GPU名称右对齐到柱子左侧，过长时省略末尾；行高太小时不显示文字
+        name = ""
+        total_text = ""
+        if self.bar_height_px + self.spacing_px >= self.min_label_row_px:
+            name = self.label_metrics.elidedText(row.name, Qt.ElideRight, self.left_margin - 14)
+            total_text = f'{row.total_memory:.1f}GB'
+        name_pos = QPoint(int(self.left_margin - 10 - self.label_metrics.width(name)),
+                          int(y_center + 5))
+        total_x_px = x_origin + row.total_memory * x_scale
+        return RowLayout(
+            bar_rect=bar_rect,
+            segments=tuple(segments),
+            segment_labels=tuple(segment_labels),
+            name_pos=name_pos,
+            name=name,
+            total_pos=QPoint(int(total_x_px + 10), int(y_center + 5)),
+            total_text=total_text,
+        )
+    
+    def clip_to_plot(self, painter):
+        """放大后把绘制裁剪到绘图区域"""
+        if self.plot_clip is not None:
+            painter.setClipRect(self.plot_clip)
+    
+    def paint_backgrounds(self, painter, layouts):
+        """绘制每个GPU的总显存背景柱"""
+        self.clip_to_plot(painter)
+        painter.setBrush(self.background_brush)
+        painter.setPen(self.background_pen)
+        for layout in layouts:
+            if layout.bar_rect is not None:
+                painter.drawRoundedRect(layout.bar_rect, 4, 4)
+    
+    def paint_segments(self, painter, layouts):
+        """绘制任务分段 - 使用圆角和渐变"""
+        self.clip_to_plot(painter)
+        painter.setPen(self.segment_pen)
+        for layout in layouts:
+            for rect, brush in layout.segments:
+                painter.setBrush(brush)
+                painter.drawRoundedRect(rect, 4, 4)
+    
+    def paint_labels(self, painter, layouts):
+        """绘制GPU名称、任务分段文字和总显存"""
+        # GPU名称（在绘图区域左侧，不裁剪）和总显存
+        painter.setClipping(False)
+        painter.setFont(self.label_font)
+        painter.setPen(self.name_pen)
+        for layout in layouts:
+            painter.drawText(layout.name_pos, layout.name)
+        self.clip_to_plot(painter)
+        painter.setPen(self.total_pen)
+        for layout in layouts:
+            painter.drawText(layout.total_pos, layout.total_text)
+        
+        # 任务名称和显存 - 黑色文字，简洁清晰
+        painter.setFont(self.segment_font)
+        painter.setPen(self.segment_label_pen)
+        for layout in layouts:
+            for pos, text in layout.segment_labels:
+                painter.drawText(pos, text)
+
+
+# 性能埋点：开启后记录每次绘制的耗时
+instrumentation.register(ChartWidget, ["paintEvent"])
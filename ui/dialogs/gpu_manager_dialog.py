@@ -5,6 +5,7 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
                              QTreeWidget, QTreeWidgetItem, QMessageBox, QWidget)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
+import instrumentation
 from ui.dialogs.gpu_dialog import GPUDialog
 
 
@@ -216,9 +217,6 @@ class GPUManagerDialog(QDialog):
             if new_name:
                 self.data_manager.update_gpu(gpu_id, new_name, gpu["total_memory"])
                 self.has_unsaved_changes = True
-                # 通知主窗口刷新图表
-                if self.parent():
-                    self.parent().refresh_chart()
             else:
                 # 如果名称为空，恢复原值
                 item.setText(1, gpu["name"])
@@ -228,9 +226,6 @@ class GPUManagerDialog(QDialog):
                 if new_memory > 0:
                     self.data_manager.update_gpu(gpu_id, gpu["name"], new_memory)
                     self.has_unsaved_changes = True
-                    # 通知主窗口刷新图表
-                    if self.parent():
-                        self.parent().refresh_chart()
                 else:
                     # 如果显存为0或负数，恢复原值
                     item.setText(2, f"{gpu['total_memory']:.2f}")
@@ -245,9 +240,6 @@ class GPUManagerDialog(QDialog):
             name, memory = dialog.get_result()
             self.data_manager.add_gpu(name, memory)
             self.refresh_list()
-            # 通知主窗口刷新图表
-            if self.parent():
-                self.parent().refresh_chart()
             self.has_unsaved_changes = True
     
     def closeEvent(self, event):
@@ -288,9 +280,6 @@ class GPUManagerDialog(QDialog):
                 name, memory = dialog.get_result()
                 self.data_manager.update_gpu(gpu_id, name, memory)
                 self.refresh_list()
-                # 通知主窗口刷新图表（因为图表中显示的是GPU名称）
-                if self.parent():
-                    self.parent().refresh_chart()
     
     def delete_gpu(self):
         """删除GPU"""
@@ -317,9 +306,6 @@ class GPUManagerDialog(QDialog):
             if msg.clickedButton() == yes_btn:
                 self.data_manager.delete_gpu(gpu_id)
                 self.refresh_list()
-                # 通知主窗口刷新图表
-                if self.parent():
-                    self.parent().refresh_chart()
                 self.has_unsaved_changes = True
     
     def closeEvent(self, event):
@@ -339,4 +325,8 @@ class GPUManagerDialog(QDialog):
                 event.ignore()  # 取消关闭
                 return
             # save_btn 和 discard_btn 的情况，数据已经在编辑时保存了，直接关闭
-        event.accept()
\ No newline at end of file
+        event.accept()
+
+
+# 性能埋点：开启后记录列表刷新耗时
+instrumentation.register(GPUManagerDialog, ["refresh_list"])
\ No newline at end of file
@@ -6,6 +6,7 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
                              QWidget, QHeaderView)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
+import instrumentation
 
 
 class SchemeManagerDialog(QDialog):
@@ -204,7 +205,7 @@ class SchemeManagerDialog(QDialog):
         self.tree.clear()
         schemes = self.data_manager.get_all_schemes()
         for scheme in schemes:
-            task_count = len(scheme.get("tasks", []))
+            task_count = self.data_manager.get_scheme_task_count(scheme["id"])
             item = QTreeWidgetItem([str(scheme["id"]), scheme["name"], str(task_count)])
             item.setData(0, Qt.UserRole, scheme["id"])
             # 只有GPU组名称列（第1列）可编辑
@@ -250,16 +251,13 @@ class SchemeManagerDialog(QDialog):
         if not self.pending_changes:
             return
         
-        for scheme_id, new_name in self.pending_changes.items():
-            self.data_manager.update_scheme(scheme_id, new_name)
+        with self.data_manager.transaction():
+            for scheme_id, new_name in self.pending_changes.items():
+                self.data_manager.update_scheme(scheme_id, new_name)
         
         self.pending_changes.clear()
         self.has_unsaved_changes = False
         self.save_btn.setEnabled(False)
-        
-        if self.parent():
-            self.parent().refresh_scheme_combo()
-            self.parent().refresh_chart()
     
     def closeEvent(self, event):
         """关闭事件 - 如果有未保存的更改，确认是否保存"""
@@ -314,10 +312,6 @@ class SchemeManagerDialog(QDialog):
             if name:
                 self.data_manager.add_scheme(name)
                 self.refresh_list()
-                # 通知主窗口刷新下拉列表
-                if self.parent():
-                    self.parent().refresh_scheme_combo()
-                    self.parent().refresh_chart()
     
     def edit_scheme(self):
         """编辑GPU组"""
@@ -345,10 +339,6 @@ class SchemeManagerDialog(QDialog):
                 if name:
                     self.data_manager.update_scheme(scheme_id, name)
                     self.refresh_list()
-                    # 通知主窗口刷新下拉列表
-                    if self.parent():
-                        self.parent().refresh_scheme_combo()
-                        self.parent().refresh_chart()
     
     def delete_scheme(self):
         """删除GPU组"""
@@ -375,7 +365,7 @@ class SchemeManagerDialog(QDialog):
             if msg.clickedButton() == yes_btn:
                 self.data_manager.delete_scheme(scheme_id)
                 self.refresh_list()
-                # 通知主窗口刷新下拉列表
-                if self.parent():
-                    self.parent().refresh_scheme_combo()
-                    self.parent().refresh_chart()
\ No newline at end of file
+
+
+# 性能埋点：开启后记录列表刷新耗时
+instrumentation.register(SchemeManagerDialog, ["refresh_list"])
\ No newline at end of file
@@ -6,15 +6,17 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
                              QWidget, QComboBox, QLineEdit, QLabel, QListWidget, QListWidgetItem, QCheckBox)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
+import instrumentation
 from ui.dialogs.task_dialog import TaskDialog
 
 
 class TaskManagerDialog(QDialog):
     """任务管理对话框"""
     
-    def __init__(self, parent, data_manager):
+    def __init__(self, parent, data_manager, settings=None):
         super().__init__(parent)
         self.data_manager = data_manager
+        self.settings = settings  # 界面设置，用于记住最后选择的任务
         self.current_task_id = None
         self.has_unsaved_changes = False  # 标记是否有未保存的更改
         self.pending_changes = {}  # 存储待保存的更改 {task_id: new_name}
@@ -23,6 +25,7 @@ class TaskManagerDialog(QDialog):
         self.setGeometry(200, 200, 1200, 800)
         self.init_ui()
         self.refresh_list()
+        self.select_last_task()
     
     def init_ui(self):
         """初始化界面"""
@@ -358,11 +361,24 @@ class TaskManagerDialog(QDialog):
             self.tree.addTopLevelItem(item)
         self.tree.itemChanged.connect(self.on_task_item_changed)
     
+    def select_last_task(self):
+        """选中上次打开时最后选择的任务"""
+        if not self.settings:
+            return
+        task_id = self.settings.get("last_task_id")
+        for i in range(self.tree.topLevelItemCount()):
+            item = self.tree.topLevelItem(i)
+            if item.data(0, Qt.UserRole) == task_id:
+                self.tree.setCurrentItem(item)
+                break
+    
     def on_task_selected(self):
         """任务选择变化时更新分配列表"""
         item = self.tree.currentItem()
         if item:
             self.current_task_id = int(item.text(0))
+            if self.settings:
+                self.settings.set("last_task_id", self.current_task_id)
             self.refresh_allocation_list()
         else:
             self.current_task_id = None
@@ -425,18 +441,15 @@ class TaskManagerDialog(QDialog):
         if not self.pending_changes:
             return
         
-        for task_id, new_name in self.pending_changes.items():
-            task = self.data_manager.get_task(task_id)
-            if task:
-                self.data_manager.update_task(task_id, new_name, task.get("description", ""))
+        with self.data_manager.transaction():
+            for task_id, new_name in self.pending_changes.items():
+                task = self.data_manager.get_task(task_id)
+                if task:
+                    self.data_manager.update_task(task_id, new_name, task.get("description", ""))
         
         self.pending_changes.clear()
         self.has_unsaved_changes = False
         self.save_btn.setEnabled(False)
-        
-        # 通知主窗口刷新图表
-        if self.parent():
-            self.parent().refresh_chart()
     
     def closeEvent(self, event):
         """关闭事件 - 如果有未保存的更改，确认是否保存"""
@@ -492,9 +505,6 @@ class TaskManagerDialog(QDialog):
             name = dialog.get_result()
             task_id = self.data_manager.add_task(name, "")
             self.refresh_list()
-            # 通知主窗口刷新图表
-            if self.parent():
-                self.parent().refresh_chart()
     
     def edit_task(self):
         """编辑任务名称"""
@@ -515,9 +525,6 @@ class TaskManagerDialog(QDialog):
                 name = dialog.get_result()
                 self.data_manager.update_task(task_id, name, task.get("description", ""))
                 self.refresh_list()
-                # 通知主窗口刷新图表
-                if self.parent():
-                    self.parent().refresh_chart()
     
     def show_allocation_dialog(self, task_id, pre_select_gpu_id=None, pre_fill_memory=None):
         """显示显存分配对话框 - 支持多选GPU"""
@@ -567,10 +574,8 @@ class TaskManagerDialog(QDialog):
         
         for gpu in gpus:
             # 计算该GPU的剩余显存
-            usage = self.data_manager.get_gpu_usage(gpu["id"])
-            if usage:
-                remaining_memory = usage["free_memory"]
-            else:
+            remaining_memory = self.data_manager.get_free_memory(gpu["id"])
+            if remaining_memory is None:
                 remaining_memory = gpu["total_memory"]
             
             # 检查该GPU是否已分配给此任务
@@ -617,11 +622,7 @@ class TaskManagerDialog(QDialog):
         # 计算最长的显示文本宽度
         max_width = 0
         for gpu in gpus:
-            usage = self.data_manager.get_gpu_usage(gpu["id"])
-            if usage:
-                remaining_memory = usage["free_memory"]
-            else:
-                remaining_memory = gpu["total_memory"]
+            remaining_memory = gpu_info[gpu["id"]]["remaining_memory"]
             is_allocated = gpu["id"] in existing_allocations
             current_memory = existing_allocations.get(gpu["id"], 0)
             if is_allocated:
@@ -839,17 +840,17 @@ class TaskManagerDialog(QDialog):
             
             # 验证所有选中的GPU是否满足显存要求
             invalid_gpus = []  # 存储不满足要求的GPU信息
+            # 实际可用的剩余显存 = 当前剩余显存 + 当前任务已分配的显存（一次向量化计算所有GPU）
+            columns = self.data_manager.get_allocation_columns()
+            available = columns.available_memory(task_id)
             
             for gpu_id in selected_gpu_ids:
                 info = gpu_info[gpu_id]
                 
                 # 计算该GPU的可用显存
-                usage = self.data_manager.get_gpu_usage(gpu_id)
-                if usage:
-                    # 如果该GPU已经分配给当前任务，需要减去当前任务已分配的显存
-                    current_task_memory = existing_allocations.get(gpu_id, 0)
-                    # 实际可用的剩余显存 = 当前剩余显存 + 当前任务已分配的显存
-                    available_memory = usage["free_memory"] + current_task_memory
+                gpu_idx = columns.gpu_pos.get(gpu_id)
+                if gpu_idx is not None:
+                    available_memory = float(available[gpu_idx])
                 else:
                     # 如果获取不到使用情况，使用GPU的总显存
                     available_memory = info["total_memory"]
@@ -877,20 +878,19 @@ class TaskManagerDialog(QDialog):
                 msg.exec_()
                 return  # 不保存，直接返回
             
-            # 所有验证通过，保存分配
-            for gpu_id in selected_gpu_ids:
-                if memory == 0:
-                    # 如果显存为0，删除分配
-                    if gpu_id in existing_allocations:
-                        self.data_manager.delete_allocation(task_id, gpu_id)
-                else:
-                    # 添加或更新分配
-                    self.data_manager.add_allocation(task_id, gpu_id, memory)
+            # 所有验证通过，保存分配（合并为一次写盘）
+            with self.data_manager.transaction():
+                for gpu_id in selected_gpu_ids:
+                    if memory == 0:
+                        # 如果显存为0，删除分配
+                        if gpu_id in existing_allocations:
+                            self.data_manager.delete_allocation(task_id, gpu_id)
+                    else:
+                        # 添加或更新分配
+                        self.data_manager.add_allocation(task_id, gpu_id, memory)
             
-            # 刷新分配列表和图表
+            # 刷新分配列表（图表由数据变更事件刷新）
             self.refresh_allocation_list()
-            if self.parent():
-                self.parent().refresh_chart()
             
             dialog.accept()
         
@@ -992,6 +992,7 @@ class TaskManagerDialog(QDialog):
                 # 清空分配列表
                 self.current_task_id = None
                 self.alloc_tree.clear()
-                # 通知主窗口刷新图表
-                if self.parent():
-                    self.parent().refresh_chart()
\ No newline at end of file
+
+
+# 性能埋点：开启后记录列表刷新耗时
+instrumentation.register(TaskManagerDialog, ["refresh_list"])
\ No newline at end of file
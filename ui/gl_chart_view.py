@@ -0,0 +1,614 @@
+"""
+OpenGL图表渲染 - 覆盖在 ChartWidget 可见部分上的 QOpenGLWidget
+把可见行的背景柱和任务分段批量写入顶点缓冲，一次绘制调用画完（圆角、边框和渐变在片段着色器中计算）；
+文字按字形从缓存的字形图集取纹理绘制。布局、缩放和交互仍由 ChartWidget 负责，这里只负责绘制。
+默认关闭，设置环境变量 GPU_MANAGER_OPENGL=1 启用；OpenGL不可用或只有软件实现（如 Mesa llvmpipe）时
+继续使用 QPainter 绘制。
+"""
+import math
+import os
+from typing import NamedTuple
+import numpy as np
+from PyQt5.QtWidgets import QOpenGLWidget
+from PyQt5.QtCore import Qt, QPointF
+from PyQt5.QtGui import (QImage, QPainter, QFontMetricsF, QMatrix4x4, QVector2D, QOpenGLContext,
+                         QOffscreenSurface, QOpenGLVersionProfile, QOpenGLShader,
+                         QOpenGLShaderProgram, QOpenGLBuffer, QOpenGLTexture)
+import instrumentation
+from ui.chart_widget import TITLE_TEXT
+
+
+ENV_VAR = "GPU_MANAGER_OPENGL"
+SOFTWARE_RENDERERS = ("llvmpipe", "softpipe", "swrast", "swiftshader", "software rasterizer")
+
+# OpenGL常量（PyQt5 的 QOpenGLFunctions 不导出常量）
+GL_TRIANGLES = 0x0004
+GL_ONE = 1
+GL_ONE_MINUS_SRC_ALPHA = 0x0303
+GL_BLEND = 0x0BE2
+GL_SCISSOR_TEST = 0x0C11
+GL_RENDERER = 0x1F01
+GL_FLOAT = 0x1406
+GL_COLOR_BUFFER_BIT = 0x4000
+
+# 圆角矩形：顶点为矩形角点，片段着色器按到圆角矩形边缘的距离计算覆盖率、边框和填充
+RECT_VERTEX_SHADER = """
+attribute vec2 position;
+attribute vec2 local;
+attribute vec2 size;
+attribute vec4 fill;
+attribute vec4 border;
+attribute float border_width;
+uniform mat4 projection;
+varying vec2 v_local;
+varying vec2 v_size;
+varying vec4 v_fill;
+varying vec4 v_border;
+varying float v_border_width;
+void main() {
+    v_local = local;
+    v_size = size;
+    v_fill = fill;
+    v_border = border;
+    v_border_width = border_width;
+    gl_Position = projection * vec4(position, 0.0, 1.0);
+}
+"""
+RECT_FRAGMENT_SHADER = """
+#ifdef GL_ES
+precision mediump float;
+#endif
+uniform float corner_radius;
+varying vec2 v_local;
+varying vec2 v_size;
+varying vec4 v_fill;
+varying vec4 v_border;
+varying float v_border_width;
+void main() {
+    // 与QPainter一致：圆角半径和边框都以矩形边缘为中心，外边缘的圆角半径多出半个边框宽度
+    float radius = corner_radius + v_border_width * 0.5;
+    vec2 half_size = v_size * 0.5;
+    vec2 q = abs(v_local - half_size) - half_size + vec2(radius);
+    float distance = length(max(q, 0.0)) + min(max(q.x, q.y), 0.0) - radius;
+    float coverage = clamp(0.5 - distance, 0.0, 1.0);
+    float inside = clamp(0.5 - distance - v_border_width, 0.0, 1.0);
+    vec4 color = mix(v_border, v_fill, inside);
+    gl_FragColor = vec4(color.rgb * color.a, color.a) * coverage;
+}
+"""
+# 文字：从字形图集取覆盖率（图集坐标为像素，图集变大后已生成的顶点仍然有效）
+TEXT_VERTEX_SHADER = """
+attribute vec2 position;
+attribute vec2 texcoord;
+attribute vec4 color;
+uniform mat4 projection;
+uniform vec2 atlas_size;
+varying vec2 v_texcoord;
+varying vec4 v_color;
+void main() {
+    v_texcoord = texcoord / atlas_size;
+    v_color = color;
+    gl_Position = projection * vec4(position, 0.0, 1.0);
+}
+"""
+TEXT_FRAGMENT_SHADER = """
+#ifdef GL_ES
+precision mediump float;
+#endif
+uniform sampler2D atlas;
+varying vec2 v_texcoord;
+varying vec4 v_color;
+void main() {
+    gl_FragColor = vec4(v_color.rgb * v_color.a, v_color.a) * texture2D(atlas, v_texcoord).a;
+}
+"""
+RECT_ATTRIBUTES = (("position", 2), ("local", 2), ("size", 2), ("fill", 4), ("border", 4),
+                   ("border_width", 1))
+TEXT_ATTRIBUTES = (("position", 2), ("texcoord", 2), ("color", 4))
+
+_available = None
+
+
+def opengl_requested() -> bool:
+    """是否通过环境变量要求使用OpenGL渲染"""
+    return os.environ.get(ENV_VAR, "") not in ("", "0")
+
+
+def _version_functions(context):
+    """OpenGL 2.0 函数表（不支持时为None）"""
+    profile = QOpenGLVersionProfile()
+    profile.setVersion(2, 0)
+    try:
+        functions = context.versionFunctions(profile)
+    except Exception:
+        return None
+    if functions is None or not functions.initializeOpenGLFunctions():
+        return None
+    return functions
+
+
+def opengl_available() -> bool:
+    """
+    是否有可用的硬件OpenGL（第一次调用时创建临时上下文检测，结果缓存）
+    
+    Returns:
+        能创建 OpenGL 2.0 上下文且不是软件实现时为True
+    """
+    global _available
+    if _available is not None:
+        return _available
+    _available = False
+    context = QOpenGLContext()
+    surface = QOffscreenSurface()
+    surface.create()
+    if not context.create() or not context.makeCurrent(surface):
+        return False
+    try:
+        functions = _version_functions(context)
+        if functions is None:
+            return False
+        renderer = (functions.glGetString(GL_RENDERER) or "").lower()
+        _available = not any(name in renderer for name in SOFTWARE_RENDERERS)
+    finally:
+        context.doneCurrent()
+        surface.destroy()
+    return _available
+
+
+def enable_opengl(chart) -> bool:
+    """
+    给图表启用OpenGL绘制
+    
+    Args:
+        chart: ChartWidget（应已放入滚动区域）
+    
+    Returns:
+        是否已启用；OpenGL不可用时图表继续使用QPainter绘制
+    """
+    if chart.gl_view is None and opengl_available():
+        chart.set_gl_view(GLChartView(chart))
+    return chart.gl_view is not None
+
+
+def rgba(color):
+    """QColor 转为 (r, g, b, a) 浮点数"""
+    return color.getRgbF()
+
+
+def add_rect(vertices, rect, fill_top, fill_bottom, border, border_width):
+    """
+    添加一个圆角矩形的顶点（两个三角形）
+    
+    Args:
+        vertices: 顶点数据列表（浮点数，按 RECT_ATTRIBUTES 排列）
+        rect: 矩形（与 QPainter.drawRoundedRect 的参数相同）
+        fill_top: 顶部填充颜色 (r, g, b, a)，到底部线性渐变
+        fill_bottom: 底部填充颜色
+        border: 边框颜色
+        border_width: 边框宽度（以矩形边缘为中心）
+    """
+    half = border_width / 2
+    left = rect.x() - half
+    top = rect.y() - half
+    width = rect.width() + border_width
+    height = rect.height() + border_width
+    right = left + width
+    bottom = top + height
+    for x, y, local_x, local_y, fill in ((left, top, 0, 0, fill_top),
+                                         (right, top, width, 0, fill_top),
+                                         (left, bottom, 0, height, fill_bottom),
+                                         (right, top, width, 0, fill_top),
+                                         (right, bottom, width, height, fill_bottom),
+                                         (left, bottom, 0, height, fill_bottom)):
+        vertices.extend((x, y, local_x, local_y, width, height, *fill, *border, border_width))
+
+
+class Glyph(NamedTuple):
+    """字形在图集中的位置和绘制参数"""
+    
+    atlas_x: int  # 在图集中的位置（设备像素）
+    atlas_y: int
+    width: int  # 大小（设备像素），空白字符为0
+    height: int
+    left: float  # 相对于基线起点的偏移（逻辑像素）
+    top: float
+    advance: float  # 绘制后横向前进的距离（逻辑像素）
+
+
+class GlyphAtlas:
+    """字形图集：每个 (字体, 字符) 只渲染一次到共享图像，文字绘制为逐字形的纹理矩形"""
+    
+    PADDING = 1  # 字形四周留白，避免线性采样取到相邻字形
+    
+    def __init__(self, ratio=1.0, width=1024, max_height=4096):
+        """
+        Args:
+            ratio: 设备像素比（按设备像素渲染字形，高分屏下不模糊）
+            width: 图集宽度（像素）
+            max_height: 图集最大高度
+        """
+        self.ratio = ratio
+        self.max_height = max_height
+        self.image = QImage(width, 256, QImage.Format_ARGB32_Premultiplied)
+        self.image.fill(Qt.transparent)
+        self.glyphs = {}  # {(字体key, 字符): Glyph}
+        self.metrics = {}  # {字体key: QFontMetricsF}
+        self.cursor_x = 0
+        self.cursor_y = 0
+        self.shelf_height = 0  # 当前一行字形的最大高度
+        self.dirty = True  # 图像有变化，需要重新上传纹理
+    
+    def is_full(self):
+        """图集是否超过最大高度（超过后在下一帧开始时重建，已生成的文字顶点随之失效）"""
+        return self.image.height() > self.max_height
+    
+    def allocate(self, width, height):
+        """在图集中分配一块区域（按行排列，放不下时图集高度加倍），返回左上角位置"""
+        if self.cursor_x + width > self.image.width():
+            self.cursor_x = 0
+            self.cursor_y += self.shelf_height
+            self.shelf_height = 0
+        if self.cursor_y + height > self.image.height():
+            new_height = self.image.height()
+            while self.cursor_y + height > new_height:
+                new_height *= 2
+            # 超出原图像的部分填充为0（透明）
+            self.image = self.image.copy(0, 0, self.image.width(), new_height)
+        position = (self.cursor_x, self.cursor_y)
+        self.cursor_x += width
+        self.shelf_height = max(self.shelf_height, height)
+        return position
+    
+    def glyph(self, font, char):
+        """字符的字形（第一次使用时渲染到图集）"""
+        key = (font.key(), char)
+        glyph = self.glyphs.get(key)
+        if glyph is not None:
+            return glyph
+        metrics = self.metrics.get(key[0])
+        if metrics is None:
+            metrics = self.metrics[key[0]] = QFontMetricsF(font)
+        advance = metrics.horizontalAdvance(char)
+        if char.isspace():
+            glyph = self.glyphs[key] = Glyph(0, 0, 0, 0, 0.0, 0.0, advance)
+            return glyph
+        
+        bounds = metrics.boundingRect(char)
+        left = math.floor(min(0.0, bounds.left())) - self.PADDING
+        top = -math.ceil(metrics.ascent()) - self.PADDING
+        width = math.ceil((math.ceil(max(advance, bounds.right())) + self.PADDING - left)
+                          * self.ratio)
+        height = math.ceil((math.ceil(metrics.descent()) + self.PADDING - top) * self.ratio)
+        atlas_x, atlas_y = self.allocate(width, height)
+        painter = QPainter(self.image)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.translate(atlas_x, atlas_y)
+        painter.scale(self.ratio, self.ratio)
+        painter.setFont(font)
+        painter.setPen(Qt.white)
+        painter.drawText(QPointF(-left, -top), char)
+        painter.end()
+        self.dirty = True
+        glyph = self.glyphs[key] = Glyph(atlas_x, atlas_y, width, height, left, top, advance)
+        return glyph
+    
+    def add_text(self, vertices, font, pos, text, color):
+        """
+        添加一段文字的顶点（每个字形两个三角形，不做字偶距调整）
+        
+        Args:
+            vertices: 顶点数据列表（浮点数，按 TEXT_ATTRIBUTES 排列）
+            font: 字体
+            pos: 基线起点（与 QPainter.drawText(QPoint, str) 相同）
+            text: 文字
+            color: 颜色 (r, g, b, a)
+        """
+        ratio = self.ratio
+        x = pos.x()
+        baseline = pos.y()
+        for char in text:
+            glyph = self.glyph(font, char)
+            if glyph.width:
+                # 对齐到设备像素，避免线性采样使字形变模糊
+                left = round((x + glyph.left) * ratio) / ratio
+                top = round((baseline + glyph.top) * ratio) / ratio
+                right = left + glyph.width / ratio
+                bottom = top + glyph.height / ratio
+                u0, v0 = glyph.atlas_x, glyph.atlas_y
+                u1, v1 = u0 + glyph.width, v0 + glyph.height
+                for vertex in ((left, top, u0, v0), (right, top, u1, v0),
+                               (left, bottom, u0, v1), (right, top, u1, v0),
+                               (right, bottom, u1, v1), (left, bottom, u0, v1)):
+                    vertices.extend(vertex)
+                    vertices.extend(color)
+            x += glyph.advance
+
+
+class RowVertices(NamedTuple):
+    """一行的顶点数据（行布局不变时复用）"""
+    
+    layout: object  # 生成顶点时的 RowLayout
+    backgrounds: np.ndarray  # 总显存背景柱
+    segments: np.ndarray  # 任务分段
+    names: np.ndarray  # GPU名称（不裁剪）
+    labels: np.ndarray  # 总显存和分段文字
+
+
+class FrameVertices(NamedTuple):
+    """一帧的顶点数据"""
+    
+    rects: np.ndarray  # 背景柱在前，任务分段在后
+    names: np.ndarray  # 标题和GPU名称（不裁剪）
+    labels: np.ndarray  # 总显存和分段文字（放大后裁剪到绘图区域）
+
+
+EMPTY_VERTICES = np.zeros(0, dtype=np.float32)
+
+
+class GLChartView(QOpenGLWidget):
+    """
+    ChartWidget 的OpenGL绘制视图
+    
+    作为图表的子组件覆盖其在滚动区域中的可见部分（位置由 ChartWidget.sync_gl_view 维护），
+    坐标与图表相同；鼠标事件穿透给图表
+    """
+    
+    def __init__(self, chart):
+        super().__init__(chart)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.chart = chart
+        self.gl = None
+        self.rect_program = None
+        self.text_program = None
+        self.rect_buffer = None
+        self.text_buffer = None
+        self.atlas_texture = None
+        self.atlas = GlyphAtlas()
+        self.row_cache = {}  # {行号: RowVertices}
+        self.brush_colors = {}  # {id(画刷): (画刷, 顶部颜色, 底部颜色)}
+    
+    # ========== OpenGL资源 ==========
+    
+    def initializeGL(self):
+        """编译着色器并创建顶点缓冲；失败时让图表改回QPainter绘制"""
+        self.gl = _version_functions(self.context())
+        self.rect_program = self.build_program(RECT_VERTEX_SHADER, RECT_FRAGMENT_SHADER)
+        self.text_program = self.build_program(TEXT_VERTEX_SHADER, TEXT_FRAGMENT_SHADER)
+        if self.gl is None or self.rect_program is None or self.text_program is None:
+            print("OpenGL初始化失败，图表改用QPainter绘制")
+            self.chart.set_gl_view(None)
+            return
+        self.rect_buffer = self.create_buffer()
+        self.text_buffer = self.create_buffer()
+        self.context().aboutToBeDestroyed.connect(self.cleanup)
+    
+    @staticmethod
+    def build_program(vertex_source, fragment_source):
+        """编译并链接着色器程序（失败时输出日志并返回None）"""
+        program = QOpenGLShaderProgram()
+        if (not program.addShaderFromSourceCode(QOpenGLShader.Vertex, vertex_source)
+                or not program.addShaderFromSourceCode(QOpenGLShader.Fragment, fragment_source)
+                or not program.link()):
+            print(f"着色器编译失败: {program.log()}")
+            return None
+        return program
+    
+    @staticmethod
+    def create_buffer():
+        buffer = QOpenGLBuffer(QOpenGLBuffer.VertexBuffer)
+        buffer.create()
+        buffer.setUsagePattern(QOpenGLBuffer.DynamicDraw)
+        return buffer
+    
+    def cleanup(self):
+        """上下文销毁前释放OpenGL资源"""
+        self.makeCurrent()
+        for buffer in (self.rect_buffer, self.text_buffer):
+            if buffer is not None:
+                buffer.destroy()
+        if self.atlas_texture is not None:
+            self.atlas_texture.destroy()
+        self.rect_buffer = self.text_buffer = self.atlas_texture = None
+        self.rect_program = self.text_program = None
+        self.doneCurrent()
+    
+    def upload_atlas(self):
+        """图集有新字形时重新上传纹理"""
+        if not self.atlas.dirty and self.atlas_texture is not None:
+            return
+        if self.atlas_texture is not None:
+            self.atlas_texture.destroy()
+        self.atlas_texture = QOpenGLTexture(self.atlas.image, QOpenGLTexture.DontGenerateMipMaps)
+        self.atlas_texture.setMinMagFilters(QOpenGLTexture.Linear, QOpenGLTexture.Linear)
+        self.atlas_texture.setWrapMode(QOpenGLTexture.ClampToEdge)
+        self.atlas.dirty = False
+    
+    # ========== 顶点数据 ==========
+    
+    def brush_color_pair(self, brush):
+        """画刷的顶部和底部颜色（渐变画刷取首尾两个颜色）"""
+        cached = self.brush_colors.get(id(brush))
+        if cached is None:
+            gradient = brush.gradient()
+            if gradient is None:
+                colors = (rgba(brush.color()), rgba(brush.color()))
+            else:
+                stops = gradient.stops()
+                colors = (rgba(stops[0][1]), rgba(stops[-1][1]))
+            # 保留画刷的引用，避免id被其他对象复用
+            cached = self.brush_colors[id(brush)] = (brush, *colors)
+        return cached[1:]
+    
+    def row_vertices(self, gpu_idx):
+        """一行的顶点数据（按行布局缓存，布局重新计算后重新生成）"""
+        chart = self.chart
+        layout = chart.row_layout(gpu_idx)
+        cached = self.row_cache.get(gpu_idx)
+        if cached is not None and cached.layout is layout:
+            return cached
+        
+        backgrounds = []
+        if layout.bar_rect is not None:
+            add_rect(backgrounds, layout.bar_rect, *self.brush_color_pair(chart.background_brush),
+                     rgba(chart.background_pen.color()), chart.background_pen.widthF())
+        segments = []
+        segment_border = rgba(chart.segment_pen.color())
+        for rect, brush in layout.segments:
+            add_rect(segments, rect, *self.brush_color_pair(brush), segment_border,
+                     chart.segment_pen.widthF())
+        names = []
+        self.atlas.add_text(names, chart.label_font, layout.name_pos, layout.name,
+                            rgba(chart.name_pen.color()))
+        labels = []
+        self.atlas.add_text(labels, chart.label_font, layout.total_pos, layout.total_text,
+                            rgba(chart.total_pen.color()))
+        label_color = rgba(chart.segment_label_pen.color())
+        for pos, text in layout.segment_labels:
+            self.atlas.add_text(labels, chart.segment_font, pos, text, label_color)
+        
+        cached = self.row_cache[gpu_idx] = RowVertices(
+            layout, *(np.array(vertices, dtype=np.float32)
+                      for vertices in (backgrounds, segments, names, labels)))
+        return cached
+    
+    def build_frame(self, rect):
+        """
+        生成一帧的顶点数据
+        
+        Args:
+            rect: 视图在图表中的区域（图表坐标）
+        
+        Returns:
+            FrameVertices
+        """
+        chart = self.chart
+        names = []
+        if not chart.dataset.rows:
+            # 空状态提示，居中于整个图表
+            metrics = QFontMetricsF(chart.title_font)
+            text = "暂无GPU数据"
+            pos = QPointF((chart.width() - metrics.horizontalAdvance(text)) / 2,
+                          (chart.height() + metrics.ascent() - metrics.descent()) / 2)
+            self.atlas.add_text(names, chart.title_font, pos, text, rgba(chart.empty_pen.color()))
+            return FrameVertices(EMPTY_VERTICES, np.array(names, dtype=np.float32),
+                                 EMPTY_VERTICES)
+        
+        chart.ensure_layout()
+        rows = chart.visible_rows(rect)
+        if rows.start == 0:
+            self.atlas.add_text(names, chart.title_font, chart.title_pos, TITLE_TEXT,
+                                rgba(chart.title_pen.color()))
+        row_vertices = [self.row_vertices(gpu_idx) for gpu_idx in rows]
+        if len(self.row_cache) > max(chart.max_cached_rows(), len(rows)):
+            self.row_cache = {gpu_idx: self.row_cache[gpu_idx] for gpu_idx in rows}
+        
+        def concat(arrays):
+            return np.concatenate(arrays) if arrays else EMPTY_VERTICES
+        
+        return FrameVertices(
+            rects=concat([row.backgrounds for row in row_vertices]
+                         + [row.segments for row in row_vertices]),
+            names=concat([np.array(names, dtype=np.float32)]
+                         + [row.names for row in row_vertices]),
+            labels=concat([row.labels for row in row_vertices]),
+        )
+    
+    # ========== 绘制 ==========
+    
+    def paintGL(self):
+        """绘制可见部分（生成顶点和提交绘制分两个阶段计时）"""
+        if self.rect_buffer is None:
+            return
+        ratio = self.devicePixelRatioF()
+        if self.atlas.ratio != ratio or self.atlas.is_full():
+            self.atlas = GlyphAtlas(ratio)
+            self.row_cache.clear()
+        rect = self.geometry()
+        frame = self.chart.run_phase("geometry", self.build_frame, rect)
+        self.chart.run_phase("draw", self.draw_frame, rect, frame)
+    
+    def draw_frame(self, rect, frame):
+        """上传顶点并绘制：圆角矩形一次调用，文字分不裁剪和裁剪两次调用"""
+        gl = self.gl
+        gl.glClearColor(1.0, 1.0, 1.0, 1.0)
+        gl.glClear(GL_COLOR_BUFFER_BIT)
+        gl.glEnable(GL_BLEND)
+        gl.glBlendFunc(GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+        
+        # 视图坐标与图表坐标相同（y轴向下）
+        projection = QMatrix4x4()
+        projection.ortho(rect.x(), rect.x() + rect.width(), rect.y() + rect.height(), rect.y(),
+                         -1.0, 1.0)
+        
+        # 放大后柱子、总显存和分段文字裁剪到绘图区域，GPU名称不裁剪
+        scissor = None
+        if self.chart.plot_clip is not None:
+            ratio = self.devicePixelRatioF()
+            left = max(0, int((self.chart.plot_clip.left() - rect.x()) * ratio))
+            scissor = (left, 0, int(rect.width() * ratio), int(rect.height() * ratio))
+        
+        if len(frame.rects):
+            program = self.rect_program
+            program.bind()
+            program.setUniformValue("projection", projection)
+            program.setUniformValue("corner_radius", 4.0)
+            self.draw_arrays(program, self.rect_buffer, RECT_ATTRIBUTES, [(frame.rects, scissor)])
+            program.release()
+        
+        if len(frame.names) or len(frame.labels):
+            self.upload_atlas()
+            program = self.text_program
+            program.bind()
+            program.setUniformValue("projection", projection)
+            program.setUniformValue("atlas_size", QVector2D(self.atlas.image.width(),
+                                                            self.atlas.image.height()))
+            program.setUniformValue("atlas", 0)
+            self.atlas_texture.bind(0)
+            self.draw_arrays(program, self.text_buffer, TEXT_ATTRIBUTES,
+                             [(frame.names, None), (frame.labels, scissor)])
+            self.atlas_texture.release()
+            program.release()
+        self.set_scissor(None)
+    
+    def set_scissor(self, scissor):
+        """设置裁剪区域（设备像素，原点在左下角），None为不裁剪"""
+        if scissor is None:
+            self.gl.glDisable(GL_SCISSOR_TEST)
+        else:
+            self.gl.glEnable(GL_SCISSOR_TEST)
+            self.gl.glScissor(*scissor)
+    
+    def draw_arrays(self, program, buffer, attributes, batches):
+        """
+        把几批顶点上传到同一个缓冲，按批绘制三角形
+        
+        Args:
+            program: 已绑定的着色器程序
+            buffer: 顶点缓冲
+            attributes: 顶点属性 ((名称, 分量数), ...)
+            batches: [(顶点数据, 裁剪区域或None)]
+        """
+        floats_per_vertex = sum(size for _, size in attributes)
+        vertices = np.ascontiguousarray(np.concatenate([data for data, _ in batches]))
+        buffer.bind()
+        buffer.allocate(vertices, vertices.nbytes)
+        offset = 0
+        for name, size in attributes:
+            location = program.attributeLocation(name)
+            program.enableAttributeArray(location)
+            program.setAttributeBuffer(location, GL_FLOAT, offset * 4, size, floats_per_vertex * 4)
+            offset += size
+        first = 0
+        for data, batch_scissor in batches:
+            count = len(data) // floats_per_vertex
+            if count:
+                self.set_scissor(batch_scissor)
+                self.gl.glDrawArrays(GL_TRIANGLES, first, count)
+            first += count
+        for name, _ in attributes:
+            program.disableAttributeArray(program.attributeLocation(name))
+        buffer.release()
+
+
+# 性能埋点：开启后记录每次OpenGL绘制的耗时
+instrumentation.register(GLChartView, ["paintGL"])
@@ -0,0 +1,239 @@
+"""
+热力图概览组件 - 每个GPU一个格子，颜色表示显存利用率，用于一屏查看上千张GPU
+"""
+import numpy as np
+from PyQt5.QtWidgets import QWidget, QToolTip
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QPainter, QColor, QFont, QImage, QLinearGradient, QBrush
+import instrumentation
+from ui.chart_data import EMPTY_DATASET, gpu_memory
+
+
+# 利用率配色：空闲为浅绿，逐渐过渡到橙色和红色
+UTILIZATION_STOPS = [
+    (0.0, QColor("#DDEFE3")),
+    (0.35, QColor("#8FC5A3")),
+    (0.7, QColor("#E0B38A")),
+    (1.0, QColor("#D9645A")),
+]
+OVERCOMMITTED_COLOR = QColor("#7E57C2")  # 已用显存超过总显存
+NO_MEMORY_COLOR = QColor("#CFD8DC")  # 总显存为0
+BACKGROUND_COLOR = QColor("#FFFFFF")
+
+
+def _build_lut():
+    """利用率 0~255 对应的颜色表（0xFFRRGGBB）"""
+    positions = [position * 255 for position, _ in UTILIZATION_STOPS]
+    levels = np.arange(256)
+    red, green, blue = (
+        np.rint(np.interp(levels, positions,
+                          [getattr(color, channel)() for _, color in UTILIZATION_STOPS]))
+        .astype(np.uint32)
+        for channel in ("red", "green", "blue"))
+    return 0xFF000000 | (red << 16) | (green << 8) | blue
+
+
+UTILIZATION_LUT = _build_lut()
+
+
+class HeatmapWidget(QWidget):
+    """GPU热力图概览组件（按行优先排列格子，顺序与GPU列表一致）"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setStyleSheet("background-color: #FFFFFF;")
+        self.setMouseTracking(True)
+        
+        # 数据
+        self.dataset = EMPTY_DATASET
+        self.used = np.zeros(0)
+        self.total = np.zeros(0)
+        self.stale = False  # 隐藏期间数据有变化，显示时再重新生成
+        
+        # 固定参数
+        self.cell_px = 14
+        self.gap_px = 2
+        self.left_margin = 20
+        self.top_margin = 70
+        self.bottom_margin = 20
+        
+        # 布局和图像缓存
+        self.columns = 1
+        self.image = None  # 全部格子的图像，数据或列数变化后重新生成
+        self.hover_idx = None
+        
+        self.title_font = QFont("Segoe UI", 16, QFont.Bold)
+        self.legend_font = QFont("Segoe UI", 9)
+        
+        self.update_columns()
+    
+    @property
+    def pitch(self):
+        return self.cell_px + self.gap_px
+    
+    def set_data(self, dataset):
+        """设置图表数据集（ChartDataset，与条形图共用）；隐藏时只记下数据集，显示时再重新生成"""
+        if dataset.rows is self.dataset.rows and not self.stale:
+            self.dataset = dataset
+            return
+        self.dataset = dataset
+        if self.isVisible():
+            self.load_data()
+            self.update()
+        else:
+            self.stale = True
+    
+    def load_data(self):
+        """按数据集取出每个GPU的已用显存和总显存，图像在下次绘制时重新生成"""
+        self.stale = False
+        self.used, self.total = gpu_memory(self.dataset)
+        self.image = None
+        self.update_columns()
+    
+    def update_columns(self):
+        """按宽度计算每行的格子数，并按行数设置最小高度"""
+        usable = self.width() - 2 * self.left_margin + self.gap_px
+        columns = max(1, usable // self.pitch)
+        if columns != self.columns:
+            self.columns = columns
+            self.image = None
+        grid_rows = -(-len(self.dataset.rows) // self.columns)
+        self.setMinimumSize(400, max(300, self.top_margin + grid_rows * self.pitch
+                                     + self.bottom_margin))
+    
+    def showEvent(self, event):
+        """隐藏期间数据有变化时重新生成"""
+        if self.stale:
+            self.load_data()
+        super().showEvent(event)
+    
+    def resizeEvent(self, event):
+        """宽度变化后重新排列格子"""
+        if event.size().width() != event.oldSize().width():
+            self.update_columns()
+        super().resizeEvent(event)
+    
+    def utilization(self):
+        """每个GPU的显存利用率（总显存为0时为0）"""
+        return np.divide(self.used, self.total, out=np.zeros_like(self.used), where=self.total > 0)
+    
+    def render_image(self):
+        """一次性生成全部格子的图像（按利用率查颜色表，再把每个格子放大为 cell_px 见方）"""
+        count = len(self.dataset.rows)
+        columns = self.columns
+        grid_rows = -(-count // columns)
+        background = BACKGROUND_COLOR.rgba()
+        
+        ratio = self.utilization()
+        colors = UTILIZATION_LUT[np.clip(np.rint(ratio * 255), 0, 255).astype(np.intp)]
+        colors[ratio > 1] = OVERCOMMITTED_COLOR.rgba()
+        colors[self.total <= 0] = NO_MEMORY_COLOR.rgba()
+        # 格子网格，多出的一行一列为背景色，用于格子间的空隙
+        grid = np.full((grid_rows + 1, columns + 1), background, dtype=np.uint32)
+        grid[:grid_rows, :columns].flat[:count] = colors
+        
+        # 每个像素映射到所在格子（空隙映射到背景行/列），一次取出全部像素
+        pitch = self.pitch
+        ys = np.arange(grid_rows * pitch - self.gap_px)
+        xs = np.arange(columns * pitch - self.gap_px)
+        grid_y = np.where(ys % pitch < self.cell_px, ys // pitch, grid_rows)
+        grid_x = np.where(xs % pitch < self.cell_px, xs // pitch, columns)
+        pixels = grid[grid_y].take(grid_x, axis=1)
+        height, width = pixels.shape
+        # QImage 不持有 NumPy 数组的内存，复制一份
+        return QImage(pixels.data, width, height, width * 4, QImage.Format_RGB32).copy()
+    
+    def cell_at(self, pos):
+        """指定位置所在格子的行号（不在格子上时为None）"""
+        x = pos.x() - self.left_margin
+        y = pos.y() - self.top_margin
+        if x < 0 or y < 0:
+            return None
+        column, cell_x = divmod(x, self.pitch)
+        grid_row, cell_y = divmod(y, self.pitch)
+        if column >= self.columns or cell_x >= self.cell_px or cell_y >= self.cell_px:
+            return None
+        gpu_idx = grid_row * self.columns + column
+        return gpu_idx if gpu_idx < len(self.dataset.rows) else None
+    
+    def cell_rect(self, gpu_idx):
+        """指定GPU格子的区域"""
+        grid_row, column = divmod(gpu_idx, self.columns)
+        return QRect(self.left_margin + column * self.pitch,
+                     self.top_margin + grid_row * self.pitch, self.cell_px, self.cell_px)
+    
+    def tooltip_text(self, gpu_idx):
+        """GPU格子的提示文字：名称、显存使用和各任务占用"""
+        row = self.dataset.rows[gpu_idx]
+        used = self.used[gpu_idx]
+        lines = [row.name, f"已用 {used:.1f} / {row.total_memory:.1f}GB"]
+        if row.total_memory > 0:
+            lines[-1] += f"（{used / row.total_memory:.0%}）"
+        for task_id, memory in row.segments:
+            lines.append(f"{self.dataset.tasks[task_id].name}：{memory:.1f}GB")
+        return "\n".join(lines)
+    
+    def mouseMoveEvent(self, event):
+        """悬停时显示GPU信息"""
+        gpu_idx = self.cell_at(event.pos())
+        if gpu_idx != self.hover_idx:
+            self.hover_idx = gpu_idx
+            if gpu_idx is None:
+                QToolTip.hideText()
+            else:
+                QToolTip.showText(event.globalPos(), self.tooltip_text(gpu_idx), self,
+                                  self.cell_rect(gpu_idx))
+        super().mouseMoveEvent(event)
+    
+    def leaveEvent(self, event):
+        self.hover_idx = None
+        super().leaveEvent(event)
+    
+    def paintEvent(self, event):
+        """绘制标题、图例和热力图"""
+        if self.stale:
+            self.load_data()
+        painter = QPainter(self)
+        if not self.dataset.rows:
+            # 绘制空状态提示
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setFont(self.title_font)
+            painter.setPen(QColor("#90A4AE"))
+            painter.drawText(self.rect(), Qt.AlignCenter, "暂无GPU数据")
+            return
+        
+        if event.rect().top() < self.top_margin:
+            self.paint_header(painter)
+        if self.image is None:
+            self.image = self.render_image()
+        painter.drawImage(self.left_margin, self.top_margin, self.image)
+    
+    def paint_header(self, painter):
+        """绘制标题和利用率图例"""
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setFont(self.title_font)
+        painter.setPen(QColor("#263238"))
+        painter.drawText(QRect(0, 5, self.width(), 30), Qt.AlignCenter,
+                         f"GPU显存利用率概览（{len(self.dataset.rows)} 张）")
+        
+        # 图例：0% ~ 100% 渐变条，以及超分配和无显存的颜色
+        painter.setFont(self.legend_font)
+        painter.setPen(QColor("#5A6C7D"))
+        x, y = self.left_margin, 42
+        painter.drawText(x, y + 11, "利用率 0%")
+        x += 70
+        gradient = QLinearGradient(x, 0, x + 160, 0)
+        for position, color in UTILIZATION_STOPS:
+            gradient.setColorAt(position, color)
+        painter.fillRect(x, y, 160, 14, QBrush(gradient))
+        x += 168
+        painter.drawText(x, y + 11, "100%")
+        x += 50
+        for color, label in ((OVERCOMMITTED_COLOR, "超分配"), (NO_MEMORY_COLOR, "无显存")):
+            painter.fillRect(x, y, 14, 14, color)
+            painter.drawText(x + 20, y + 11, label)
+            x += 80
+
+
+# 性能埋点：开启后记录每次绘制和生成图像的耗时
+instrumentation.register(HeatmapWidget, ["paintEvent", "render_image"])
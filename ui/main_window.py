@@ -4,14 +4,21 @@
 import os
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QLabel, QComboBox, QFrame, QScrollArea,
-                             QGroupBox, QDialog, QSystemTrayIcon, QMenu, QAction)
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont, QColor, QIcon
+                             QGroupBox, QDialog, QSystemTrayIcon, QMenu, QAction, QShortcut)
+from PyQt5.QtCore import Qt, QByteArray
+from PyQt5.QtGui import QFont, QIcon, QKeySequence
 from ui.chart_widget import ChartWidget
+from ui.heatmap_widget import HeatmapWidget
+from ui.gl_chart_view import enable_opengl, opengl_requested
+from ui.chart_data import build_chart_dataset, build_chart_row, build_task_index
+from ui.profile_overlay import ProfileOverlay
 from ui.dialogs.scheme_manager_dialog import SchemeManagerDialog
 from ui.dialogs.gpu_manager_dialog import GPUManagerDialog
 from ui.dialogs.task_manager_dialog import TaskManagerDialog
 from data_manager import DataManager
+from settings import Settings
+import events
+import instrumentation
 
 
 class GPUMainWindow(QMainWindow):
@@ -26,8 +33,17 @@ class GPUMainWindow(QMainWindow):
         icon_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "icons", "gpu.png")
         self.setWindowIcon(QIcon(icon_path))
         
-        # 初始化数据管理器
-        self.data_manager = DataManager()
+        # 初始化数据管理器（后台写盘，避免编辑时界面卡顿）
+        self.data_manager = DataManager(async_save=True)
+        # 界面设置（当前方案、窗口位置等）按用户单独保存，不写数据文件
+        self.settings = Settings()
+        scheme_id = self.settings.get("current_scheme_id")
+        if scheme_id is not None:
+            self.data_manager.set_current_scheme(scheme_id)
+        geometry = self.settings.get("window_geometry")
+        if geometry:
+            self.restoreGeometry(QByteArray.fromBase64(geometry.encode("ascii")))
+        self._gpu_rows = {}  # {gpu_id: 图表行号}
         
         # 初始化系统托盘
         self.init_system_tray(icon_path)
@@ -38,6 +54,16 @@ class GPUMainWindow(QMainWindow):
         # 刷新显示
         self.refresh_scheme_combo()
         self.refresh_chart()
+        self.overview_btn.setChecked(bool(self.settings.get("overview_mode")))
+        
+        # 订阅数据变更，只刷新受影响的部分
+        self.data_manager.subscribe(self.on_data_changed)
+        
+        # 性能埋点（隐藏快捷键：Ctrl+Shift+P 开关并显示浮层，Ctrl+Shift+L 输出统计到日志）
+        self.profile_overlay = ProfileOverlay(self)
+        QShortcut(QKeySequence("Ctrl+Shift+P"), self, self.toggle_profiling)
+        QShortcut(QKeySequence("Ctrl+Shift+L"), self, instrumentation.dump)
+        self.apply_profiling(instrumentation.is_enabled())
     
     def init_ui(self):
         """初始化界面"""
@@ -217,9 +243,22 @@ class GPUMainWindow(QMainWindow):
                     stop:0 #45C165, stop:1 #2E8B47);
             }
         """)
-        refresh_btn.clicked.connect(self.refresh_chart)
+        refresh_btn.clicked.connect(lambda: self.refresh_chart())  # 调用时查找方法，埋点开关后仍生效
         top_layout.addWidget(refresh_btn)
         
+        # 概览按钮 - 切换条形图和热力图
+        self.overview_btn = QPushButton("热力图概览")
+        self.overview_btn.setFont(QFont("Segoe UI", 11, QFont.Bold))
+        self.overview_btn.setCheckable(True)
+        self.overview_btn.setStyleSheet(scheme_btn.styleSheet() + """
+            QPushButton:checked {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 #4A7DD6, stop:1 #2E5A9E);
+            }
+        """)
+        self.overview_btn.toggled.connect(self.set_overview_mode)
+        top_layout.addWidget(self.overview_btn)
+        
         top_layout.addStretch()
         main_layout.addWidget(top_frame)
         
@@ -244,14 +283,19 @@ class GPUMainWindow(QMainWindow):
         """)
         chart_layout = QVBoxLayout(chart_group)
         
-        # 创建图表组件
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setStyleSheet("border: none; background-color: #FFFFFF;")
+        # 创建图表组件（条形图和热力图概览共用滚动区域，切换时替换）
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidgetResizable(True)
+        self.scroll_area.setStyleSheet("border: none; background-color: #FFFFFF;")
         
         self.chart_widget = ChartWidget()
-        scroll_area.setWidget(self.chart_widget)
-        chart_layout.addWidget(scroll_area)
+        self.heatmap_widget = HeatmapWidget()
+        self.heatmap_widget.hide()
+        self.scroll_area.setWidget(self.chart_widget)
+        chart_layout.addWidget(self.scroll_area)
+        # 大屏展示时可设置 GPU_MANAGER_OPENGL=1 用OpenGL绘制条形图，不可用时仍用QPainter绘制
+        if opengl_requested() and not enable_opengl(self.chart_widget):
+            print("OpenGL不可用，图表使用QPainter绘制")
         
         main_layout.addWidget(chart_group, stretch=1)
         
@@ -304,19 +348,45 @@ class GPUMainWindow(QMainWindow):
             self.raise_()
             self.activateWindow()
     
+    def set_overview_mode(self, enabled):
+        """切换热力图概览和条形图"""
+        widget = self.heatmap_widget if enabled else self.chart_widget
+        if self.scroll_area.widget() is not widget:
+            # takeWidget 交还所有权，避免被替换的组件被销毁
+            self.scroll_area.takeWidget().hide()
+            self.scroll_area.setWidget(widget)
+            widget.show()
+        self.settings.set("overview_mode", enabled)
+    
+    def toggle_profiling(self):
+        """切换性能埋点"""
+        self.apply_profiling(instrumentation.toggle())
+    
+    def apply_profiling(self, enabled):
+        """根据埋点开关设置图表分阶段计时和浮层"""
+        self.chart_widget.paint_profiler = (
+            instrumentation.PhaseRecorder("ChartWidget.paint") if enabled else None)
+        self.profile_overlay.set_active(enabled)
+    
     def closeEvent(self, event):
         """窗口关闭事件 - 直接关闭"""
         # 隐藏系统托盘图标
         if hasattr(self, 'tray_icon'):
             self.tray_icon.hide()
+        # 保存窗口位置并等待后台写盘完成
+        self.settings.set("window_geometry", bytes(self.saveGeometry().toBase64()).decode("ascii"))
+        self.data_manager.close()
         event.accept()
     
     def refresh_scheme_combo(self):
         """刷新方案下拉框"""
         schemes = self.data_manager.get_all_schemes()
         scheme_names = [f"{s['id']}: {s['name']}" for s in schemes]
+        # 重建列表时不触发方案切换
+        self.scheme_combo.blockSignals(True)
         self.scheme_combo.clear()
         self.scheme_combo.addItems(scheme_names)
+        self.scheme_combo.blockSignals(False)
         
         # 设置当前选中的方案
         current_scheme = self.data_manager.get_current_scheme()
@@ -324,76 +394,62 @@ class GPUMainWindow(QMainWindow):
             current_text = f"{current_scheme['id']}: {current_scheme['name']}"
             index = self.scheme_combo.findText(current_text)
             if index >= 0:
+                self.scheme_combo.blockSignals(True)
                 self.scheme_combo.setCurrentIndex(index)
+                self.scheme_combo.blockSignals(False)
         elif scheme_names:
             self.scheme_combo.setCurrentIndex(0)
             if schemes:
                 self.data_manager.set_current_scheme(schemes[0]["id"])
     
     def on_scheme_changed(self, index):
-        """方案切换事件"""
+        """方案切换事件（图表由scheme_switched事件刷新）"""
         if index >= 0:
             selected = self.scheme_combo.currentText()
             if selected:
                 scheme_id = int(selected.split(":")[0])
                 self.data_manager.set_current_scheme(scheme_id)
-                self.refresh_chart()
     
-    def refresh_chart(self):
-        """刷新图表"""
-        gpus = self.data_manager.get_all_gpus()
-        if not gpus:
-            self.chart_widget.set_data([], [], [], {})
+    def on_data_changed(self, event):
+        """数据变更事件 - 只重新计算受影响的行"""
+        if event.kind in (events.SCHEME_ADDED, events.SCHEME_UPDATED, events.SCHEME_DELETED):
+            self.refresh_scheme_combo()
+            return
+        if event.kind == events.SCHEME_SWITCHED:
+            self.settings.set("current_scheme_id", event.scheme_id)
+            self.refresh_scheme_combo()
+            self.refresh_chart()
+            return
+        current_scheme = self.data_manager.get_current_scheme()
+        if not current_scheme or event.scheme_id != current_scheme["id"]:
             return
         
-        # 准备数据
-        gpu_names = []
-        total_memories = []
-        task_breakdown = []
-        
-        for gpu in gpus:
-            gpu_names.append(gpu["name"])
-            total_memories.append(gpu["total_memory"])
-            
-            usage = self.data_manager.get_gpu_usage(gpu["id"])
-            if usage:
-                task_info = {}
-                for alloc in usage["allocations"]:
-                    task_name = alloc["task_name"]
-                    if task_name not in task_info:
-                        task_info[task_name] = 0
-                    task_info[task_name] += alloc["memory_usage"]
-                task_breakdown.append(task_info)
-            else:
-                task_breakdown.append({})
-        
-        # 获取所有任务名称（用于颜色映射）
-        all_tasks = self.data_manager.get_all_tasks()
-        task_names = [task["name"] for task in all_tasks]
-        
-        # 定义任务颜色 - 明亮柔和配色（提高亮度，保持柔和）
-        task_colors = [
-            QColor("#8FA5D4"),  # 明亮蓝 - 优雅专业
-            QColor("#E0A8C0"),  # 明亮粉 - 温暖舒适
-            QColor("#8FC5A3"),  # 明亮绿 - 自然清新
-            QColor("#E0B38A"),  # 明亮橙 - 温暖明亮
-            QColor("#7BB8D4"),  # 明亮青 - 清新透明
-            QColor("#D4A89A"),  # 明亮棕 - 复古优雅
-            QColor("#9BB8D4"),  # 明亮蓝灰 - 清新淡雅
-            QColor("#B89BC8"),  # 明亮紫灰 - 优雅神秘
-            QColor("#8FC5B0"),  # 明亮绿蓝 - 自然宁静
-            QColor("#D4B38A"),  # 明亮米橙 - 温暖柔和
-            QColor("#8BB8D4"),  # 明亮蓝青 - 冷静专业
-            QColor("#B8D4A8"),  # 明亮绿灰 - 清新自然
-            QColor("#D4A8C0"),  # 明亮粉紫 - 温柔优雅
-            QColor("#9BB8D4")   # 明亮蓝灰 - 清新淡雅
-        ]
-        task_color_map = {}
-        for i, name in enumerate(task_names):
-            task_color_map[name] = task_colors[i % len(task_colors)]
-        
-        # 设置图表数据
-        self.chart_widget.set_data(gpu_names, total_memories, task_breakdown, task_color_map)
+        if event.kind in (events.GPU_ADDED, events.GPU_DELETED):
+            # GPU增删会改变行的位置，整体刷新
+            self.refresh_chart()
+        elif event.kind in (events.GPU_UPDATED, events.ALLOCATION_CHANGED):
+            self.refresh_gpu_row(event.gpu_id)
+        elif event.kind in (events.TASK_ADDED, events.TASK_UPDATED, events.TASK_DELETED):
+            # 任务名称和颜色在绘制时从任务索引解析，替换索引后图表只重绘受影响的行
+            self.chart_widget.set_tasks(build_task_index(self.data_manager.get_all_tasks()))
+            self.heatmap_widget.set_data(self.chart_widget.dataset)
+    
+    def refresh_gpu_row(self, gpu_id):
+        """重新计算并重绘单个GPU的行"""
+        row_idx = self._gpu_rows.get(gpu_id)
+        if row_idx is None:
+            return
+        row = build_chart_row(self.data_manager, gpu_id, self.chart_widget.dataset.tasks)
+        if row:
+            self.chart_widget.update_row(row_idx, row)
+            self.heatmap_widget.set_data(self.chart_widget.dataset)
+    
+    def refresh_chart(self):
+        """刷新图表"""
+        dataset = build_chart_dataset(self.data_manager)
+        self._gpu_rows = {row.gpu_id: i for i, row in enumerate(dataset.rows)}
+        self.chart_widget.set_data(dataset)
+        self.heatmap_widget.set_data(dataset)
     
     def open_scheme_manager(self):
         """打开GPU组管理弹窗"""
@@ -410,6 +466,10 @@ class GPUMainWindow(QMainWindow):
     
     def open_task_manager(self):
         """打开任务管理弹窗"""
-        dialog = TaskManagerDialog(self, self.data_manager)
+        dialog = TaskManagerDialog(self, self.data_manager, self.settings)
         if dialog.exec_() == QDialog.Accepted:
             self.refresh_chart()
+
+
+# 性能埋点：开启后记录整体刷新图表的耗时
+instrumentation.register(GPUMainWindow, ["refresh_chart"])
@@ -0,0 +1,44 @@
+"""
+性能埋点浮层 - 在窗口右上角显示各埋点的 p50/p99
+"""
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont
+import instrumentation
+
+
+class ProfileOverlay(QLabel):
+    """性能埋点浮层（不接收鼠标事件，每秒刷新一次）"""
+    
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setFont(QFont("Consolas", 9))
+        self.setStyleSheet("""
+            QLabel {
+                background-color: rgba(38, 50, 56, 210);
+                color: #ECEFF1;
+                padding: 8px;
+                border-radius: 6px;
+            }
+        """)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+    
+    def set_active(self, active):
+        """显示或隐藏浮层"""
+        if active:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start(1000)
+        else:
+            self.timer.stop()
+            self.hide()
+    
+    def refresh(self):
+        """刷新统计并贴靠到父窗口右上角"""
+        self.setText(instrumentation.report(limit=15))
+        self.adjustSize()
+        self.move(self.parent().width() - self.width() - 20, 20)